@@ -0,0 +1,328 @@
+"""기보 일괄 분석: PGN/FEN을 작업자 프로세스에 나눠 포지션마다 평가하고 결과를 JSONL/CSV로 기록
+
+- 입력은 pgn.read_games로 한 게임씩 읽으며, 처리 중인 게임 수가 --queue-size를 넘으면 읽기를 멈춘다
+  (결과를 쓰는 속도보다 읽는 속도가 빨라도 메모리가 늘지 않는다)
+- 작업자는 게임을 수 생성기로 재생하며 포지션마다 고정 깊이/노드 수로 탐색하고,
+  평가가 --blunder 센티폰 이상 떨어진 수를 블런더로 표시한다
+- 결과는 입력 순서대로 기록하고, 기록한 게임 수와 출력 파일 위치를 체크포인트에 남겨
+  중단된 뒤 --resume으로 이어서 분석할 수 있다
+- 끝나면(그리고 --stats-interval초마다) 작업자별 게임/포지션/노드 처리량을 출력
+
+사용 예:
+    python analysis.py games.pgn --depth 3 --workers 4 --out analysis.jsonl --checkpoint analysis.ckpt
+    python analysis.py positions.fen --nodes 20000 --out evals.csv
+    python analysis.py games.pgn --depth 0 --out static.jsonl   # 정적 평가만 (batch_eval.evaluate_batch)
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from chess_engine import WHITE
+from pgn import PGNError, PGNGame, move_to_san, open_pgn, parse_san, read_games, start_board
+from search import MAX_PLY, Searcher
+
+CSV_FIELDS = ['index', 'event', 'white', 'black', 'result', 'plies', 'final_fen', 'final_score',
+              'blunders', 'error', 'worker', 'elapsed', 'nodes']
+SCORE_CLAMP = 2000 # 블런더 판정 시 메이트 점수를 이 값으로 자른다
+
+# --- 작업자 프로세스 쪽 ---
+_worker_searcher = None
+
+
+def _init_worker(hash_mb):
+    # 작업자마다 치환표를 하나씩 두고 게임 사이에 재사용
+    global _worker_searcher
+    _worker_searcher = Searcher(hash_mb)
+
+
+def _evaluate(board, depth, nodes):
+    """(백 기준 점수, side to move 기준 점수, 최선수, 노드 수)
+
+    depth 0에 nodes를 주면 깊이 제한 없이 노드 수로만 끊는다 (depth=0 그대로면 탐색을 한 번도 하지 않는다).
+    """
+    move, info = _worker_searcher.search(board, depth=depth or MAX_PLY, nodes=nodes)
+    score = info.score if info else 0
+    return (score if board.turn == WHITE else -score), score, move, _worker_searcher.nodes
+
+
+def analyze_game(index, headers, moves, depth, nodes, blunder_cp):
+    """게임 하나를 재생하며 모든 포지션을 평가한 결과 dict (작업자 프로세스에서 실행)"""
+    start = time.perf_counter()
+    record = {'index': index, 'event': headers.get('Event', ''), 'white': headers.get('White', ''),
+              'black': headers.get('Black', ''), 'result': headers.get('Result', '*'),
+              'plies': 0, 'evals': [], 'blunders': [], 'error': None, 'worker': os.getpid()}
+    total_nodes = 0
+    try:
+        if depth == 0 and not nodes:
+            _static_evals(record, headers, moves, blunder_cp)
+            return record
+        board = start_board(headers)
+        white_score, stm_score, best, searched = _evaluate(board, depth, nodes)
+        total_nodes += searched
+        record['evals'].append(white_score)
+        for ply, san in enumerate(moves):
+            move = parse_san(board, san)
+            best_san = move_to_san(board, best) if best else None
+            board.make_move(move)
+            before = max(-SCORE_CLAMP, min(SCORE_CLAMP, stm_score))
+            white_score, stm_score, next_best, searched = _evaluate(board, depth, nodes)
+            total_nodes += searched
+            record['evals'].append(white_score)
+            after = -max(-SCORE_CLAMP, min(SCORE_CLAMP, stm_score)) # 수를 둔 쪽 기준
+            if before - after >= blunder_cp and move != best:
+                record['blunders'].append({'ply': ply + 1, 'move': san, 'best': best_san, 'loss': before - after})
+            best = next_best
+            record['plies'] = ply + 1
+        record['final_fen'] = board.to_fen()
+        record['final_score'] = white_score
+    except (PGNError, ValueError) as e:
+        record['error'] = str(e)
+    except Exception as e: # 그 밖의 예외도 이 게임만 실패로 기록하고 다음 게임으로 넘어간다
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        record['elapsed'] = round(time.perf_counter() - start, 4)
+        record['nodes'] = total_nodes
+    return record
+
+
+def _static_evals(record, headers, moves, blunder_cp):
+    """--depth 0: 탐색 없이 게임의 모든 포지션을 evaluate_batch 한 번으로 평가 (최선수는 없음)"""
+    from batch_eval import evaluate_batch # NumPy는 이 경로에서만 쓴다 (탐색 분석은 NumPy 없이 돈다)
+    board = start_board(headers)
+    positions = [board.pack()]
+    try:
+        for san in moves:
+            board.make_move(parse_san(board, san))
+            positions.append(board.pack())
+    finally:
+        # 잘못된 수가 나와도 그 앞까지의 평가는 남긴다
+        scores = evaluate_batch(positions).tolist()
+        record['evals'] = scores
+        record['plies'] = len(positions) - 1
+    for ply in range(1, len(positions)):
+        sign = 1 if positions[ply - 1][64] & 1 == WHITE else -1 # 수를 둔 쪽 기준
+        before = sign * max(-SCORE_CLAMP, min(SCORE_CLAMP, scores[ply - 1]))
+        after = sign * max(-SCORE_CLAMP, min(SCORE_CLAMP, scores[ply]))
+        if before - after >= blunder_cp:
+            record['blunders'].append({'ply': ply, 'move': moves[ply - 1], 'best': None, 'loss': before - after})
+    record['final_fen'] = board.to_fen()
+    record['final_score'] = scores[-1]
+
+
+# --- 주 프로세스 쪽 ---
+def iter_source(path):
+    """PGN이면 게임 단위로, 그 밖의 파일은 한 줄에 FEN 하나인 포지션 목록으로 읽는다"""
+    name = path[:-3] if path.endswith('.gz') else path
+    with open_pgn(path) as stream:
+        if name.endswith('.pgn') or path == '-':
+            yield from read_games(stream)
+            return
+        for line in stream:
+            fen = line.split(';')[0].strip() # EPD의 연산(; 뒤)은 무시
+            if fen and not fen.startswith('#'):
+                fields = fen.split()
+                if len(fields) == 4:
+                    fen += ' 0 1'
+                yield PGNGame({'FEN': fen, 'SetUp': '1'}, [], '*')
+
+
+class Checkpoint:
+    """기록을 끝낸 게임 수와 출력 파일 크기 (임시 파일에 쓰고 교체하므로 중간에 끊겨도 깨지지 않음)"""
+
+    def __init__(self, path, settings):
+        self.path = path
+        self.settings = settings
+        self.games_done = 0
+        self.output_bytes = 0
+
+    def load(self):
+        """저장된 체크포인트가 같은 설정이면 읽어 들이고 True"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('settings') != self.settings:
+            raise SystemExit(f"{self.path}: 다른 설정으로 만든 체크포인트 ({data.get('settings')})")
+        self.games_done = data['games_done']
+        self.output_bytes = data['output_bytes']
+        return True
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'settings': self.settings, 'games_done': self.games_done,
+                       'output_bytes': self.output_bytes}, f)
+        os.replace(tmp_path, self.path)
+
+
+class ResultWriter:
+    """형식은 확장자로 결정: .csv면 CSV_FIELDS 열의 CSV, 그 밖에는 JSONL (-는 표준 출력)"""
+
+    def __init__(self, path, offset=None):
+        """offset: 체크포인트에서 이어 쓸 때 기록을 마친 파일 위치 (None이면 새로 쓴다)"""
+        self.csv = path.endswith('.csv')
+        if path == '-':
+            self.file = sys.stdout
+        elif offset is None:
+            self.file = open(path, 'w', encoding='utf-8', newline='')
+        else:
+            self.file = open(path, 'a+', encoding='utf-8', newline='')
+            # 체크포인트 이후에 쓰다 만 부분은 버린다
+            self.file.truncate(offset)
+            self.file.seek(offset)
+        if self.csv:
+            self.writer = csv.DictWriter(self.file, CSV_FIELDS, extrasaction='ignore')
+            if not offset:
+                self.writer.writeheader()
+
+    def write(self, record):
+        if self.csv:
+            row = dict(record)
+            row['blunders'] = ' '.join(f"{b['ply']}:{b['move']}" for b in record['blunders'])
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def tell(self):
+        self.file.flush()
+        return self.file.tell() if self.file is not sys.stdout else 0
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class WorkerStats:
+    """작업자(pid)별 처리량"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.workers = {}
+
+    def add(self, record):
+        stats = self.workers.setdefault(record['worker'], {'games': 0, 'failed': 0, 'positions': 0, 'nodes': 0, 'busy': 0.0})
+        stats['games'] += 1
+        stats['failed'] += record['error'] is not None
+        stats['positions'] += len(record['evals'])
+        stats['nodes'] += record['nodes']
+        stats['busy'] += record['elapsed']
+
+    def report(self, stream=sys.stderr):
+        elapsed = time.perf_counter() - self.start
+        games = sum(s['games'] for s in self.workers.values())
+        failed = sum(s['failed'] for s in self.workers.values())
+        positions = sum(s['positions'] for s in self.workers.values())
+        print(f"{games} games ({failed} failed)  {positions} positions  {elapsed:.1f}s  "
+              f"{games / elapsed:.2f} games/s  {positions / elapsed:.1f} positions/s", file=stream)
+        for pid, s in sorted(self.workers.items()):
+            busy = s['busy'] or 1e-9
+            print(f"  worker {pid}: {s['games']} games  {s['positions'] / busy:.1f} positions/s  "
+                  f"{s['nodes'] / busy:,.0f} nps  busy {s['busy'] / elapsed:.0%}", file=stream)
+
+
+def run(paths, out, workers=None, depth=3, nodes=None, blunder_cp=200, queue_size=None,
+        checkpoint_path=None, resume=False, hash_mb=16, stats_interval=10.0, limit=None):
+    """paths의 게임을 분석해 out에 기록하고 WorkerStats를 반환"""
+    workers = workers or multiprocessing.cpu_count()
+    queue_size = queue_size or workers * 4
+    checkpoint = None
+    resumed = False
+    if checkpoint_path:
+        checkpoint = Checkpoint(checkpoint_path, {'paths': paths, 'depth': depth, 'nodes': nodes,
+                                                  'blunder': blunder_cp, 'out': out})
+        resumed = resume and checkpoint.load()
+        if resumed:
+            print(f"resuming after {checkpoint.games_done} games", file=sys.stderr)
+    skip = checkpoint.games_done if checkpoint else 0
+    # 이어서 분석할 때만 체크포인트 위치에서 자르고 덧붙인다 (새로 시작하면 --out을 처음부터 쓴다)
+    writer = ResultWriter(out, checkpoint.output_bytes if resumed else None)
+    stats = WorkerStats()
+
+    def source():
+        index = 0
+        for path in paths:
+            for game in iter_source(path):
+                if limit is not None and index >= limit:
+                    return
+                if index >= skip:
+                    yield index, game
+                index += 1
+
+    context = multiprocessing.get_context('spawn')
+    pending = {} # future → 게임 번호
+    finished = {} # 먼저 끝났지만 앞 번호가 아직 안 끝나서 기다리는 결과
+    next_index = skip # 다음에 기록할 게임 번호
+    last_report = last_save = time.perf_counter()
+    games = source()
+    exhausted = False
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(hash_mb,)) as pool:
+            while True:
+                # 처리 중인 게임 + 기록을 기다리는 결과가 queue_size보다 적을 때만 새 게임을 읽는다
+                while not exhausted and len(pending) + len(finished) < queue_size:
+                    item = next(games, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    index, game = item
+                    future = pool.submit(analyze_game, index, game.headers, game.moves, depth, nodes, blunder_cp)
+                    pending[future] = index
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+                while next_index in finished:
+                    record = finished.pop(next_index)
+                    writer.write(record)
+                    stats.add(record)
+                    next_index += 1
+                now = time.perf_counter()
+                if checkpoint and now - last_save >= 1.0:
+                    checkpoint.games_done, checkpoint.output_bytes = next_index, writer.tell()
+                    checkpoint.save()
+                    last_save = now
+                if stats_interval and now - last_report >= stats_interval:
+                    stats.report()
+                    last_report = now
+    finally:
+        # 중단(Ctrl+C 포함)되어도 입력 순서대로 기록을 마친 지점까지는 저장해 둔다
+        if checkpoint:
+            checkpoint.games_done, checkpoint.output_bytes = next_index, writer.tell()
+            checkpoint.save()
+        writer.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PGN/FEN 일괄 분석")
+    parser.add_argument('paths', nargs='+', help="PGN 파일(.pgn, .pgn.gz) 또는 한 줄에 FEN 하나인 파일")
+    parser.add_argument('--out', default='-', help="결과 파일 (.csv면 CSV, 그 밖에는 JSONL, 기본은 표준 출력)")
+    parser.add_argument('--depth', type=int, default=3, help="포지션당 탐색 깊이 (0이면 탐색 없이 정적 평가를 게임 단위 배치로, --nodes와 함께면 노드 수로만 제한)")
+    parser.add_argument('--nodes', type=int, help="포지션당 최대 노드 수")
+    parser.add_argument('--blunder', type=int, default=200, help="블런더로 볼 평가 하락폭 (센티폰)")
+    parser.add_argument('--workers', type=int, help="작업자 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--queue-size', type=int, help="동시에 들고 있을 최대 게임 수 (기본: 작업자 수 x 4)")
+    parser.add_argument('--hash', type=int, default=16, help="작업자별 치환표 크기(MB)")
+    parser.add_argument('--checkpoint', help="진행 상황을 저장할 파일")
+    parser.add_argument('--resume', action='store_true', help="체크포인트에서 이어서 분석")
+    parser.add_argument('--limit', type=int, help="앞에서부터 이 수만큼의 게임만 분석")
+    parser.add_argument('--stats-interval', type=float, default=10.0, help="처리량 출력 간격(초), 0이면 끝에만")
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error("--resume에는 --checkpoint가 필요합니다")
+
+    stats = run(args.paths, args.out, workers=args.workers, depth=args.depth, nodes=args.nodes,
+                blunder_cp=args.blunder, queue_size=args.queue_size, checkpoint_path=args.checkpoint,
+                resume=args.resume, hash_mb=args.hash, stats_interval=args.stats_interval, limit=args.limit)
+    stats.report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""정적 평가의 NumPy 배치 버전: evaluation.evaluate와 같은 점수를 포지션 여러 개에 한꺼번에
+
+- evaluate_batch(positions): 포지션 N개를 (N, 64) 기물 코드 배열로 만들어 NumPy로 한꺼번에 평가.
+  기물마다의 공격은 uint64 비트보드 배열에 Kogge-Stone 채움(방향마다 시프트 세 번)으로 구하므로
+  파이썬 반복은 방향 수(8)만큼뿐이다.
+- evaluate_moves(board, moves): 각 수를 둔 뒤의 포지션을 한 배치로 평가 (분석용)
+
+NumPy import에 100ms 가까이 걸리므로 evaluation(탐색의 한 포지션 평가)과 분리해 두고,
+필요한 곳(analysis --depth 0, evaluation --check/--benchmark)에서만 불러온다. 탐색은 NumPy를 쓰지 않는다.
+np.bitwise_count 때문에 NumPy 2.0 이상이 필요하다 (pyproject의 batch 선택 의존성).
+점수는 센티폰, evaluate_batch는 백 기준, evaluate_moves는 수를 두는 쪽 기준이다.
+"""
+import numpy as np
+
+from chess_engine import (ALL_SQUARES, BISHOP, BLACK, FILE_A, FILE_H, KING, KNIGHT, KNIGHT_ATTACKS,
+                          PAWN, QUEEN, ROOK, WHITE, Board)
+from evaluation import (KING_ATTACK_WEIGHTS, KING_ZONES, MOBILITY_ENDGAME, MOBILITY_MIDGAME, SHIELD_FAR,
+                        SHIELD_MASKS, SHIELD_NEAR)
+from psqt import CODE_PHASE, MAX_PHASE, PSQT
+
+BATCH_SIZE = 1024 # 배치를 이 크기로 나눠 처리 (중간 배열이 포지션당 수십 KB)
+
+# 슬라이더 방향별 (시프트 양, 도착 칸에서 지울 파일). 칸 번호는 a8=0이라 <<8이 한 줄 아래(흑 쪽)
+_NOT_FILE_A = np.uint64(ALL_SQUARES & ~FILE_A)
+_NOT_FILE_H = np.uint64(ALL_SQUARES & ~FILE_H)
+_ALL = np.uint64(ALL_SQUARES)
+ROOK_SHIFTS = [(1, _NOT_FILE_A), (-1, _NOT_FILE_H), (8, _ALL), (-8, _ALL)]
+BISHOP_SHIFTS = [(9, _NOT_FILE_A), (7, _NOT_FILE_H), (-7, _NOT_FILE_A), (-9, _NOT_FILE_H)]
+
+
+def _shift(bitboards, amount):
+    return bitboards << np.uint64(amount) if amount > 0 else bitboards >> np.uint64(-amount)
+
+
+def _slide(pieces, empty, amount, mask):
+    """Kogge-Stone 채움: pieces(비트보드 배열)에서 한 방향으로 첫 장애물(포함)까지의 공격"""
+    empty = empty & mask
+    pieces = pieces | (empty & _shift(pieces, amount))
+    empty = empty & _shift(empty, amount)
+    pieces = pieces | (empty & _shift(pieces, 2 * amount))
+    empty = empty & _shift(empty, 2 * amount)
+    pieces = pieces | (empty & _shift(pieces, 4 * amount))
+    return _shift(pieces, amount) & mask
+
+
+def _bitboard_table(table):
+    return np.array(table, dtype=np.uint64)
+
+
+KNIGHT_BITBOARDS = _bitboard_table(KNIGHT_ATTACKS)
+ZONE_BITBOARDS = _bitboard_table(KING_ZONES)
+SHIELD_BITBOARDS = [[_bitboard_table(SHIELD_MASKS[color][distance]) for distance in (0, 1)]
+                    for color in (WHITE, BLACK)]
+_SQUARE_BITS = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+# 코드 -1(빈 칸)은 마지막 원소(6, 기물 없음)를 읽는다
+_PIECE_TYPES = np.array([code % 6 for code in range(12)] + [6], dtype=np.int8)
+# (기물 코드 + 1) * 64 + 칸 → 중반/종반을 묶은 PST 점수 (0번 행은 빈 칸)
+_PSQT = np.array([[0] * 64] + PSQT, dtype=np.int64).ravel()
+_PHASE = np.array(CODE_PHASE + [0], dtype=np.int64)
+_MOBILITY_MIDGAME = np.array(MOBILITY_MIDGAME, dtype=np.int64)
+_MOBILITY_ENDGAME = np.array(MOBILITY_ENDGAME, dtype=np.int64)
+_KING_ATTACK = np.array(KING_ATTACK_WEIGHTS, dtype=np.int64)
+
+
+def position_codes(positions):
+    """Board / position.Position / 66바이트 pack() 목록 → (N, 64) 기물 코드 배열 (빈 칸 -1)"""
+    if all(isinstance(position, Board) for position in positions):
+        return np.array([board.squares for board in positions], dtype=np.int8).reshape(-1, 64)
+    buffer = b''.join(position.pack() if isinstance(position, Board) else bytes(position) for position in positions)
+    data = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 66)
+    return data[:, :64].astype(np.int8) - 1
+
+
+def _bitboards(mask):
+    """(N, 64) bool → (N,) uint64 비트보드 (칸 번호 = 비트 번호)"""
+    return np.packbits(mask, axis=1, bitorder='little').view('<u8')[:, 0].astype(np.uint64)
+
+
+def evaluate_codes(codes):
+    """(N, 64) 기물 코드 배열의 백 기준 점수 (N,) int64"""
+    count = len(codes)
+    codes = codes.astype(np.intp)
+    psqt = _PSQT[(codes + 1) * 64 + np.arange(64)].sum(axis=1)
+    mg = ((psqt + 2 ** 31) & 0xFFFFFFFF) - 2 ** 31 # psqt.unpack_score와 같은 계산
+    eg = (psqt - mg) >> 32
+    phase = np.minimum(_PHASE[codes].sum(axis=1), MAX_PHASE)
+
+    by_color = [_bitboards((codes >= 0) & (codes < 6)), _bitboards(codes >= 6)]
+    empty = ~(by_color[WHITE] | by_color[BLACK])
+    kings = np.stack([(codes == color * 6 + KING).argmax(axis=1) for color in (WHITE, BLACK)], axis=1)
+
+    # 나이트~퀸 하나하나의 공격 비트보드 (M개, 포지션당 많아야 열몇 개)
+    types = _PIECE_TYPES[codes]
+    rows, squares = np.nonzero((types >= KNIGHT) & (types <= QUEEN))
+    piece_types = types[rows, squares].astype(np.intp)
+    colors = (codes[rows, squares] >= 6).astype(np.intp)
+    attacks = np.where(piece_types == KNIGHT, KNIGHT_BITBOARDS[squares], np.uint64(0))
+    bits = _SQUARE_BITS[squares]
+    piece_empty = empty[rows]
+    for shifts, slider_types in ((ROOK_SHIFTS, (ROOK, QUEEN)), (BISHOP_SHIFTS, (BISHOP, QUEEN))):
+        sliders = np.where(np.isin(piece_types, slider_types), bits, np.uint64(0))
+        for amount, mask in shifts:
+            attacks |= _slide(sliders, piece_empty, amount, mask)
+
+    own = np.where(colors == WHITE, by_color[WHITE][rows], by_color[BLACK][rows])
+    mobility = np.bitwise_count(attacks & ~own).astype(np.int64)
+    zone_hits = np.bitwise_count(attacks & ZONE_BITBOARDS[kings[rows, colors ^ 1]]).astype(np.int64)
+    signs = 1 - 2 * colors
+    mg += np.bincount(rows, signs * _MOBILITY_MIDGAME[piece_types] * mobility, count).astype(np.int64)
+    eg += np.bincount(rows, signs * _MOBILITY_ENDGAME[piece_types] * mobility, count).astype(np.int64)
+    mg += np.bincount(rows, signs * _KING_ATTACK[piece_types] * zone_hits, count).astype(np.int64)
+
+    # 킹 앞의 자기 폰
+    for color, sign in ((WHITE, 1), (BLACK, -1)):
+        pawns = _bitboards(codes == color * 6 + PAWN)
+        for distance, weight in ((0, SHIELD_NEAR), (1, SHIELD_FAR)):
+            shield = np.bitwise_count(pawns & SHIELD_BITBOARDS[color][distance][kings[:, color]]).astype(np.int64)
+            mg += sign * weight * shield
+    return (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
+
+
+def evaluate_batch(positions):
+    """포지션 목록(Board, Position 또는 66바이트)의 백 기준 점수 배열. BATCH_SIZE씩 나눠 처리"""
+    positions = list(positions)
+    scores = np.empty(len(positions), dtype=np.int64)
+    for start in range(0, len(positions), BATCH_SIZE):
+        codes = position_codes(positions[start:start + BATCH_SIZE])
+        scores[start:start + len(codes)] = evaluate_codes(codes)
+    return scores
+
+
+def evaluate_moves(board, moves):
+    """board의 각 수를 둔 뒤 포지션의 점수 배열 (수를 두는 쪽 기준)"""
+    packed = []
+    for move in moves:
+        board.make_move(move)
+        packed.append(board.pack())
+        board.unmake_move()
+    if not packed:
+        return np.empty(0, dtype=np.int64)
+    scores = evaluate_batch(packed)
+    return scores if board.turn == WHITE else -scores
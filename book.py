@@ -0,0 +1,207 @@
+"""Polyglot .bin 형식 오프닝북 (mmap + 이진 탐색)
+
+항목은 16바이트 big-endian (key 8, move 2, weight 2, learn 4)이고 key 순으로 정렬되어 있어서
+파일을 읽어 들이지 않고 mmap 위에서 이진 탐색으로 같은 key의 항목들만 찾는다.
+
+포지션 key는 함수로 바꿔 끼울 수 있다:
+- polyglot_key (기본): 표준 Polyglot 키. Polyglot이 정한 781개의 고정 난수(polyglot_random.RANDOM64)로
+  계산하므로 외부에서 받은 .bin 책을 그대로 쓸 수 있고, `python book.py build`로 만든 책도 다른 프로그램에서 읽힌다.
+- polyglot_key_function(path): 다른 Random64 표 파일(16진수 781개)로 계산하는 키 (환경 변수 POLYGLOT_RANDOM64로도 지정 가능)
+- zobrist_key: 이 프로젝트의 Zobrist 키. 내부용 책에만 쓴다 (--zobrist, 다른 프로그램과 호환되지 않음).
+
+python book.py build games.pgn book.bin --plies 16
+python book.py probe book.bin --fen "..."
+"""
+import argparse
+import mmap
+import os
+import random
+import re
+import struct
+from collections import Counter
+
+from chess_engine import (KING, PAWN, PAWN_ATTACKS, WHITE, Board, encode_move, move_from, move_promotion,
+                          move_to, move_to_uci)
+from polyglot_random import RANDOM64
+
+ENTRY = struct.Struct('>QHHI')
+RANDOM64_ENV = 'POLYGLOT_RANDOM64'
+RANDOM64_SIZE = 781
+_CASTLE_OFFSET, _EP_OFFSET, _TURN_OFFSET = 768, 772, 780
+
+
+# --- key ---
+def zobrist_key(board):
+    """이 프로젝트의 Zobrist 키 (내부용 책)"""
+    return board.key
+
+
+def load_random64(path):
+    """Polyglot Random64 표 (16진수 781개, 쉼표/공백/0x/ULL 표기 허용)"""
+    with open(path, encoding='utf-8') as f:
+        numbers = [int(token, 16) for token in re.findall(r'(?:0x)?([0-9A-Fa-f]{16})', f.read())]
+    if len(numbers) != RANDOM64_SIZE:
+        raise ValueError(f"{path}: Random64 표는 {RANDOM64_SIZE}개여야 함 ({len(numbers)}개)")
+    return numbers
+
+
+def polyglot_key(board, randoms=RANDOM64):
+    """Polyglot 명세대로 계산한 key (randoms는 표준 표, 또는 load_random64의 결과)"""
+    key = 0
+    for sq, code in enumerate(board.squares):
+        if code < 0:
+            continue
+        color, piece_type = divmod(code, 6)
+        kind = piece_type * 2 + (1 if color == WHITE else 0) # 흑 폰 0, 백 폰 1, 흑 나이트 2, ...
+        rank = 7 - (sq >> 3) # Polyglot은 1랭크가 0
+        key ^= randoms[64 * kind + 8 * rank + (sq & 7)]
+    for i, bit in enumerate((1, 2, 4, 8)): # 백 O-O, 백 O-O-O, 흑 O-O, 흑 O-O-O
+        if board.castling & bit:
+            key ^= randoms[_CASTLE_OFFSET + i]
+    ep = board.ep_square
+    # 앙파상 칸은 그 칸을 잡을 수 있는 폰이 옆에 있을 때만 넣는다
+    if ep >= 0 and PAWN_ATTACKS[board.turn ^ 1][ep] & board.pieces[board.turn * 6 + PAWN]:
+        key ^= randoms[_EP_OFFSET + (ep & 7)]
+    if board.turn == WHITE:
+        key ^= randoms[_TURN_OFFSET]
+    return key
+
+
+def polyglot_key_function(path=None):
+    """표 파일(없으면 POLYGLOT_RANDOM64 환경 변수)로 만든 Polyglot key 함수, 둘 다 없으면 표준 표의 polyglot_key"""
+    path = path or os.environ.get(RANDOM64_ENV)
+    if not path:
+        return polyglot_key
+    randoms = load_random64(path)
+    return lambda board: polyglot_key(board, randoms)
+
+
+# --- 수 변환 ---
+def encode_polyglot_move(board, move):
+    """to_file | to_row << 3 | from_file << 6 | from_row << 9 | promotion << 12 (캐슬링은 킹이 룩을 잡는 수로)"""
+    frm, to = move_from(move), move_to(move)
+    if board.squares[frm] % 6 == KING and abs(to - frm) == 2:
+        to = frm + 3 if to > frm else frm - 4
+    promotion = move_promotion(move) # 나이트 1, 비숍 2, 룩 3, 퀸 4 (우리 코드와 같다)
+    return (to & 7) | (7 - (to >> 3)) << 3 | (frm & 7) << 6 | (7 - (frm >> 3)) << 9 | promotion << 12
+
+
+def decode_polyglot_move(board, value):
+    """board의 합법수로 변환 (없으면 None, key 충돌이나 잘못된 책 항목)"""
+    frm = (7 - ((value >> 9) & 7)) * 8 + ((value >> 6) & 7)
+    to = (7 - ((value >> 3) & 7)) * 8 + (value & 7)
+    promotion = (value >> 12) & 7
+    code = board.squares[frm]
+    if code >= 0 and code % 6 == KING and board.squares[to] == (code // 6) * 6 + 3 and (to >> 3) == (frm >> 3):
+        to = frm + 2 if to > frm else frm - 2 # 킹이 같은 편 룩을 '잡는' 표기 → 캐슬링
+    move = encode_move(frm, to, promotion)
+    return move if move in board.generate_legal() else None
+
+
+# --- 읽기 ---
+class OpeningBook:
+    """mmap으로 연 Polyglot 책. 조회마다 O(log n)번 16바이트를 읽을 뿐 메모리는 일정하다"""
+
+    def __init__(self, path, key_function=polyglot_key):
+        self.path = path
+        self.key_function = key_function
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = size // ENTRY.size
+        self.hits = 0
+
+    def close(self):
+        if self.map:
+            self.map.close()
+        self.file.close()
+
+    def _key_at(self, i):
+        return struct.unpack_from('>Q', self.map, i * ENTRY.size)[0]
+
+    def entries(self, board):
+        """[(move, weight, learn)] — 책에 있는 이 포지션의 수들 (합법이 아닌 항목은 버림)"""
+        key = self.key_function(board)
+        lo, hi = 0, self.count
+        while lo < hi: # key 이상인 첫 항목
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        for i in range(lo, self.count):
+            entry_key, value, weight, learn = ENTRY.unpack_from(self.map, i * ENTRY.size)
+            if entry_key != key:
+                break
+            move = decode_polyglot_move(board, value)
+            if move is not None:
+                found.append((move, weight, learn))
+        return found
+
+    def choose(self, board, rng=random, best=False):
+        """가중치에 비례해 무작위로 (best면 가중치가 가장 큰) 책의 수 하나, 없으면 None"""
+        entries = [entry for entry in self.entries(board) if entry[1] > 0]
+        if not entries:
+            return None
+        self.hits += 1
+        if best:
+            return max(entries, key=lambda entry: entry[1])[0]
+        return rng.choices([entry[0] for entry in entries], weights=[entry[1] for entry in entries])[0]
+
+
+# --- 만들기 ---
+def build_book(pgn_paths, out_path, plies=16, key_function=polyglot_key, min_count=1):
+    """PGN 게임들의 첫 plies 반수에서 (포지션, 수) 빈도를 세어 Polyglot 책으로 기록. 항목 수를 반환"""
+    from pgn import PGNError, open_pgn, parse_san, read_games, start_board
+
+    counts = Counter()
+    for path in pgn_paths:
+        with open_pgn(path) as stream:
+            for game in read_games(stream):
+                board = start_board(game.headers)
+                try:
+                    for san in game.moves[:plies]:
+                        move = parse_san(board, san)
+                        counts[key_function(board), encode_polyglot_move(board, move)] += 1
+                        board.make_move(move)
+                except PGNError:
+                    continue
+    entries = sorted((key, value, min(count, 0xFFFF)) for (key, value), count in counts.items() if count >= min_count)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for key, value, weight in entries:
+            f.write(ENTRY.pack(key, value, weight, 0))
+    os.replace(tmp_path, out_path)
+    return len(entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Polyglot 형식 오프닝북")
+    keys = parser.add_mutually_exclusive_group()
+    keys.add_argument('--random64', help=f"표준 표 대신 Polyglot key에 쓸 Random64 표 파일 (또는 {RANDOM64_ENV})")
+    keys.add_argument('--zobrist', action='store_true', help="이 프로젝트의 Zobrist 키로 된 내부용 책")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="PGN에서 책 만들기")
+    build.add_argument('pgn', nargs='+')
+    build.add_argument('out')
+    build.add_argument('--plies', type=int, default=16, help="게임마다 앞에서부터 넣을 반수")
+    build.add_argument('--min-count', type=int, default=1, help="이보다 적게 나온 수는 버림")
+    probe = sub.add_parser('probe', help="포지션의 책 수 보기")
+    probe.add_argument('book')
+    probe.add_argument('--fen')
+    args = parser.parse_args(argv)
+
+    key_function = zobrist_key if args.zobrist else polyglot_key_function(args.random64)
+    if args.command == 'build':
+        count = build_book(args.pgn, args.out, args.plies, key_function, args.min_count)
+        print(f"{count} entries → {args.out}")
+    else:
+        book = OpeningBook(args.book, key_function)
+        board = Board.from_fen(args.fen) if args.fen else Board()
+        for move, weight, learn in sorted(book.entries(board), key=lambda entry: -entry[1]):
+            print(f"{move_to_uci(move)}  weight {weight}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,789 @@
+"""pygame 없이 동작하는 체스 규칙 엔진 (64비트 비트보드 기반)
+
+칸 번호는 Game과 같은 (row, col) 배치를 그대로 따른다: sq = row * 8 + col.
+즉 0번 칸이 a8, 63번 칸이 h1이며, 백 폰은 번호가 줄어드는 방향으로 전진한다.
+"""
+import random
+
+from psqt import CODE_PHASE, PSQT
+
+# --- 색상 / 기물 ---
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+EMPTY = -1
+
+COLOR_CHARS = 'wb'
+PIECE_CHARS = 'PNBRQK'
+# 기물 코드 = color * 6 + piece_type, 문자열 표기는 Game에서 쓰던 'wP', 'bK' 형식
+PIECE_NAMES = [c + p for c in COLOR_CHARS for p in PIECE_CHARS]
+PIECE_CODES = {name: code for code, name in enumerate(PIECE_NAMES)}
+
+# --- 캐슬링 권한 비트 ---
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+CASTLING_KEYS = {'w_king': CASTLE_WK, 'w_queen': CASTLE_WQ, 'b_king': CASTLE_BK, 'b_queen': CASTLE_BQ}
+
+ALL_SQUARES = (1 << 64) - 1
+FILE_A = sum(1 << (r * 8) for r in range(8))
+FILE_H = FILE_A << 7
+RANK_3 = 0xFF << 40  # row 5: 백 폰 두 칸 전진의 중간 칸
+RANK_6 = 0xFF << 16  # row 2: 흑 폰 두 칸 전진의 중간 칸
+PROMOTION_RANKS = 0xFF | (0xFF << 56)
+LIGHT_SQUARES = sum(1 << sq for sq in range(64) if ((sq >> 3) + (sq & 7)) & 1 == 0)  # a8, h1 등 밝은 칸
+DARK_SQUARES = ALL_SQUARES ^ LIGHT_SQUARES
+
+
+def square(row, col):
+    return row * 8 + col
+
+
+def square_name(sq):
+    return chr(ord('a') + (sq & 7)) + str(8 - (sq >> 3))
+
+
+def parse_square(name):
+    return (8 - int(name[1])) * 8 + (ord(name[0]) - ord('a'))
+
+
+# --- 수(move) 인코딩: from | to << 6 | promotion << 12 ---
+def encode_move(from_sq, to_sq, promotion=0):
+    return from_sq | (to_sq << 6) | (promotion << 12)
+
+
+def move_from(move):
+    return move & 63
+
+
+def move_to(move):
+    return (move >> 6) & 63
+
+
+def move_promotion(move):
+    return move >> 12
+
+
+def move_to_uci(move):
+    uci = square_name(move & 63) + square_name((move >> 6) & 63)
+    promotion = move >> 12
+    if promotion:
+        uci += PIECE_CHARS[promotion].lower()
+    return uci
+
+
+def parse_uci(text):
+    """'e2e4', 'e7e8q' → 인코딩된 수 (합법인지는 검사하지 않는다). 형식이 틀리면 ValueError"""
+    if (len(text) not in (4, 5) or text[0] not in 'abcdefgh' or text[2] not in 'abcdefgh'
+            or text[1] not in '12345678' or text[3] not in '12345678' or text[4:] not in ('', 'n', 'b', 'r', 'q')):
+        raise ValueError(f"UCI 수 형식이 아님: {text}")
+    promotion = PIECE_CHARS.index(text[4].upper()) if len(text) == 5 else 0
+    return encode_move(parse_square(text[:2]), parse_square(text[2:4]), promotion)
+
+
+# --- 미리 계산된 공격 테이블 ---
+def _leaper_table(offsets):
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        bb = 0
+        for dr, dc in offsets:
+            r, c = row + dr, col + dc
+            if 0 <= r < 8 and 0 <= c < 8:
+                bb |= 1 << (r * 8 + c)
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_table([(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)])
+KING_ATTACKS = _leaper_table([(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc])
+# PAWN_ATTACKS[color][sq]: color 폰이 sq에서 공격하는 칸
+PAWN_ATTACKS = [_leaper_table([(-1, -1), (-1, 1)]), _leaper_table([(1, -1), (1, 1)])]
+
+# 방향별 광선. 번호가 증가하는 방향(양수)과 감소하는 방향(음수)을 나눠 두면
+# 첫 번째 가로막는 기물을 lsb/msb 한 번으로 찾을 수 있다.
+ROOK_DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def _ray_table(dr, dc):
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        bb = 0
+        r, c = row + dr, col + dc
+        while 0 <= r < 8 and 0 <= c < 8:
+            bb |= 1 << (r * 8 + c)
+            r, c = r + dr, c + dc
+        table.append(bb)
+    return table
+
+
+def _positive(dr, dc):
+    return dr * 8 + dc > 0
+
+
+ROOK_RAYS = [(_ray_table(dr, dc), _positive(dr, dc)) for dr, dc in ROOK_DIRECTIONS]
+BISHOP_RAYS = [(_ray_table(dr, dc), _positive(dr, dc)) for dr, dc in BISHOP_DIRECTIONS]
+
+
+def _relevant_mask(rays):
+    # 광선의 마지막 칸(가장자리)은 결과에 영향을 주지 않으므로 캐시 키에서 제외
+    masks = []
+    for sq in range(64):
+        mask = 0
+        for table, positive in rays:
+            ray = table[sq]
+            if ray:
+                edge = (ray.bit_length() - 1) if positive else ((ray & -ray).bit_length() - 1)
+                mask |= ray & ~(1 << edge)
+        masks.append(mask)
+    return masks
+
+
+ROOK_MASKS = _relevant_mask(ROOK_RAYS)
+BISHOP_MASKS = _relevant_mask(BISHOP_RAYS)
+
+
+def _slide(rays, sq, occupied):
+    attacks = 0
+    for table, positive in rays:
+        ray = table[sq]
+        blockers = ray & occupied
+        if blockers:
+            if positive:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= table[blocker]
+        attacks |= ray
+    return attacks
+
+
+# 슬라이딩 공격은 (칸, 관련 점유) 조합별로 메모이즈한다. 매직 비트보드와 같은 발상이지만
+# 곱셈 대신 dict 조회를 쓰고, 실제로 나온 조합만 계산하므로 시작 비용이 없다.
+_ROOK_CACHE = [{} for _ in range(64)]
+_BISHOP_CACHE = [{} for _ in range(64)]
+
+
+def rook_attacks(sq, occupied):
+    key = occupied & ROOK_MASKS[sq]
+    cache = _ROOK_CACHE[sq]
+    attacks = cache.get(key)
+    if attacks is None:
+        attacks = cache[key] = _slide(ROOK_RAYS, sq, key)
+    return attacks
+
+
+def bishop_attacks(sq, occupied):
+    key = occupied & BISHOP_MASKS[sq]
+    cache = _BISHOP_CACHE[sq]
+    attacks = cache.get(key)
+    if attacks is None:
+        attacks = cache[key] = _slide(BISHOP_RAYS, sq, key)
+    return attacks
+
+
+def iter_bits(bb):
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+def _between_table():
+    # BETWEEN[a][b]: 같은 직선/대각선 위 두 칸 사이의 칸들 (양 끝 제외, 직선이 아니면 0)
+    table = [[0] * 64 for _ in range(64)]
+    for rays in (ROOK_RAYS, BISHOP_RAYS):
+        for ray_table, _ in rays:
+            for sq in range(64):
+                for target in iter_bits(ray_table[sq]):
+                    table[sq][target] = ray_table[sq] & ~ray_table[target] & ~(1 << target)
+    return table
+
+
+BETWEEN = _between_table()
+
+
+# 기물이 from/to 칸을 지나가면 해당 캐슬링 권한이 사라진다
+CASTLE_MASK = [0xF] * 64
+CASTLE_MASK[square(7, 4)] &= ~(CASTLE_WK | CASTLE_WQ)
+CASTLE_MASK[square(7, 7)] &= ~CASTLE_WK
+CASTLE_MASK[square(7, 0)] &= ~CASTLE_WQ
+CASTLE_MASK[square(0, 4)] &= ~(CASTLE_BK | CASTLE_BQ)
+CASTLE_MASK[square(0, 7)] &= ~CASTLE_BK
+CASTLE_MASK[square(0, 0)] &= ~CASTLE_BQ
+# 캐슬링 권한이 유효하려면 있어야 하는 (칸, 기물 코드): 없으면 CASTLE_MASK[칸]으로 권한을 지운다
+CASTLE_HOMES = [(square(7, 4), KING), (square(7, 7), ROOK), (square(7, 0), ROOK),
+                (square(0, 4), 6 + KING), (square(0, 7), 6 + ROOK), (square(0, 0), 6 + ROOK)]
+
+# --- Zobrist 해시 난수 (고정 시드라 실행할 때마다 같은 키가 나온다) ---
+_zobrist_random = random.Random(0x5A0B1257)
+ZOBRIST_PIECES = [[_zobrist_random.getrandbits(64) for _ in range(64)] for _ in range(12)]
+ZOBRIST_CASTLING = [_zobrist_random.getrandbits(64) for _ in range(16)]
+ZOBRIST_EP_FILE = [_zobrist_random.getrandbits(64) for _ in range(8)]
+ZOBRIST_TURN = _zobrist_random.getrandbits(64)
+del _zobrist_random
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+START_BOARD = [
+    ['bR', 'bN', 'bB', 'bQ', 'bK', 'bB', 'bN', 'bR'],
+    ['bP', 'bP', 'bP', 'bP', 'bP', 'bP', 'bP', 'bP'],
+    ['--', '--', '--', '--', '--', '--', '--', '--'],
+    ['--', '--', '--', '--', '--', '--', '--', '--'],
+    ['--', '--', '--', '--', '--', '--', '--', '--'],
+    ['--', '--', '--', '--', '--', '--', '--', '--'],
+    ['wP', 'wP', 'wP', 'wP', 'wP', 'wP', 'wP', 'wP'],
+    ['wR', 'wN', 'wB', 'wQ', 'wK', 'wB', 'wN', 'wR'],
+]
+
+
+class Board:
+    """비트보드 기반 포지션과 수 생성기
+
+    make_move / unmake_move는 되돌리기 스택(history)을 사용하므로
+    탐색 중에 포지션을 복사할 필요가 없다.
+    """
+
+    def __init__(self, rows=None):
+        self.clear()
+        for row, line in enumerate(rows or START_BOARD):
+            for col, name in enumerate(line):
+                if name != '--':
+                    self.put_piece(PIECE_CODES[name], row * 8 + col)
+        if rows is None:
+            self.castling = CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ
+        self.key = self.compute_key()
+
+    @classmethod
+    def from_fen(cls, fen):
+        """FEN 문자열의 배치, 턴, 캐슬링 권한, 앙파상 칸으로 포지션 생성"""
+        fields = fen.split()
+        rows = []
+        for rank in fields[0].split('/'):
+            row = []
+            for char in rank:
+                if char.isdigit():
+                    row.extend(['--'] * int(char))
+                else:
+                    row.append(('w' if char.isupper() else 'b') + char.upper())
+            rows.append(row)
+        if len(rows) != 8 or any(len(row) != 8 for row in rows):
+            raise ValueError(f"잘못된 FEN 배치: {fields[0]}")
+        board = cls(rows)
+        board.turn = WHITE if len(fields) < 2 or fields[1] == 'w' else BLACK
+        castling = fields[2] if len(fields) > 2 else '-'
+        for char, bit in zip('KQkq', (CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ)):
+            if char in castling:
+                board.castling |= bit
+        # 킹/룩이 제자리에 없는 권한은 버린다 (있으면 generate_legal이 없는 룩으로 캐슬링을 만든다)
+        for sq, code in CASTLE_HOMES:
+            if board.squares[sq] != code:
+                board.castling &= CASTLE_MASK[sq]
+        if len(fields) > 3 and fields[3] != '-':
+            board.ep_square = parse_square(fields[3])
+        if len(fields) > 5:
+            board.halfmove_clock = int(fields[4])
+            board.fullmove_number = int(fields[5])
+        board.key = board.compute_key()
+        return board
+
+    def to_fen(self):
+        """현재 포지션의 FEN 문자열 (from_fen의 역)"""
+        ranks = []
+        for row in range(8):
+            rank = ''
+            empty = 0
+            for col in range(8):
+                code = self.squares[row * 8 + col]
+                if code == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                char = PIECE_CHARS[code % 6]
+                rank += char if code < 6 else char.lower()
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+        castling = ''.join(char for char, bit in zip('KQkq', (CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ))
+                           if self.castling & bit) or '-'
+        ep = square_name(self.ep_square) if self.ep_square >= 0 else '-'
+        return (f"{'/'.join(ranks)} {COLOR_CHARS[self.turn]} {castling} {ep} "
+                f"{self.halfmove_clock} {self.fullmove_number}")
+
+    def pack(self):
+        """프로세스 간 전달용 66바이트 직렬화 (position.Position과 같은 배치)
+
+        0~63: 칸별 기물 코드 + 1 (빈 칸 0), 64: 턴(비트 0) | 캐슬링 권한(비트 1~4), 65: 앙파상 칸 + 1
+        반수/수 번호와 수 기록은 포함하지 않는다 (반복/50수 판정이 필요하면 recent_keys와 함께 넘긴다).
+        """
+        return bytes([code + 1 for code in self.squares] + [self.turn | self.castling << 1, self.ep_square + 1])
+
+    def recent_keys(self):
+        """마지막 비가역 수 이후의 '수 두기 전 키' 목록 (반복 판정에 필요한 만큼만)"""
+        count = min(self.halfmove_clock, len(self.history))
+        return [entry[4] for entry in self.history[len(self.history) - count:]]
+
+    @classmethod
+    def unpack(cls, data, keys=(), halfmove_clock=0):
+        """pack()의 역. keys(recent_keys)와 halfmove_clock을 주면 반복/50수 판정용 기록도 되살린다
+
+        되살린 기록은 키만 들어 있는 자리표시이므로 그 이전으로 unmake_move할 수는 없다.
+        """
+        board = cls.__new__(cls)
+        board.clear()
+        for sq in range(64):
+            if data[sq]:
+                board.put_piece(data[sq] - 1, sq)
+        board.turn = data[64] & 1
+        board.castling = data[64] >> 1
+        board.ep_square = data[65] - 1
+        board.key = board.compute_key()
+        board.halfmove_clock = halfmove_clock
+        board.history = [(0, EMPTY, 0, -1, key, 0) for key in keys]
+        return board
+
+    def clear(self):
+        self.pieces = [0] * 12          # 기물 코드별 비트보드 (색상/종류별 기물 목록 역할)
+        self.occupied_by = [0, 0]       # 색상별 점유
+        self.squares = [EMPTY] * 64     # 칸별 기물 코드 (mailbox)
+        self.king_squares = [-1, -1]    # 색상별 킹 위치
+        self.turn = WHITE
+        self.castling = 0
+        self.ep_square = -1             # 앙파상으로 잡을 수 있는 도착 칸
+        self.key = 0                    # Zobrist 키 (put/remove/make_move에서 갱신)
+        self.psqt = 0                   # 백 기준 재료 + piece-square 점수, 중반/종반을 묶은 값 (psqt.pack_score)
+        self.phase = 0                  # 게임 단계 (기물별 PHASE_VALUES 합, 초기 포지션 24)
+        self.halfmove_clock = 0         # 마지막 폰 이동/잡기 이후 반수 (50수 규칙)
+        self.fullmove_number = 1
+        self.history = []               # (move, 잡힌 기물, 이전 캐슬링 권한, 이전 앙파상 칸, 이전 키, 이전 반수)
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.pieces = self.pieces[:]
+        board.occupied_by = self.occupied_by[:]
+        board.squares = self.squares[:]
+        board.king_squares = self.king_squares[:]
+        board.turn = self.turn
+        board.castling = self.castling
+        board.ep_square = self.ep_square
+        board.key = self.key
+        board.psqt = self.psqt
+        board.phase = self.phase
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        board.history = self.history[:]
+        return board
+
+    # --- 조회 ---
+    def put_piece(self, code, sq):
+        bit = 1 << sq
+        self.pieces[code] |= bit
+        self.occupied_by[code // 6] |= bit
+        self.squares[sq] = code
+        self.key ^= ZOBRIST_PIECES[code][sq]
+        self.psqt += PSQT[code][sq]
+        self.phase += CODE_PHASE[code]
+        if code % 6 == KING:
+            self.king_squares[code // 6] = sq
+
+    def remove_piece(self, sq):
+        code = self.squares[sq]
+        bit = 1 << sq
+        self.pieces[code] ^= bit
+        self.occupied_by[code // 6] ^= bit
+        self.squares[sq] = EMPTY
+        self.key ^= ZOBRIST_PIECES[code][sq]
+        self.psqt -= PSQT[code][sq]
+        self.phase -= CODE_PHASE[code]
+        return code
+
+    def piece_at(self, row, col):
+        """Game에서 쓰던 문자열 표기('wP', '--')로 칸의 기물을 반환"""
+        code = self.squares[row * 8 + col]
+        return PIECE_NAMES[code] if code != EMPTY else '--'
+
+    def rows(self):
+        return [[self.piece_at(r, c) for c in range(8)] for r in range(8)]
+
+    def compute_key(self):
+        """Zobrist 키를 처음부터 계산 (make_move가 갱신하는 키의 검증용)"""
+        key = 0
+        for sq, code in enumerate(self.squares):
+            if code != EMPTY:
+                key ^= ZOBRIST_PIECES[code][sq]
+        key ^= ZOBRIST_CASTLING[self.castling]
+        key ^= self._ep_key(self.ep_square, self.turn)
+        if self.turn == BLACK:
+            key ^= ZOBRIST_TURN
+        return key
+
+    def _ep_key(self, ep_square, color):
+        # 앙파상 칸은 color 폰이 실제로 잡을 수 있을 때만 키에 넣는다 (같은 포지션이 같은 키를 갖도록)
+        if ep_square >= 0 and PAWN_ATTACKS[color ^ 1][ep_square] & self.pieces[color * 6 + PAWN]:
+            return ZOBRIST_EP_FILE[ep_square & 7]
+        return 0
+
+    def king_square(self, color):
+        return self.king_squares[color]
+
+    # --- 공격 판정 ---
+    def attackers_to(self, sq, by_color, occupied=None):
+        """sq 칸을 공격하는 by_color 기물들의 비트보드 (sq에서 거꾸로 광선을 쏘는 방식)"""
+        if occupied is None:
+            occupied = self.occupied_by[0] | self.occupied_by[1]
+        base = by_color * 6
+        pieces = self.pieces
+        queens = pieces[base + QUEEN]
+        return ((PAWN_ATTACKS[by_color ^ 1][sq] & pieces[base + PAWN])
+                | (KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT])
+                | (KING_ATTACKS[sq] & pieces[base + KING])
+                | (bishop_attacks(sq, occupied) & (pieces[base + BISHOP] | queens))
+                | (rook_attacks(sq, occupied) & (pieces[base + ROOK] | queens)))
+
+    def is_square_attacked(self, sq, by_color):
+        return self.attackers_to(sq, by_color) != 0
+
+    def in_check(self, color=None):
+        if color is None:
+            color = self.turn
+        king = self.king_squares[color]
+        return king >= 0 and self.attackers_to(king, color ^ 1) != 0
+
+    # --- 무승부 판정 ---
+    def piece_counts(self):
+        """기물 코드별 개수 (기물 코드별 비트보드의 popcount라서 따로 갱신할 카운터가 필요 없다)"""
+        return [bb.bit_count() for bb in self.pieces]
+
+    def repetitions(self):
+        """현재 포지션이 마지막 비가역 수(폰 이동, 잡기) 이후 나온 횟수 (현재 포함)
+
+        history에 저장된 '수 두기 전 키'를 같은 차례끼리(2 ply 간격) 반수 시계만큼만 거슬러 본다.
+        """
+        history = self.history
+        key = self.key
+        count = 1
+        stop = len(history) - min(self.halfmove_clock, len(history)) - 1
+        for i in range(len(history) - 4, stop, -2): # 바로 2 ply 전은 같은 포지션일 수 없다
+            if history[i][4] == key:
+                count += 1
+        return count
+
+    def is_repetition(self):
+        """이전에 한 번이라도 나온 포지션인지 (탐색에서 무승부로 보는 조건)"""
+        if self.halfmove_clock < 4:
+            return False
+        history = self.history
+        key = self.key
+        stop = len(history) - min(self.halfmove_clock, len(history)) - 1
+        for i in range(len(history) - 4, stop, -2):
+            if history[i][4] == key:
+                return True
+        return False
+
+    def insufficient_material(self):
+        """어느 쪽도 메이트할 수 없는 기물 구성 (K 대 K, K+마이너 대 K, 같은 색 칸 비숍들만 남음)"""
+        pieces = self.pieces
+        if pieces[PAWN] | pieces[6 + PAWN] | pieces[ROOK] | pieces[6 + ROOK] | pieces[QUEEN] | pieces[6 + QUEEN]:
+            return False
+        knights = pieces[KNIGHT] | pieces[6 + KNIGHT]
+        bishops = pieces[BISHOP] | pieces[6 + BISHOP]
+        if (knights | bishops).bit_count() <= 1:
+            return True
+        return not knights and (not bishops & LIGHT_SQUARES or not bishops & DARK_SQUARES)
+
+    def draw_reason(self):
+        """규칙상 무승부면 'fifty-move', 'insufficient', 'threefold' 중 하나, 아니면 None
+
+        체크메이트가 50수 규칙보다 우선하므로 메이트 판정은 호출하는 쪽에서 먼저 한다.
+        """
+        if self.halfmove_clock >= 100:
+            return 'fifty-move'
+        if self.insufficient_material():
+            return 'insufficient'
+        if self.halfmove_clock >= 8 and self.repetitions() >= 3:
+            return 'threefold'
+        return None
+
+    def attack_map(self, color, occupied=None):
+        """color 기물들이 공격하는 모든 칸의 합집합"""
+        if occupied is None:
+            occupied = self.occupied_by[0] | self.occupied_by[1]
+        base = color * 6
+        pieces = self.pieces
+        pawns = pieces[base + PAWN]
+        if color == WHITE:
+            attacks = ((pawns & ~FILE_A) >> 9) | ((pawns & ~FILE_H) >> 7)
+        else:
+            attacks = (((pawns & ~FILE_A) << 7) | ((pawns & ~FILE_H) << 9)) & ALL_SQUARES
+        for sq in iter_bits(pieces[base + KNIGHT]):
+            attacks |= KNIGHT_ATTACKS[sq]
+        queens = pieces[base + QUEEN]
+        for sq in iter_bits(pieces[base + BISHOP] | queens):
+            attacks |= bishop_attacks(sq, occupied)
+        for sq in iter_bits(pieces[base + ROOK] | queens):
+            attacks |= rook_attacks(sq, occupied)
+        king = self.king_squares[color]
+        if king >= 0:
+            attacks |= KING_ATTACKS[king]
+        return attacks
+
+    def pinned(self, color):
+        """color 킹에 핀된 기물 비트보드와, 핀된 칸별로 움직일 수 있는 칸의 마스크"""
+        king = self.king_squares[color]
+        them = (color ^ 1) * 6
+        own = self.occupied_by[color]
+        occupied = own | self.occupied_by[color ^ 1]
+        pieces = self.pieces
+        queens = pieces[them + QUEEN]
+        snipers = ((rook_attacks(king, 0) & (pieces[them + ROOK] | queens))
+                   | (bishop_attacks(king, 0) & (pieces[them + BISHOP] | queens)))
+        pinned = 0
+        pin_masks = {}
+        between_king = BETWEEN[king]
+        for sniper in iter_bits(snipers):
+            blockers = between_king[sniper] & occupied
+            # 사이에 자기 기물이 정확히 하나만 있으면 핀
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+                pin_masks[blockers.bit_length() - 1] = between_king[sniper] | (1 << sniper)
+        return pinned, pin_masks
+
+    def piece_attacks(self, code, sq, occupied=None):
+        """기물이 sq에서 공격하는 칸 (폰은 대각선 공격만)"""
+        if occupied is None:
+            occupied = self.occupied_by[0] | self.occupied_by[1]
+        piece_type = code % 6
+        if piece_type == PAWN:
+            return PAWN_ATTACKS[code // 6][sq]
+        if piece_type == KNIGHT:
+            return KNIGHT_ATTACKS[sq]
+        if piece_type == BISHOP:
+            return bishop_attacks(sq, occupied)
+        if piece_type == ROOK:
+            return rook_attacks(sq, occupied)
+        if piece_type == QUEEN:
+            return bishop_attacks(sq, occupied) | rook_attacks(sq, occupied)
+        return KING_ATTACKS[sq]
+
+    # --- 수 생성 ---
+    def generate_legal(self):
+        """합법수 목록. 수를 두어 보는 대신 체크 마스크와 핀 마스크로 걸러낸다."""
+        moves = []
+        us = self.turn
+        them = us ^ 1
+        base = us * 6
+        own = self.occupied_by[us]
+        enemy = self.occupied_by[them]
+        occupied = own | enemy
+        not_own = ~own & ALL_SQUARES
+        pieces = self.pieces
+        king = self.king_squares[us]
+
+        # 킹: 킹을 뺀 점유로 상대 공격 범위를 구해야 광선 뒤쪽 칸으로 물러나는 수를 막을 수 있다
+        king_bit = 1 << king
+        danger = self.attack_map(them, occupied ^ king_bit)
+        for to in iter_bits(KING_ATTACKS[king] & not_own & ~danger):
+            moves.append(king | (to << 6))
+
+        checkers = self.attackers_to(king, them, occupied)
+        if checkers & (checkers - 1):
+            return moves  # 이중 체크면 킹만 움직일 수 있다
+        if checkers:
+            checker = checkers.bit_length() - 1
+            target_mask = BETWEEN[king][checker] | checkers
+        else:
+            target_mask = ALL_SQUARES
+            self._add_castle_moves(moves, king, occupied, danger)
+
+        pinned, pin_masks = self.pinned(us)
+        movable = not_own & target_mask
+
+        # 나이트 (핀된 나이트는 움직일 수 없다)
+        for frm in iter_bits(pieces[base + KNIGHT] & ~pinned):
+            for to in iter_bits(KNIGHT_ATTACKS[frm] & movable):
+                moves.append(frm | (to << 6))
+        # 슬라이더
+        queens = pieces[base + QUEEN]
+        for frm in iter_bits(pieces[base + BISHOP] | queens):
+            targets = bishop_attacks(frm, occupied) & movable
+            if pinned >> frm & 1:
+                targets &= pin_masks[frm]
+            for to in iter_bits(targets):
+                moves.append(frm | (to << 6))
+        for frm in iter_bits(pieces[base + ROOK] | queens):
+            targets = rook_attacks(frm, occupied) & movable
+            if pinned >> frm & 1:
+                targets &= pin_masks[frm]
+            for to in iter_bits(targets):
+                moves.append(frm | (to << 6))
+
+        # 폰: 핀되지 않은 폰은 집합 단위 시프트로, 핀된 폰은 하나씩
+        pawns = pieces[base + PAWN]
+        free_pawns = pawns & ~pinned
+        empty = ~occupied & ALL_SQUARES
+        if us == WHITE:
+            single = (free_pawns >> 8) & empty
+            double = ((single & RANK_3) >> 8) & empty
+            push = 8
+            left = ((free_pawns & ~FILE_A) >> 9) & enemy
+            right = ((free_pawns & ~FILE_H) >> 7) & enemy
+            left_from, right_from = 9, 7
+        else:
+            single = (free_pawns << 8) & empty
+            double = ((single & RANK_6) << 8) & empty
+            push = -8
+            left = ((free_pawns & ~FILE_A) << 7) & enemy & ALL_SQUARES
+            right = ((free_pawns & ~FILE_H) << 9) & enemy & ALL_SQUARES
+            left_from, right_from = -7, -9
+        self._add_pawn_moves(moves, single & target_mask, push)
+        for to in iter_bits(double & target_mask):
+            moves.append((to + 2 * push) | (to << 6))
+        self._add_pawn_moves(moves, left & target_mask, left_from)
+        self._add_pawn_moves(moves, right & target_mask, right_from)
+        for frm in iter_bits(pawns & pinned):
+            one = frm - push
+            targets = PAWN_ATTACKS[us][frm] & enemy
+            if not occupied >> one & 1:
+                targets |= 1 << one
+                two = one - push
+                if (frm >> 3) == (6 if us == WHITE else 1) and not occupied >> two & 1:
+                    targets |= 1 << two
+            for to in iter_bits(targets & target_mask & pin_masks[frm]):
+                if (1 << to) & PROMOTION_RANKS:
+                    for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        moves.append(frm | (to << 6) | (promotion << 12))
+                else:
+                    moves.append(frm | (to << 6))
+        if self.ep_square >= 0:
+            # 앙파상은 두 폰이 같은 행에서 동시에 사라지므로 직접 두어 보고 확인한다
+            for frm in iter_bits(PAWN_ATTACKS[them][self.ep_square] & pawns):
+                move = frm | (self.ep_square << 6)
+                self.make_move(move)
+                if not self.in_check(us):
+                    moves.append(move)
+                self.unmake_move()
+        return moves
+
+    def _add_pawn_moves(self, moves, targets, offset):
+        for to in iter_bits(targets):
+            frm = to + offset
+            if (1 << to) & PROMOTION_RANKS:
+                for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                    moves.append(frm | (to << 6) | (promotion << 12))
+            else:
+                moves.append(frm | (to << 6))
+
+    def _add_castle_moves(self, moves, king, occupied, danger):
+        if self.turn == WHITE:
+            king_side, queen_side = CASTLE_WK, CASTLE_WQ
+        else:
+            king_side, queen_side = CASTLE_BK, CASTLE_BQ
+        if self.castling & king_side and not occupied & ((1 << (king + 1)) | (1 << (king + 2))):
+            if not danger & ((1 << (king + 1)) | (1 << (king + 2))):
+                moves.append(king | ((king + 2) << 6))
+        if self.castling & queen_side and not occupied & ((1 << (king - 1)) | (1 << (king - 2)) | (1 << (king - 3))):
+            if not danger & ((1 << (king - 1)) | (1 << (king - 2))):
+                moves.append(king | ((king - 2) << 6))
+
+    def legal_moves_from(self, sq):
+        return [move for move in self.generate_legal() if move & 63 == sq]
+
+    def find_move(self, from_sq, to_sq, promotion=0):
+        for move in self.generate_legal():
+            if move & 63 == from_sq and (move >> 6) & 63 == to_sq and move >> 12 == promotion:
+                return move
+        return None
+
+    # --- 수 적용 / 되돌리기 ---
+    def is_capture(self, move):
+        to = (move >> 6) & 63
+        if self.squares[to] != EMPTY:
+            return True
+        return to == self.ep_square and self.squares[move & 63] % 6 == PAWN
+
+    def make_move(self, move):
+        frm = move & 63
+        to = (move >> 6) & 63
+        promotion = move >> 12
+        us = self.turn
+        squares = self.squares
+        old_key = self.key
+        old_castling = self.castling
+        # 이전 앙파상 / 턴 성분을 먼저 키에서 뺀다
+        self.key ^= self._ep_key(self.ep_square, us) ^ ZOBRIST_TURN
+
+        code = self.remove_piece(frm)
+        piece_type = code % 6
+        captured = squares[to]
+        if captured != EMPTY:
+            self.remove_piece(to)
+        elif piece_type == PAWN and to == self.ep_square:
+            # 앙파상: 잡히는 폰은 도착 칸이 아니라 출발 행에 있다
+            captured = self.remove_piece((frm & ~7) | (to & 7)) + 12
+        self.history.append((move, captured, old_castling, self.ep_square, old_key, self.halfmove_clock))
+        self.put_piece(us * 6 + promotion if promotion else code, to)
+
+        # 캐슬링 시 룩 이동
+        if piece_type == KING and abs(to - frm) == 2:
+            if to > frm:
+                self.put_piece(self.remove_piece(to + 1), to - 1)
+            else:
+                self.put_piece(self.remove_piece(to - 2), to + 1)
+
+        if piece_type == PAWN and abs(to - frm) == 16:
+            self.ep_square = (frm + to) // 2
+        else:
+            self.ep_square = -1
+        self.castling &= CASTLE_MASK[frm] & CASTLE_MASK[to]
+        self.halfmove_clock = 0 if piece_type == PAWN or captured != EMPTY else self.halfmove_clock + 1
+        self.fullmove_number += us
+        self.turn = us ^ 1
+        self.key ^= ZOBRIST_CASTLING[old_castling] ^ ZOBRIST_CASTLING[self.castling]
+        self.key ^= self._ep_key(self.ep_square, us ^ 1)
+
+    def unmake_move(self):
+        """마지막 make_move를 되돌리고 그 수를 반환"""
+        move, captured, castling, ep_square, key, self.halfmove_clock = self.history.pop()
+        frm = move & 63
+        to = (move >> 6) & 63
+        us = self.turn ^ 1
+        self.turn = us
+        self.fullmove_number -= us
+
+        code = self.remove_piece(to)
+        if move >> 12:
+            code = us * 6 + PAWN
+        self.put_piece(code, frm)
+        if captured >= 12:
+            # 앙파상으로 잡힌 폰 (captured에 12를 더해 표시해 둠)
+            self.put_piece(captured - 12, (frm & ~7) | (to & 7))
+        elif captured != EMPTY:
+            self.put_piece(captured, to)
+
+        if code % 6 == KING and abs(to - frm) == 2:
+            if to > frm:
+                self.put_piece(self.remove_piece(to - 1), to + 1)
+            else:
+                self.put_piece(self.remove_piece(to + 1), to - 2)
+
+        self.castling = castling
+        self.ep_square = ep_square
+        self.key = key
+        return move
+
+
+# --- 게임 종료 판정 (Game, 대국 서버, 토너먼트가 같은 규칙을 쓰도록 한 곳에 둔다) ---
+def game_outcome(board, index):
+    """(PGN 결과, 이유) 또는 진행 중이면 None
+
+    index는 board의 transposition.LegalMoveIndex (status가 'checkmate'/'stalemate'/None).
+    체크메이트/스테일메이트 → 3회 동형, 50수 규칙, 기물 부족 순으로 판정한다.
+    """
+    if index.status == 'checkmate':
+        return ('1-0' if board.turn == BLACK else '0-1'), 'checkmate'
+    if index.status == 'stalemate':
+        return '1/2-1/2', 'stalemate'
+    reason = board.draw_reason()
+    if reason:
+        return '1/2-1/2', reason
+    return None
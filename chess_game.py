@@ -1,6 +1,20 @@
 import pygame
-import requests
 import io
+import argparse
+import queue
+import threading
+import time
+
+from chess_engine import Board, CASTLING_KEYS, COLOR_CHARS, EMPTY, PIECE_CHARS, PIECE_NAMES, START_FEN, game_outcome, move_from, move_promotion, move_to, move_to_uci, parse_uci, square
+from search import SearchThread, format_pv, format_score
+from sprite_cache import SpriteCache
+from render_cache import RenderCache
+from move_log_panel import MoveLogPanel
+from pgn import game_headers, move_to_san, open_pgn, parse_san, read_games, write_game
+from transposition import LegalMoveCache, LegalMoveIndex
+from book import OpeningBook
+from tablebase import DEFAULT_TABLE_DIR, EndgameTables
+from net_client import NetworkClient
 
 # --- 기본 상수 ---
 BOARD_WIDTH, HEIGHT = 800, 800
@@ -8,6 +22,11 @@ LOG_WIDTH = 250
 WIDTH = BOARD_WIDTH + LOG_WIDTH
 ROWS, COLS = 8, 8
 SQUARE_SIZE = BOARD_WIDTH // COLS
+FPS = 60 # 화면 갱신 상한
+ENGINE_INFO_HEIGHT = 180 # 기보 패널 아래 엔진 정보 영역 (최대 5줄)
+PROFILE_RECT = (0, 0, 250, 70) # --profile 계측 오버레이 (보드 왼쪽 위)
+PROFILE_SQUARES = {sq for sq in range(64) if sq // 8 * SQUARE_SIZE < PROFILE_RECT[3] and sq % 8 * SQUARE_SIZE < PROFILE_RECT[2]}
+PROFILE_REFRESH = 0.25 # 오버레이 수치를 바꾸는 간격(초)
 
 # --- 색상 ---
 WHITE = (255, 255, 255)
@@ -17,6 +36,32 @@ DARK_SQUARE = (118, 150, 86)
 HIGHLIGHT_COLOR = (255, 255, 51, 150)
 HIGHLIGHT_MOVE_COLOR = (105, 105, 105, 150) # 투명도 추가
 HIGHLIGHT_CAPTURE_COLOR = (255, 0, 0, 150) # 캡처 색상
+INFO_COLOR = (180, 180, 180)
+GAME_OVER_OVERLAY_COLOR = (0, 0, 0, 128)
+
+# 화면에 표시하는 결과 → PGN 결과 표기
+DRAW_RESULTS = {'threefold': "무승부 (3회 동형)", 'fifty-move': "무승부 (50수 규칙)", 'insufficient': "무승부 (기물 부족)"}
+# 탐색 없이 둔 수의 출처 → 기보에 붙이는 표시
+MOVE_SOURCE_TAGS = {'book': "(북)", 'tables': "(TB)"}
+# 대국 서버가 알려 주는 기권/연결 끊김 (메이트, 무승부 규칙은 서버와 같은 규칙으로 여기서도 판정한다)
+REMOTE_RESULTS = {('1-0', 'resign'): "백 승리 (기권)", ('0-1', 'resign'): "흑 승리 (기권)",
+                  ('1-0', 'disconnect'): "백 승리 (연결 끊김)", ('0-1', 'disconnect'): "흑 승리 (연결 끊김)"}
+WIN_RESULTS = {'1-0': "백 승리", '0-1': "흑 승리"}
+PGN_RESULTS = {"백 승리": '1-0', "흑 승리": '0-1', "스테일메이트": '1/2-1/2', **dict.fromkeys(DRAW_RESULTS.values(), '1/2-1/2'),
+               **{text: result for (result, _), text in REMOTE_RESULTS.items()}}
+
+
+def result_text(result, reason):
+    """chess_engine.game_outcome 또는 대국 서버의 (PGN 결과, 이유) → 화면에 표시하는 결과"""
+    return REMOTE_RESULTS.get((result, reason)) or DRAW_RESULTS.get(reason) or WIN_RESULTS.get(result, "스테일메이트")
+
+# --- 글꼴 (이름, 크기, 굵게): RenderCache가 한 번만 불러옴 ---
+LABEL_FONT = ('arial', 18, True)
+LOG_FONT = ('malgungothic', 20, False)
+PROMOTION_FONT = ('arial', 40, True)
+PROFILE_FONT = (None, 22, False) # 내장 글꼴 (계측 중에 시스템 글꼴 검색 비용이 끼지 않도록)
+RESULT_FONT = ('malgungothic', 60, True)
+BUTTON_FONT = ('malgungothic', 40, False)
 
 # --- 포켓몬 매핑 ---
 POKEMON_MAPPING = {
@@ -24,434 +69,444 @@ POKEMON_MAPPING = {
     'bK': 'nidoqueen', 'bQ': 'houndoom', 'bB': 'gengar', 'bN': 'absol', 'bR': 'steelix', 'bP': 'meowth'
 }
 
-def load_pokemon_sprites(mapping):
-    """PokeAPI에서 포켓몬 스프라이트를 다운로드하여 Pygame Surface 객체로 변환"""
+def scale_sprite(png, size):
+    """원본 PNG를 칸 크기로 줄인 PNG bytes로 변환 (디스크 캐시에 저장할 형태)"""
+    surface = pygame.image.load(io.BytesIO(png), 'sprite.png')
+    scaled_surface = pygame.transform.scale(surface, size)
+    buffer = io.BytesIO()
+    pygame.image.save(scaled_surface, buffer, 'sprite.png')
+    return buffer.getvalue()
+
+def load_pokemon_sprites(mapping, on_sprite, progress=None, cache=None):
+    """포켓몬 스프라이트를 디스크 캐시(없으면 PokeAPI 병렬 다운로드)에서 읽어 준비되는 대로 on_sprite로 전달
+
+    백그라운드 스레드에서 실행된다. Surface 변환(convert_alpha)은 화면 스레드에서 해야 하므로
+    여기서는 칸 크기로 줄인 PNG bytes만 넘긴다.
+    """
+    cache = cache or SpriteCache()
+    cache.load(mapping, (SQUARE_SIZE, SQUARE_SIZE), scale_sprite, progress, on_sprite=on_sprite)
+
+def make_fallback_sprites(mapping):
+    """스프라이트가 도착하기 전(또는 오프라인일 때) 쓸 기본 그림: 팀 색 원 + 기물 글자"""
+    font = pygame.font.Font(None, SQUARE_SIZE // 2) # 내장 폰트라 시스템 폰트 검색이 없다
     sprites = {}
-    for piece, name in mapping.items():
-        print(f"Downloading sprite for {name}...")
-        try:
-            # 1. 포켓몬 정보 요청
-            res = requests.get(f"https://pokeapi.co/api/v2/pokemon/{name}")
-            res.raise_for_status()
-            data = res.json()
-            
-            # 2. 스프라이트 URL 가져오기
-            sprite_url = data['sprites']['front_default']
-            
-            # 3. 이미지 데이터 다운로드
-            img_res = requests.get(sprite_url)
-            img_res.raise_for_status()
-            img_data = img_res.content
-            
-            # 4. 이미지 데이터를 Pygame Surface로 변환
-            img_file = io.BytesIO(img_data)
-            surface = pygame.image.load(img_file).convert_alpha()
-            
-            # 5. 크기 조절
-            scaled_surface = pygame.transform.scale(surface, (SQUARE_SIZE, SQUARE_SIZE))
-            sprites[piece] = scaled_surface
-            print(f"Success: {name}")
-
-        except requests.exceptions.RequestException as e:
-            print(f"Error downloading {name}: {e}")
-            sprites[piece] = None # 실패 시 None 저장
-            
+    for piece in mapping:
+        fill, text_color = (WHITE, BLACK) if piece.startswith('w') else (BLACK, WHITE)
+        surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+        center = (SQUARE_SIZE // 2, SQUARE_SIZE // 2)
+        pygame.draw.circle(surface, fill, center, SQUARE_SIZE // 3)
+        pygame.draw.circle(surface, text_color, center, SQUARE_SIZE // 3, 2)
+        glyph = font.render(piece[1], True, text_color)
+        surface.blit(glyph, glyph.get_rect(center=center))
+        sprites[piece] = surface
     return sprites
 
 class Game:
-    def __init__(self, win):
+    def __init__(self, win, ai_color=None, movetime=1.0, workers=1, start_fen=START_FEN, book=None, tables=None,
+                 remote=None, instrumentation=None, load_sprites=True):
         self.win = win
-        self.board = self.setup_board()
+        self.start_fen = start_fen # 재시작할 때 돌아갈 포지션
+        self.ai_color = ai_color # 컴퓨터가 두는 색 ('w', 'b' 또는 None)
+        self.ai_movetime = movetime # 컴퓨터의 한 수당 생각 시간(초)
+        self.ai = None
+        if ai_color:
+            searcher = None
+            if workers > 1:
+                # 작업자가 둘 이상이면 프로세스 풀에서 루트 분할 병렬 탐색 (필요할 때만 import)
+                from parallel_search import ParallelSearcher
+                searcher = ParallelSearcher(workers)
+            self.ai = SearchThread(searcher)
+        # 컴퓨터는 탐색하기 전에 오프닝북, 엔드게임 테이블 순으로 먼저 찾아본다 (둘 다 mmap이라 여는 비용은 없다)
+        self.book = OpeningBook(book) if book and self.ai else None
+        self.tables = EndgameTables(tables) if tables and self.ai else None
+        self.known_move = None # 북/테이블에서 찾은 (수, 출처), 다음 update에서 둔다
+        self.remote = remote # 대국 서버에 연결한 NetworkClient (네트워크 대국일 때)
+        self.remote_color = None # 서버가 정해 준 이쪽 색 ('w', 'b', 짝이 정해지기 전에는 None)
+        self.remote_pending = None # 서버로 보내고 ok를 기다리는 이쪽 수 (받기 전에는 보드에 두지 않는다)
+        self.instrumentation = instrumentation # --profile일 때 instrumentation.Instrumentation (오버레이 표시)
+        self.profile_backdrop = None # 오버레이 밑에 있던 화면 (오버레이만 다시 그릴 때 복원)
+        self.profile_lines = []
+        self.profile_refreshed = 0.0
+        self.position = self.setup_board() # 턴, 캐슬링 권한, 앙파상 정보까지 포함한 엔진 포지션
+        self.move_cache = LegalMoveCache() # Zobrist 키별 합법수 캐시
+        self._legal_index = None # 현재 포지션의 출발 칸별 합법수 (수를 두거나 리셋할 때만 비움)
         self.selected_piece = None
-        self.turn = 'w'
         self.valid_moves = []
         self.move_log = []
-        self.en_passant_possible = () # 앙파상 가능한 좌표, (row, col)
         self.promotion_pending = None # 폰 승급 대기 중인 위치, (row, col)
-        self.castling_rights = {'w_king': True, 'w_queen': True, 'b_king': True, 'b_queen': True}
+        self.promotion_start = None # 승급 대기 중인 폰의 출발 위치, (row, col)
         self.game_over = False
         self.game_result = ""
-        self.label_font = pygame.font.SysFont('arial', 18, bold=True)
-        self.log_font = pygame.font.SysFont('malgungothic', 20)
-        self.piece_sprites = self.show_loading_screen()
-
-    def reset_game(self):
-        """게임을 초기 상태로 리셋"""
-        self.board = self.setup_board()
+        self.render_cache = RenderCache() # 글꼴, 글자, 하이라이트 Surface 재사용
+        self.board_surface = self.render_board_background() # 64칸 배경은 한 번만 그려 둠
+        self.label_glyphs = {piece: self.render_label(piece) for piece in POKEMON_MAPPING}
+        self.log_panel = MoveLogPanel((BOARD_WIDTH, 0, LOG_WIDTH, HEIGHT), self.render_cache, LOG_FONT, WHITE)
+        if self.ai:
+            self.log_panel.bottom_margin = ENGINE_INFO_HEIGHT # 엔진 정보 자리는 비워 둔다
+        self.rendered_squares = [None] * 64 # 마지막으로 화면에 그린 칸별 상태 (바뀐 칸만 다시 그림)
+        self.rendered_overlay = None
+        self.rendered_panel = None
+        self.full_redraw = True
+        self.piece_sprites = make_fallback_sprites(POKEMON_MAPPING)
+        self.sprite_queue = queue.Queue() # 로딩 스레드 → 화면 스레드로 넘어오는 (piece, png bytes)
+        self.sprite_progress = (0, 0)
+        if load_sprites: # False면 기본 그림만 쓴다 (헤드리스 계측이 디스크 캐시/PokeAPI 다운로드를 타지 않도록)
+            self.start_sprite_loading()
+        self.start_ai_turn()
+
+    def reset_game(self, start_ai=True):
+        """게임을 초기 상태로 리셋 (start_ai가 False면 컴퓨터 차례여도 탐색을 시작하지 않는다)"""
+        self.position = self.setup_board()
+        self._legal_index = None
+        self.known_move = None
         self.selected_piece = None
-        self.turn = 'w'
         self.valid_moves = []
         self.move_log = []
-        self.en_passant_possible = ()
+        self.log_panel.clear()
         self.promotion_pending = None
-        self.castling_rights = {'w_king': True, 'w_queen': True, 'b_king': True, 'b_queen': True}
+        self.promotion_start = None
         self.game_over = False
         self.game_result = ""
-
-    def show_loading_screen(self):
-        """로딩 화면을 표시하고 포켓몬 스프라이트를 로드"""
-        self.win.fill(BLACK)
-        font = pygame.font.SysFont('malgungothic', 40)
-        text = font.render("포켓몬을 불러오는 중...", True, WHITE)
-        text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-        self.win.blit(text, text_rect)
-        pygame.display.flip()
-        
-        # 실제 스프라이트 로딩
-        return load_pokemon_sprites(POKEMON_MAPPING)
+        self.remote_pending = None
+        self.full_redraw = True
+        if self.ai:
+            self.ai.stop()
+            self.ai.info = None
+        if start_ai:
+            self.start_ai_turn()
+
+    def start_sprite_loading(self):
+        """첫 프레임을 막지 않도록 백그라운드 스레드에서 포켓몬 스프라이트 로드 시작"""
+        def progress(done, total, name):
+            self.sprite_progress = (done, total)
+
+        def on_sprite(piece, png):
+            self.sprite_queue.put((piece, png))
+
+        thread = threading.Thread(target=load_pokemon_sprites, args=(POKEMON_MAPPING, on_sprite, progress), daemon=True)
+        thread.start()
+
+    def receive_sprites(self):
+        """도착한 스프라이트를 Surface로 바꿔 기본 그림 대신 끼워 넣음"""
+        while True:
+            try:
+                piece, png = self.sprite_queue.get_nowait()
+            except queue.Empty:
+                return
+            # 이미 칸 크기로 줄여 둔 PNG라 디코딩만 하면 된다
+            self.piece_sprites[piece] = pygame.image.load(io.BytesIO(png), 'sprite.png').convert_alpha()
+            self.full_redraw = True
 
     def setup_board(self):
-        # ... (기존과 동일)
-        board = [
-            ['bR', 'bN', 'bB', 'bQ', 'bK', 'bB', 'bN', 'bR'],
-            ['bP', 'bP', 'bP', 'bP', 'bP', 'bP', 'bP', 'bP'],
-            ['--', '--', '--', '--', '--', '--', '--', '--'],
-            ['--', '--', '--', '--', '--', '--', '--', '--'],
-            ['--', '--', '--', '--', '--', '--', '--', '--'],
-            ['--', '--', '--', '--', '--', '--', '--', '--'],
-            ['wP', 'wP', 'wP', 'wP', 'wP', 'wP', 'wP', 'wP'],
-            ['wR', 'wN', 'wB', 'wQ', 'wK', 'wB', 'wN', 'wR']
-        ]
-        return board
+        """시작 포지션(기본은 초기 배치, --fen으로 지정 가능)의 엔진 포지션 생성"""
+        return Board.from_fen(self.start_fen)
 
-    def draw_board(self):
-        # ... (기존과 동일)
+    def render_board_background(self):
+        """칸 색을 칠한 보드 배경 Surface"""
+        surface = pygame.Surface((BOARD_WIDTH, HEIGHT))
         for row in range(ROWS):
             for col in range(COLS):
                 color = LIGHT_SQUARE if (row + col) % 2 == 0 else DARK_SQUARE
-                pygame.draw.rect(self.win, color, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-
-    def draw_pieces(self):
-        """다운로드한 포켓몬 이미지와 기물 텍스트를 보드에 그림"""
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != '--':
-                    # 포켓몬 스프라이트 그리기
-                    sprite = self.piece_sprites.get(piece)
-                    if sprite:
-                        rect = sprite.get_rect(center=(col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2))
-                        self.win.blit(sprite, rect)
-
-                    # 기물 종류(Q, R 등)를 팀 색상에 맞게 그리기
-                    piece_type = piece[1]
-                    pos = (col * SQUARE_SIZE + 5, row * SQUARE_SIZE + 5)
-
-                    if piece.startswith('w'):
-                        # 흰색 글씨에 검은 테두리 추가
-                        border_surface = self.label_font.render(piece_type, True, BLACK)
-                        offsets = [(-1, 0), (1, 0), (0, -1), (0, 1)] # 상하좌우
-                        for dx, dy in offsets:
-                            self.win.blit(border_surface, (pos[0] + dx, pos[1] + dy))
-
-                        # 원래 흰색 글씨 그리기
-                        text_surface = self.label_font.render(piece_type, True, WHITE)
-                        self.win.blit(text_surface, pos)
-                    else:
-                        # 검은색 글씨는 그대로 그리기
-                        text_surface = self.label_font.render(piece_type, True, BLACK)
-                        self.win.blit(text_surface, pos)
-
-    def draw_valid_moves(self):
+                pygame.draw.rect(surface, color, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        return surface
+
+    def render_label(self, piece):
+        """기물 종류 글자(Q, R 등)를 팀 색상으로 렌더링. 흰색 글씨는 검은 테두리까지 합쳐 한 장으로 만듦"""
+        piece_type = piece[1]
+        border_surface = self.render_cache.text(piece_type, LABEL_FONT, BLACK)
+        if not piece.startswith('w'):
+            return border_surface
+        text_surface = self.render_cache.text(piece_type, LABEL_FONT, WHITE)
+        width, height = text_surface.get_size()
+        surface = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
+        offsets = [(-1, 0), (1, 0), (0, -1), (0, 1)] # 상하좌우
+        for dx, dy in offsets:
+            surface.blit(border_surface, (1 + dx, 1 + dy))
+        surface.blit(text_surface, (1, 1))
+        return surface
+
+    def square_states(self):
+        """칸별로 화면에 보여야 할 상태 (기물 코드, 하이라이트 종류). 이전 프레임과 비교해 바뀐 칸만 그린다"""
+        highlights = [0] * 64
         if self.selected_piece:
-            # 선택된 칸 하이라이트
-            highlight_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-            highlight_surface.fill(HIGHLIGHT_COLOR)
-            r, c = self.selected_piece[1]
-            self.win.blit(highlight_surface, (c * SQUARE_SIZE, r * SQUARE_SIZE))
-            
-            # 유효한 움직임 표시
+            piece, (r, c) = self.selected_piece
+            highlights[r * 8 + c] = 1
+            en_passant = self.en_passant_possible if piece[1] == 'P' else None # 앙파상은 폰만 잡을 수 있다
             for move in self.valid_moves:
                 r, c = move
-                is_capture = self.board[r][c] != '--' or move == self.en_passant_possible
-                color = HIGHLIGHT_CAPTURE_COLOR if is_capture else HIGHLIGHT_MOVE_COLOR
-                
-                # 원을 그릴 Surface 생성
-                circle_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-                pygame.draw.circle(circle_surface, color, (SQUARE_SIZE // 2, SQUARE_SIZE // 2), 15)
-                self.win.blit(circle_surface, (c * SQUARE_SIZE, r * SQUARE_SIZE))
-
-    # --- 나머지 게임 로직 (select_piece, move_piece, get_valid_moves, handle_click)은 기존과 거의 동일 ---
-    # (이 부분은 생략하고 기존 코드를 그대로 사용한다고 가정)
+                is_capture = self.position.piece_at(r, c) != '--' or move == en_passant
+                highlights[r * 8 + c] = 3 if is_capture else 2
+        return list(zip(self.position.squares, highlights))
+
+    def draw_board(self):
+        self.win.blit(self.board_surface, (0, 0))
+
+    def draw_square(self, row, col, state):
+        """칸 하나를 배경, 하이라이트, 포켓몬 스프라이트, 기물 글자 순서로 그림"""
+        code, highlight = state
+        rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+        self.win.blit(self.board_surface, rect, rect)
+
+        if highlight == 1:
+            # 선택된 칸 하이라이트
+            self.win.blit(self.render_cache.highlight(HIGHLIGHT_COLOR, rect.size), rect)
+        elif highlight:
+            # 유효한 움직임 표시
+            color = HIGHLIGHT_CAPTURE_COLOR if highlight == 3 else HIGHLIGHT_MOVE_COLOR
+            self.win.blit(self.render_cache.circle(color, rect.size, 15), rect)
+
+        if code != EMPTY:
+            piece = PIECE_NAMES[code]
+            # 포켓몬 스프라이트 그리기
+            sprite = self.piece_sprites.get(piece)
+            if sprite:
+                self.win.blit(sprite, sprite.get_rect(center=rect.center))
+            # 기물 종류(Q, R 등)를 팀 색상에 맞게 그리기 (흰색은 테두리 1px만큼 왼쪽 위로)
+            offset = 4 if piece.startswith('w') else 5
+            self.win.blit(self.label_glyphs[piece], (rect.x + offset, rect.y + offset))
+        return rect
+
+    # --- 게임 로직: 규칙 계산은 모두 chess_engine.Board에 위임 ---
+    @property
+    def board(self):
+        """기존 코드 호환용 8x8 문자열 보드 (호출할 때마다 새로 만듦)"""
+        return self.position.rows()
+
+    @property
+    def turn(self):
+        return COLOR_CHARS[self.position.turn]
+
+    @property
+    def castling_rights(self):
+        return {key: bool(self.position.castling & bit) for key, bit in CASTLING_KEYS.items()}
+
+    @property
+    def en_passant_possible(self):
+        ep = self.position.ep_square
+        return divmod(ep, 8) if ep >= 0 else ()
+
+    @property
+    def legal_index(self):
+        """현재 포지션의 LegalMoveIndex (ply마다 한 번만 생성)"""
+        if self._legal_index is None:
+            self._legal_index = LegalMoveIndex(self.position, self.move_cache.legal_moves(self.position))
+        return self._legal_index
+
     def select_piece(self, row, col):
-        piece = self.board[row][col]
+        piece = self.position.piece_at(row, col)
         if self.promotion_pending is None and piece.startswith(self.turn):
             self.selected_piece = (piece, (row, col))
             self.valid_moves = self.get_valid_moves(piece, row, col)
             return True
         return False
 
-    def update_castling_rights(self, piece, start_pos):
-        if piece == 'wK':
-            self.castling_rights['w_king'] = False
-            self.castling_rights['w_queen'] = False
-        elif piece == 'bK':
-            self.castling_rights['b_king'] = False
-            self.castling_rights['b_queen'] = False
-        elif piece == 'wR':
-            if start_pos == (7, 0):
-                self.castling_rights['w_queen'] = False
-            elif start_pos == (7, 7):
-                self.castling_rights['w_king'] = False
-        elif piece == 'bR':
-            if start_pos == (0, 0):
-                self.castling_rights['b_queen'] = False
-            elif start_pos == (0, 7):
-                self.castling_rights['b_king'] = False
-
-    def move_piece(self, start_pos, end_pos):
-        start_row, start_col = start_pos
-        end_row, end_col = end_pos
-        piece = self.board[start_row][start_col]
-
-        # 기보 기록
-        move_notation = self.get_chess_notation(start_pos, end_pos, piece)
-        self.move_log.append(move_notation)
-
-        # 1. 보드 위에서 말을 먼저 이동
-        self.board[end_row][end_col] = piece
-        self.board[start_row][start_col] = '--'
-
-        # 2. 이번 이동이 앙파상 잡기였는지 확인 (상태를 업데이트하기 전)
-        if piece[1] == 'P' and (end_row, end_col) == self.en_passant_possible:
-            self.board[start_row][end_col] = '--' # 상대 폰 제거
-
-        # 3. 다음 턴을 위한 앙파상 상태 설정
-        if piece[1] == 'P' and abs(start_row - end_row) == 2:
-            self.en_passant_possible = ((start_row + end_row) // 2, start_col)
-        else:
-            self.en_passant_possible = ()
-
-        # 캐슬링 시 룩 이동
-        if piece[1] == 'K' and abs(start_col - end_col) == 2:
-            if end_col == 6: # 킹사이드
-                self.board[end_row][5] = self.board[end_row][7]
-                self.board[end_row][7] = '--'
-            else: # 퀸사이드
-                self.board[end_row][3] = self.board[end_row][0]
-                self.board[end_row][0] = '--'
-
-        # 캐슬링 권한 업데이트
-        self.update_castling_rights(piece, start_pos)
-
-        # 폰 프로모션 확인
-        if piece[1] == 'P' and (end_row == 0 or end_row == 7):
-            self.promotion_pending = (end_row, end_col)
-            # 기보에 아직 =Q 등이 추가되지 않았으므로, 여기서 턴을 넘기지 않고 대기
-        else:
-            self.selected_piece = None
-            self.valid_moves = []
-            self.turn = 'b' if self.turn == 'w' else 'w'
-            self.check_game_over() # 턴 전환 후 게임 종료(체크메이트, 스테일메이트) 확인
+    def move_piece(self, start_pos, end_pos, promotion=None, source=None):
+        piece = self.position.piece_at(*start_pos)
 
-    def get_all_legal_moves(self, color):
-        """주어진 색의 모든 기물에 대한 모든 유효한 움직임을 반환"""
-        all_moves = []
-        for r in range(ROWS):
-            for c in range(COLS):
-                piece = self.board[r][c]
-                if piece.startswith(color):
-                    moves = self.get_valid_moves(piece, r, c)
-                    if moves:
-                        all_moves.extend(moves)
-        return all_moves
-
-    def get_chess_notation(self, start_pos, end_pos, piece):
-        def get_rank_file(r, c):
-            return chr(ord('a') + c) + str(8 - r)
-
-        # 캐슬링 표기
-        if piece[1] == 'K' and abs(start_pos[1] - end_pos[1]) == 2:
-            return "O-O" if end_pos[1] == 6 else "O-O-O"
-
-        start_sq = get_rank_file(start_pos[0], start_pos[1])
-        end_sq = get_rank_file(end_pos[0], end_pos[1])
-        piece_char = piece[1] if piece[1] != 'P' else ''
-        
-        is_capture = self.board[end_pos[0]][end_pos[1]] != '--'
-        if piece[1] == 'P' and start_pos[1] != end_pos[1] and not is_capture: # 앙파상
-            is_capture = True
+        # 폰 프로모션은 승급할 기물을 고를 때까지 수를 확정하지 않고 대기
+        if piece[1] == 'P' and end_pos[0] in (0, 7) and promotion is None:
+            self.promotion_pending = end_pos
+            self.promotion_start = start_pos
+            return
 
-        capture_char = 'x' if is_capture else ''
+        promotion_type = PIECE_CHARS.index(promotion) if promotion else 0
+        move = self.legal_index.find(square(*start_pos), square(*end_pos), promotion_type)
+        if move is None:
+            return
 
-        if piece_char == '': # 폰 움직임
-            if capture_char == 'x':
-                return get_rank_file(start_pos[0], start_pos[1])[0] + capture_char + end_sq
-            return end_sq
-        return piece_char + capture_char + end_sq
+        self.promotion_pending = None
+        self.promotion_start = None
+        self.selected_piece = None
+        self.valid_moves = []
+        if self.remote and source != 'remote':
+            # 서버가 같은 규칙으로 다시 검사해 ok로 돌려준 뒤에 둔다 (error면 보드가 어긋나지 않게 그대로 둔다)
+            self.remote_pending = move
+            self.remote.send(f"move {move_to_uci(move)}")
+            return
 
-    def square_under_attack(self, r, c, color):
-        """특정 칸이 주어진 색의 기물에게 공격받고 있는지 확인"""
-        opponent_color = 'b' if color == 'w' else 'w'
-        for row in range(ROWS):
-            for col in range(COLS):
-                p = self.board[row][col]
-                if p.startswith(opponent_color):
-                    # get_valid_moves를 재귀적으로 호출하지 않도록 간단한 버전 사용
-                    moves = self.get_piece_moves(p, row, col)
-                    for move in moves:
-                        if move == (r, c):
-                            return True
-        return False
+        self.record_move(self.get_chess_notation(move), source) # 기보 기록
+
+        self.position.make_move(move)
+        self._legal_index = None # 다음 ply의 합법수는 처음 조회할 때 만든다
+        self.known_move = None
+        self.check_game_over() # 턴 전환 후 게임 종료(체크메이트, 스테일메이트) 확인
+        self.start_ai_turn()
+
+    # --- 컴퓨터 상대 ---
+    def is_ai_turn(self):
+        return self.ai is not None and self.turn == self.ai_color and not self.game_over
 
-    def get_castle_moves(self, r, c, moves):
-        if self.square_under_attack(r, c, self.turn):
-            return # 현재 체크 상태면 캐슬링 불가
-        if (self.turn == 'w' and self.castling_rights['w_king']) or (self.turn == 'b' and self.castling_rights['b_king']):
-            # 킹사이드 캐슬링
-            if self.board[r][c+1] == '--' and self.board[r][c+2] == '--':
-                if not self.square_under_attack(r, c+1, self.turn) and not self.square_under_attack(r, c+2, self.turn):
-                    moves.append((r, c+2))
-        if (self.turn == 'w' and self.castling_rights['w_queen']) or (self.turn == 'b' and self.castling_rights['b_queen']):
-            # 퀸사이드 캐슬링
-            if self.board[r][c-1] == '--' and self.board[r][c-2] == '--' and self.board[r][c-3] == '--':
-                if not self.square_under_attack(r, c-1, self.turn) and not self.square_under_attack(r, c-2, self.turn):
-                    moves.append((r, c-2))
-
-    def get_piece_moves(self, piece, row, col):
-        """get_valid_moves의 재귀 호출을 피하기 위한 간단한 버전"""
-        moves = []
-        color = piece[0]
-        if 'P' in piece:
-            direction = -1 if color == 'w' else 1
-            if 0 <= row + direction < 8 and self.board[row + direction][col] == '--': moves.append((row + direction, col))
-            if (row == 6 if color == 'w' else row == 1) and self.board[row + 2 * direction][col] == '--' and self.board[row + direction][col] == '--': moves.append((row + 2 * direction, col))
-            for d_col in [-1, 1]:
-                if 0 <= col + d_col < 8 and 0 <= row + direction < 8:
-                    target = self.board[row + direction][col + d_col]
-                    if target != '--' and not target.startswith(color): 
-                        moves.append((row + direction, col + d_col))
-                    # 앙파상
-                    elif (row + direction, col + d_col) == self.en_passant_possible:
-                        moves.append((row + direction, col + d_col))
-        if 'R' in piece or 'Q' in piece:
-            for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                for i in range(1, 8):
-                    r, c = row + dr * i, col + dc * i
-                    if 0 <= r < 8 and 0 <= c < 8:
-                        target = self.board[r][c]
-                        if target == '--': moves.append((r, c))
-                        elif not target.startswith(color): moves.append((r, c)); break
-                        else: break
-                    else: break
-        if 'B' in piece or 'Q' in piece:
-            for dr, dc in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
-                for i in range(1, 8):
-                    r, c = row + dr * i, col + dc * i
-                    if 0 <= r < 8 and 0 <= c < 8:
-                        target = self.board[r][c]
-                        if target == '--': moves.append((r, c))
-                        elif not target.startswith(color): moves.append((r, c)); break
-                        else: break
-                    else: break
-        if 'N' in piece:
-            for dr, dc in [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]:
-                r, c = row + dr, col + dc
-                if 0 <= r < 8 and 0 <= c < 8:
-                    target = self.board[r][c]
-                    if target == '--' or not target.startswith(color): moves.append((r, c))
-        if 'K' in piece:
-            for dr, dc in [(dr, dc) for dr in [-1, 0, 1] for dc in [-1, 0, 1] if not (dr == 0 and dc == 0)]:
-                r, c = row + dr, col + dc
-                if 0 <= r < 8 and 0 <= c < 8:
-                    target = self.board[r][c]
-                    if target == '--' or not target.startswith(color): moves.append((r, c))
-        return moves
+    def start_ai_turn(self):
+        """컴퓨터 차례면 북/테이블을 먼저 찾아보고, 없으면 백그라운드 스레드에서 탐색 시작 (렌더링 루프는 계속 돈다)"""
+        if not self.is_ai_turn():
+            return
+        self.known_move = self.probe_known_move()
+        if self.known_move is None:
+            self.ai.start(self.position, movetime=self.ai_movetime)
+
+    def probe_known_move(self):
+        """(수, 'book' 또는 'tables'), 둘 다 없으면 None"""
+        if self.book:
+            move = self.book.choose(self.position)
+            if move is not None:
+                return move, 'book'
+        if self.tables:
+            found = self.tables.probe(self.position)
+            if found is not None:
+                return found[0], 'tables'
+        return None
+
+    def apply_ai_move(self):
+        """북/테이블에서 찾은 수나, 탐색이 끝났으면 최선수를 보드에 적용"""
+        if not self.is_ai_turn():
+            return
+        if self.known_move:
+            move, source = self.known_move
+        else:
+            move, source = self.ai.poll(), None
+        if move:
+            promotion = PIECE_CHARS[move_promotion(move)] if move_promotion(move) else None
+            self.move_piece(divmod(move_from(move), 8), divmod(move_to(move), 8), promotion, source)
+
+    # --- 네트워크 대국 ---
+    def is_remote_wait(self):
+        """네트워크 대국에서 상대 차례이거나, 아직 상대가 정해지지 않았거나, 보낸 수의 확인을 기다리는지"""
+        return self.remote is not None and (self.turn != self.remote_color or self.remote_pending is not None)
+
+    def find_remote_game(self, game_id=None):
+        """서버에 대국을 요청 (game_id가 있으면 그 대국에 참가, 없으면 아무 상대와 짝짓기)"""
+        self.remote_color = None
+        self.remote.send(f"join {game_id}" if game_id else 'seek')
+
+    def receive_remote(self):
+        """서버에서 온 줄들을 처리: 대국 시작, 이쪽 수의 확인(ok)과 상대의 수, 대국 종료"""
+        if not self.remote:
+            return
+        for line in self.remote.poll():
+            command, *args = line.split()
+            if command == 'game':
+                fen = ' '.join(args[2:])
+                if fen != self.position.to_fen() or self.game_over: # PGN을 불러와 연 대국이면 기보를 그대로 둔다
+                    self.load_fen(fen)
+                self.remote_color = args[1]
+                pygame.display.set_caption(f"Pokemon Chess - 대국 {args[0]} ({'백' if args[1] == 'w' else '흑'})")
+            elif command in ('ok', 'opponent'):
+                if command == 'ok':
+                    self.remote_pending = None
+                move = parse_uci(args[0])
+                promotion = PIECE_CHARS[move_promotion(move)] if move_promotion(move) else None
+                self.move_piece(divmod(move_from(move), 8), divmod(move_to(move), 8), promotion, 'remote')
+            elif command == 'over' and not self.game_over:
+                result, reason = args
+                self.game_result = result_text(result, reason)
+                self.game_over = True
+            elif command == 'waiting':
+                print(f"waiting for an opponent: --join {args[0]}")
+            elif command in ('error', 'closed'):
+                self.remote_pending = None # 거절된 수는 두지 않았으므로 다시 고르면 된다
+                print(f"server: {line}")
+
+    def get_all_legal_moves(self, color):
+        """주어진 색의 모든 기물에 대한 모든 유효한 움직임을 반환"""
+        board = self.position
+        if COLOR_CHARS[board.turn] == color:
+            return [divmod(move_to(move), 8) for move in self.legal_index.moves]
+        board = board.copy()
+        board.turn ^= 1
+        board.ep_square = -1
+        return [divmod(move_to(move), 8) for move in board.generate_legal()]
+
+    def get_chess_notation(self, move):
+        """두기 전 포지션에서 move의 SAN (중의성 해소, 승급, 체크/메이트 표기 포함)"""
+        return move_to_san(self.position, move, self.legal_index.moves)
 
     def get_valid_moves(self, piece, row, col):
-        moves = self.get_piece_moves(piece, row, col)
-        if 'K' in piece:
-            self.get_castle_moves(row, col, moves)
-        
-        legal_moves = []
-        for move in moves:
-            start_pos = (row, col)
-            end_pos = move
-            
-            # --- 시뮬레이션 시작 ---
-            captured_piece = self.board[end_pos[0]][end_pos[1]]
-            is_en_passant = (piece[1] == 'P' and end_pos == self.en_passant_possible)
-            captured_en_passant_pawn = None
-            en_passant_pawn_pos = None
-
-            # 가상으로 말 이동
-            self.board[end_pos[0]][end_pos[1]] = piece
-            self.board[start_pos[0]][start_pos[1]] = '--'
-            if is_en_passant:
-                en_passant_pawn_pos = (start_pos[0], end_pos[1])
-                captured_en_passant_pawn = self.board[en_passant_pawn_pos[0]][en_passant_pawn_pos[1]]
-                self.board[en_passant_pawn_pos[0]][en_passant_pawn_pos[1]] = '--'
-
-            # 체크 상태 확인
-            if not self.is_in_check(self.turn):
-                legal_moves.append(move)
-
-            # --- 보드 원상복구 ---
-            self.board[start_pos[0]][start_pos[1]] = piece
-            self.board[end_pos[0]][end_pos[1]] = captured_piece
-            if is_en_passant:
-                self.board[en_passant_pawn_pos[0]][en_passant_pawn_pos[1]] = captured_en_passant_pawn
-
-        return legal_moves
+        """(row, col)에 있는 기물의 합법적인 도착 칸 목록 (승급 수는 칸 하나로 합침)"""
+        return [divmod(to, 8) for to in self.legal_index.targets(square(row, col))]
+
+    def record_move(self, notation, source=None):
+        """기보에 수를 추가하고 패널에는 그 줄만 다시 렌더링 (북/테이블에서 둔 수는 출처를 표시)"""
+        self.move_log.append(notation)
+        self.log_panel.set_move(len(self.move_log) - 1, notation, MOVE_SOURCE_TAGS.get(source))
+
+    def scroll_move_log(self, delta_lines):
+        self.log_panel.scroll(delta_lines)
 
     def is_in_check(self, color):
         """주어진 색의 킹이 체크 상태인지 확인"""
-        king_pos = None
-        for r in range(ROWS):
-            for c in range(COLS):
-                if self.board[r][c] == color + 'K':
-                    king_pos = (r, c)
-                    break
-            if king_pos:
-                break
-        
-        if king_pos:
-            return self.square_under_attack(king_pos[0], king_pos[1], color)
-        return False
+        if color == self.turn:
+            return self.legal_index.in_check
+        return self.position.in_check(COLOR_CHARS.index(color))
 
     def check_game_over(self):
-        """현재 턴의 플레이어가 움직일 수가 없는지 확인하여 체크메이트 또는 스테일메이트를 결정"""
-        # get_all_legal_moves는 모든 기물의 모든 '유효한' 움직임을 반환합니다.
-        # (자신의 킹을 체크 상태로 만드는 움직임은 제외됨)
-        legal_moves = self.get_all_legal_moves(self.turn)
-
-        if not legal_moves:
-            if self.is_in_check(self.turn):
-                # 움직일 수 없는데 체크 상태이면 체크메이트
-                self.game_result = ("백 승리" if self.turn == 'b' else "흑 승리")
-                if self.move_log: self.move_log[-1] += '#' # 기보에 체크메이트 표기
-            else:
-                # 움직일 수 없는데 체크 상태가 아니면 스테일메이트
-                self.game_result = "스테일메이트"
+        """체크메이트, 스테일메이트, 규칙상 무승부(3회 동형, 50수, 기물 부족)인지 확인해 게임 종료를 결정
+        (대국 서버, 토너먼트와 같은 chess_engine.game_outcome)"""
+        outcome = game_outcome(self.position, self.legal_index)
+        if outcome:
+            self.game_result = result_text(*outcome)
             self.game_over = True
-        elif self.is_in_check(self.turn):
-            # 움직일 수는 있지만 체크 상태이면, 기보에 체크 표기
-            if self.move_log: self.move_log[-1] += '+'
+
+    # --- FEN / PGN ---
+    def pgn_result(self):
+        return PGN_RESULTS.get(self.game_result, '*') if self.game_over else '*'
+
+    def save_pgn(self, path):
+        """지금까지의 게임을 PGN 파일 끝에 덧붙임"""
+        white = 'Computer' if self.ai_color == 'w' else 'Remote' if self.remote_color == 'b' else 'Human'
+        black = 'Computer' if self.ai_color == 'b' else 'Remote' if self.remote_color == 'w' else 'Human'
+        headers = game_headers(self.start_fen, Event='Pokemon Chess', White=white, Black=black)
+        with open(path, 'a', encoding='utf-8') as f:
+            write_game(f, headers, self.move_log, self.pgn_result())
+
+    def load_fen(self, fen):
+        """FEN 포지션에서 새 게임 시작"""
+        Board.from_fen(fen) # 잘못된 FEN이면 현재 게임을 건드리기 전에 ValueError
+        self.start_fen = fen
+        self.reset_game()
+
+    def load_pgn_game(self, game):
+        """PGNGame의 수를 처음부터 다시 두어 그 게임의 마지막 포지션으로 이동
+
+        move_piece를 거치면 수마다 서버로 보내고 컴퓨터 탐색을 시작하므로 포지션과 기보에만 적용하고,
+        게임 종료 확인, 대국 서버 동기화(마지막 포지션으로 새 대국), 컴퓨터 차례는 끝에서 한 번만 한다.
+        """
+        fen = game.headers.get('FEN', START_FEN)
+        board = Board.from_fen(fen)
+        notations = []
+        for san in game.moves:
+            move = parse_san(board, san) # 잘못된 수면 현재 게임을 건드리기 전에 PGNError
+            notations.append(move_to_san(board, move))
+            board.make_move(move)
+        self.start_fen = fen
+        self.reset_game(start_ai=False)
+        self.position = board
+        for notation in notations:
+            self.record_move(notation)
+        self.check_game_over()
+        if self.remote and not self.game_over:
+            self.remote_color = None
+            self.remote.send(f"new {board.to_fen()}")
+        self.start_ai_turn()
 
     def handle_click(self, pos):
         if self.game_over:
             # 재시작 버튼 클릭 확인
             if hasattr(self, 'restart_button_rect') and self.restart_button_rect.collidepoint(pos):
                 self.reset_game()
+                if self.remote:
+                    self.find_remote_game() # 네트워크 대국은 새 상대를 찾는다
             return
 
+        if self.is_ai_turn() or self.is_remote_wait():
+            return # 컴퓨터가 생각하는 동안, 네트워크 상대 차례에는 보드 클릭 무시
+
         # 폰 프로모션 선택 처리
         if self.promotion_pending:
-            r, c = self.promotion_pending
             choice_rects = self.draw_promotion_choice() # 사각형 위치 가져오기
             for piece_char, rect in choice_rects.items():
                 if rect.collidepoint(pos):
-                    color = self.turn
-                    self.board[r][c] = color + piece_char
-                    self.move_log[-1] += '=' + piece_char # 기보에 승급 표기
-
-                    self.promotion_pending = None
-                    self.selected_piece = None
-                    self.valid_moves = []
-                    
-                    # 턴 넘기고 게임 상태 확인
-                    self.turn = 'b' if self.turn == 'w' else 'w'
-                    self.check_game_over() # 턴 전환 후 게임 종료(체크메이트, 스테일메이트) 확인
+                    # 승급 기물을 붙여 수를 확정하고, 턴 전환과 게임 종료 확인은 move_piece에서 처리
+                    self.move_piece(self.promotion_start, self.promotion_pending, piece_char)
                     return
             return # 선택지 외 다른 곳 클릭 시 아무것도 안 함
 
@@ -462,7 +517,7 @@ class Game:
 
         if self.selected_piece:
             start_pos = self.selected_piece[1]
-            if (row, col) in self.valid_moves: self.move_piece(start_pos, (row, col))
+            if square(row, col) in self.legal_index.targets(square(*start_pos)): self.move_piece(start_pos, (row, col))
             else:
                 self.selected_piece = None
                 self.valid_moves = []
@@ -487,10 +542,8 @@ class Game:
         
         choices = ['Q', 'R', 'B', 'N']
         choice_rects = {}
-        font = pygame.font.SysFont('arial', 40, bold=True)
-
         for i, char in enumerate(choices):
-            text = font.render(char, True, BLACK)
+            text = self.render_cache.text(char, PROMOTION_FONT, BLACK)
             rect = text.get_rect(center=(x_base + SQUARE_SIZE // 2, y_base + i * (SQUARE_SIZE // 2) + SQUARE_SIZE // 4))
             self.win.blit(text, rect)
             choice_rects[char] = rect
@@ -501,71 +554,195 @@ class Game:
             return
 
         # 반투명 오버레이
-        overlay = pygame.Surface((BOARD_WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.win.blit(overlay, (0, 0))
+        self.win.blit(self.render_cache.highlight(GAME_OVER_OVERLAY_COLOR, (BOARD_WIDTH, HEIGHT)), (0, 0))
 
         # 게임 결과 텍스트
-        font = pygame.font.SysFont('malgungothic', 60, bold=True)
-        text = font.render(self.game_result, True, WHITE)
+        text = self.render_cache.text(self.game_result, RESULT_FONT, WHITE)
         text_rect = text.get_rect(center=(BOARD_WIDTH // 2, HEIGHT // 2 - 50))
         self.win.blit(text, text_rect)
 
         # 재시작 버튼
-        button_font = pygame.font.SysFont('malgungothic', 40)
-        button_text = button_font.render("재시작", True, BLACK)
+        button_text = self.render_cache.text("재시작", BUTTON_FONT, BLACK)
         self.restart_button_rect = pygame.Rect(BOARD_WIDTH // 2 - 100, HEIGHT // 2 + 20, 200, 60)
         pygame.draw.rect(self.win, LIGHT_SQUARE, self.restart_button_rect)
         self.win.blit(button_text, self.restart_button_rect.move(50, 10))
 
     def draw_move_log(self):
         pygame.draw.rect(self.win, (20, 20, 20), (BOARD_WIDTH, 0, LOG_WIDTH, HEIGHT))
-        title_text = self.log_font.render("기보", True, WHITE)
+        title_text = self.render_cache.text("기보", LOG_FONT, WHITE)
         self.win.blit(title_text, (BOARD_WIDTH + 10, 10))
+        done, total = self.sprite_progress
+        if done < total:
+            loading_text = self.render_cache.text(f"포켓몬 불러오는 중 {done}/{total}", LOG_FONT, INFO_COLOR)
+            self.win.blit(loading_text, (BOARD_WIDTH + 70, 10))
 
-        y_offset = 40
-        for i in range(0, len(self.move_log), 2):
-            move_number = i // 2 + 1
-            white_move = self.move_log[i]
-            
-            line = f"{move_number}. {white_move}"
-            
-            # 흑의 수가 있는지 확인
-            if i + 1 < len(self.move_log):
-                black_move = self.move_log[i+1]
-                line += f" {black_move}"
-
-            move_text = self.log_font.render(line, True, WHITE)
-            self.win.blit(move_text, (BOARD_WIDTH + 10, y_offset))
+        self.log_panel.draw(self.win) # 보이는 줄만 그린다
+        self.draw_engine_info()
+
+    def draw_engine_info(self):
+        """기보 패널 아래쪽에 탐색 깊이, 속도, 주 변화(PV) 표시"""
+        if not self.ai or not self.ai.info:
+            return
+        info = self.ai.info
+        lines = [
+            f"깊이 {info.depth}  {format_score(info.score)}",
+            f"{info.nodes} 노드  {info.nps} nps",
+        ]
+        # PV는 패널 폭에 맞춰 네 수씩 줄바꿈
+        pv = format_pv(info.pv).split()
+        for i in range(0, min(len(pv), 12), 4):
+            lines.append(' '.join(pv[i:i + 4]))
+
+        y_offset = HEIGHT - 30 * len(lines) - 10
+        pygame.draw.line(self.win, (80, 80, 80), (BOARD_WIDTH + 10, y_offset - 10), (WIDTH - 10, y_offset - 10))
+        for line in lines:
+            info_text = self.render_cache.text(line, LOG_FONT, INFO_COLOR)
+            self.win.blit(info_text, (BOARD_WIDTH + 10, y_offset))
             y_offset += 30
 
+    def draw_profile_overlay(self, dirty_rects):
+        """보드 왼쪽 위에 최근 프레임 시간, 수 생성/규칙 판정 시간, 탐색 노드 수 (매 프레임 이 영역만 다시 그림)"""
+        rect = pygame.Rect(PROFILE_RECT)
+        if self.profile_backdrop is None or rect.collidelist(dirty_rects) >= 0:
+            self.profile_backdrop = self.win.subsurface(rect).copy()
+        else:
+            self.win.blit(self.profile_backdrop, rect)
+        now = time.perf_counter()
+        if now - self.profile_refreshed >= PROFILE_REFRESH:
+            self.profile_refreshed = now
+            stats = self.instrumentation.frame_stats()
+            info = self.ai.info if self.ai else None
+            self.profile_lines = [
+                f"frame {stats.get('frame', 0) * 1000:.2f} ms (max {stats.get('frame_max', 0) * 1000:.1f})  "
+                f"{stats.get('fps', 0):.0f} fps",
+                f"movegen {stats.get('movegen', 0) * 1000:.2f} ms  rules {stats.get('rules', 0) * 1000:.2f} ms",
+                f"nodes {info.nodes}  {info.nps} nps" if info else "nodes -",
+            ]
+        self.win.blit(self.render_cache.highlight(GAME_OVER_OVERLAY_COLOR, rect.size), rect)
+        font = self.render_cache.font(*PROFILE_FONT)
+        for i, line in enumerate(self.profile_lines):
+            # 값이 계속 바뀌므로 글자 캐시를 거치지 않고 바로 렌더링
+            self.win.blit(font.render(line, True, WHITE), (rect.x + 6, rect.y + 5 + i * 21))
+        dirty_rects.append(rect)
+
     def update(self):
-        self.win.fill(BLACK)
-        self.draw_board()
-        self.draw_valid_moves()
-        self.draw_pieces()
-        self.draw_move_log()
-        self.draw_promotion_choice()
-        self.draw_game_over()
-        pygame.display.flip()
-
-def main():
+        """바뀐 칸과 패널만 다시 그리고 그 영역만 화면에 반영 (바뀐 것이 없으면 아무것도 하지 않음)"""
+        self.receive_sprites()
+        self.apply_ai_move()
+        self.receive_remote()
+        dirty_rects = []
+
+        states = self.square_states()
+        overlay = (self.promotion_pending, self.game_over, self.game_result)
+        changed = [sq for sq in range(64) if states[sq] != self.rendered_squares[sq]]
+        if self.instrumentation and PROFILE_SQUARES.intersection(changed):
+            # 오버레이 밑 칸은 함께 다시 그려야 오버레이가 없는 배경을 새로 뜰 수 있다
+            changed = sorted(PROFILE_SQUARES.union(changed))
+        # 오버레이가 떠 있을 때 칸이 바뀌거나 오버레이 자체가 바뀌면 보드 전체를 다시 그림
+        if self.full_redraw or overlay != self.rendered_overlay or (changed and (self.promotion_pending or self.game_over)):
+            self.draw_board()
+            for sq in range(64):
+                self.draw_square(sq // 8, sq % 8, states[sq])
+            self.draw_promotion_choice()
+            self.draw_game_over()
+            dirty_rects.append(pygame.Rect(0, 0, BOARD_WIDTH, HEIGHT))
+            self.full_redraw = False
+        else:
+            for sq in changed:
+                dirty_rects.append(self.draw_square(sq // 8, sq % 8, states[sq]))
+        self.rendered_squares = states
+        self.rendered_overlay = overlay
+
+        panel = (self.log_panel.version, self.sprite_progress, self.ai.info if self.ai else None)
+        if panel != self.rendered_panel:
+            self.draw_move_log()
+            dirty_rects.append(pygame.Rect(BOARD_WIDTH, 0, LOG_WIDTH, HEIGHT))
+            self.rendered_panel = panel
+
+        if self.instrumentation:
+            self.draw_profile_overlay(dirty_rects)
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pokemon Chess")
+    parser.add_argument('--ai', choices=['white', 'black'], help="컴퓨터가 둘 색 (생략하면 2인용)")
+    parser.add_argument('--movetime', type=float, default=1.0, help="컴퓨터의 한 수당 생각 시간(초)")
+    parser.add_argument('--workers', type=int, default=1, help="탐색에 쓸 프로세스 수")
+    parser.add_argument('--frames', type=int, help="이 프레임 수만큼 그린 뒤 종료 (시작 시간 측정용)")
+    parser.add_argument('--fen', default=START_FEN, help="이 FEN 포지션에서 시작")
+    parser.add_argument('--pgn', help="이 PGN 파일의 첫 게임을 불러와 마지막 포지션에서 이어서 둔다")
+    parser.add_argument('--save', default='pokemon_chess.pgn', help="S 키를 누르면 게임을 덧붙일 PGN 파일")
+    parser.add_argument('--book', help="컴퓨터가 쓸 Polyglot 형식 오프닝북 (book.py build로 생성)")
+    parser.add_argument('--tables', default=DEFAULT_TABLE_DIR, help="엔드게임 테이블 폴더 (tablebase.py generate로 생성)")
+    parser.add_argument('--connect', metavar='HOST:PORT', help="대국 서버(server.py)에 접속해 네트워크 대국")
+    parser.add_argument('--join', type=int, help="--connect와 함께: 이 번호의 대국에 참가 (생략하면 아무 상대와 짝짓기)")
+    parser.add_argument('--profile', action='store_true',
+                        help="핫패스 계측을 켜고 프레임/수 생성 시간 오버레이 표시, 끝날 때 계측 표 출력")
+    args = parser.parse_args(argv)
+    if args.connect and args.ai:
+        parser.error("--connect와 --ai는 함께 쓸 수 없습니다")
+    if args.join and args.pgn:
+        parser.error("--join과 --pgn은 함께 쓸 수 없습니다 (--pgn이면 마지막 포지션으로 새 대국을 연다)")
+
     pygame.init()
     win = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Pokemon Chess")
     
-    game = Game(win)
+    instrumentation = None
+    if args.profile:
+        # 켰을 때만 import하고 메서드를 바꿔 끼우므로, 끈 상태에서는 계측 비용이 전혀 없다
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation().enable(Game, MoveLogPanel)
+    game = Game(win, ai_color=args.ai[0] if args.ai else None, movetime=args.movetime, workers=args.workers,
+                start_fen=args.fen, book=args.book, tables=args.tables,
+                remote=NetworkClient.from_address(args.connect) if args.connect else None,
+                instrumentation=instrumentation)
+    loaded = False
+    if args.pgn:
+        with open_pgn(args.pgn) as stream:
+            for pgn_game in read_games(stream):
+                game.load_pgn_game(pgn_game) # 네트워크 대국이면 마지막 포지션으로 새 대국을 연다
+                loaded = True
+                break
+    if game.remote and not loaded:
+        game.find_remote_game(args.join)
     
+    clock = pygame.time.Clock()
+    frames = 0
     run = True
     while run:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3): # 4, 5는 휠
                 pos = pygame.mouse.get_pos()
                 game.handle_click(pos)
+            if event.type == pygame.MOUSEWHEEL and pygame.mouse.get_pos()[0] >= BOARD_WIDTH:
+                game.scroll_move_log(-event.y) # 휠을 위로 굴리면 이전 수
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_s:
+                    game.save_pgn(args.save)
+                    print(f"saved {args.save}")
+                elif event.key == pygame.K_f:
+                    print(game.position.to_fen())
         game.update()
-
+        clock.tick(FPS) # 바뀐 것이 없을 때 CPU를 쓰지 않도록 프레임 상한
+        frames += 1
+        if frames == 1 and args.frames:
+            print(f"first-frame {time.time():.6f}", flush=True) # startup_bench.py가 읽는 값
+        if args.frames and frames >= args.frames:
+            run = False
+
+    if game.ai:
+        game.ai.stop()
+        if hasattr(game.ai.searcher, 'close'):
+            game.ai.searcher.close()
+    if game.remote:
+        game.remote.close()
+    if instrumentation:
+        instrumentation.disable()
+        print(instrumentation.report())
     pygame.quit()
 
 if __name__ == '__main__':
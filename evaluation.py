@@ -0,0 +1,151 @@
+"""정적 평가: 재료 + piece-square, 기동성, 킹 안전을 중반/종반 가중치로 보간 (tapered eval)
+
+- evaluate(board): 탐색에서 쓰는 한 포지션 평가. 재료+PST와 게임 단계는 Board가 make/unmake에서
+  증분으로 유지하므로(board.psqt, board.phase) 읽기만 하고, 기동성과 킹 안전만 비트보드로 센다.
+- 같은 평가를 포지션 여러 개에 한꺼번에 하는 NumPy 버전은 batch_eval (evaluate_batch, evaluate_moves).
+  NumPy를 import하는 비용이 커서 탐색/규칙 모듈이 끌어오지 않도록 따로 둔다.
+
+두 경로는 같은 점수를 낸다 (python evaluation.py --check).
+점수는 센티폰, evaluate는 side to move 기준이다.
+
+python evaluation.py --fen "..."           # 항목별 점수
+python evaluation.py --bench --count 10000  # 한 포지션씩 vs 배치 속도 비교
+"""
+import argparse
+import time
+
+from chess_engine import (BISHOP, BLACK, KING_ATTACKS, KNIGHT, KNIGHT_ATTACKS, PAWN, QUEEN, ROOK, WHITE, Board,
+                          bishop_attacks, iter_bits, rook_attacks)
+from psqt import MAX_PHASE, unpack_score
+
+# 공격하는 칸(자기 기물이 있는 칸 제외) 하나당 점수 (중반, 종반)
+MOBILITY_MIDGAME = [0, 4, 5, 2, 1, 0]
+MOBILITY_ENDGAME = [0, 4, 5, 4, 2, 0]
+# 상대 킹 주변(킹 칸 포함 3x3)에서 공격하는 칸 하나당 점수 (중반만)
+KING_ATTACK_WEIGHTS = [0, 6, 6, 8, 10, 0]
+# 킹 앞 한 줄 / 두 줄 칸의 자기 폰 하나당 점수 (중반만)
+SHIELD_NEAR, SHIELD_FAR = 12, 6
+
+
+def _king_zones():
+    return [KING_ATTACKS[sq] | (1 << sq) for sq in range(64)]
+
+
+def _shield_squares(color, sq, distance):
+    """color의 킹이 sq에 있을 때 앞쪽 distance번째 줄의 세 칸"""
+    row = (sq >> 3) + (-distance if color == WHITE else distance)
+    if not 0 <= row < 8:
+        return []
+    col = sq & 7
+    return [row * 8 + c for c in (col - 1, col, col + 1) if 0 <= c < 8]
+
+
+KING_ZONES = _king_zones()
+SHIELD_MASKS = [[[sum(1 << s for s in _shield_squares(color, sq, distance)) for sq in range(64)]
+                 for distance in (1, 2)] for color in (WHITE, BLACK)]
+
+
+# --- 한 포지션 ---
+def evaluate_terms(board):
+    """백 기준 항목별 (중반, 종반) 점수와 게임 단계"""
+    mg, eg = unpack_score(board.psqt)
+    terms = {'psqt': (mg, eg)}
+    pieces = board.pieces
+    occupied = board.occupied_by[WHITE] | board.occupied_by[BLACK]
+    mobility_mg = mobility_eg = king_mg = 0
+    for color in (WHITE, BLACK):
+        sign = 1 if color == WHITE else -1
+        own = board.occupied_by[color]
+        zone = KING_ZONES[board.king_squares[color ^ 1]]
+        for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN):
+            for sq in iter_bits(pieces[color * 6 + piece_type]):
+                if piece_type == KNIGHT:
+                    attacks = KNIGHT_ATTACKS[sq]
+                elif piece_type == BISHOP:
+                    attacks = bishop_attacks(sq, occupied)
+                elif piece_type == ROOK:
+                    attacks = rook_attacks(sq, occupied)
+                else:
+                    attacks = bishop_attacks(sq, occupied) | rook_attacks(sq, occupied)
+                count = (attacks & ~own).bit_count()
+                mobility_mg += sign * MOBILITY_MIDGAME[piece_type] * count
+                mobility_eg += sign * MOBILITY_ENDGAME[piece_type] * count
+                king_mg += sign * KING_ATTACK_WEIGHTS[piece_type] * (attacks & zone).bit_count()
+        king = board.king_squares[color]
+        pawns = pieces[color * 6 + PAWN]
+        near, far = SHIELD_MASKS[color][0][king], SHIELD_MASKS[color][1][king]
+        king_mg += sign * (SHIELD_NEAR * (pawns & near).bit_count() + SHIELD_FAR * (pawns & far).bit_count())
+    terms['mobility'] = (mobility_mg, mobility_eg)
+    terms['king safety'] = (king_mg, 0)
+    return terms, min(board.phase, MAX_PHASE)
+
+
+def taper(mg, eg, phase):
+    return (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
+
+
+def evaluate(board):
+    """side to move 기준 점수"""
+    terms, phase = evaluate_terms(board)
+    mg = sum(term[0] for term in terms.values())
+    eg = sum(term[1] for term in terms.values())
+    score = taper(mg, eg, phase)
+    return score if board.turn == WHITE else -score
+
+
+# --- 확인 / 벤치마크 ---
+def _sample_boards(count, seed=11):
+    from position import _sample_boards as sample
+    return sample(count, seed)
+
+
+def check(count=2000):
+    """한 포지션 평가와 배치 평가, 증분 PST와 처음부터 다시 센 PST가 같은지 확인"""
+    from batch_eval import evaluate_batch
+    boards = _sample_boards(count)
+    batch = evaluate_batch(boards)
+    for board, score in zip(boards, batch):
+        fresh = Board.unpack(board.pack())
+        if (fresh.psqt, fresh.phase) != (board.psqt, board.phase):
+            raise AssertionError(f"증분 PST 불일치: {board.to_fen()}")
+        single = evaluate(board) if board.turn == WHITE else -evaluate(board)
+        if single != score:
+            raise AssertionError(f"평가 불일치 {single} != {score}: {board.to_fen()}")
+    print(f"{count} positions ok")
+
+
+def benchmark(count=10000):
+    from batch_eval import evaluate_batch
+    boards = _sample_boards(count)
+    start = time.perf_counter()
+    for board in boards:
+        evaluate(board)
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    evaluate_batch(boards)
+    batch = time.perf_counter() - start
+    print(f"{count} positions  evaluate {single / count * 1e6:.1f} us/position  "
+          f"evaluate_batch {batch / count * 1e6:.1f} us/position  ({single / batch:.1f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="정적 평가 항목 출력 / 확인 / 벤치마크")
+    parser.add_argument('--fen', help="이 포지션의 항목별 점수")
+    parser.add_argument('--check', action='store_true', help="한 포지션 평가와 배치 평가가 같은지 확인")
+    parser.add_argument('--bench', action='store_true', help="한 포지션씩 vs 배치 속도 비교")
+    parser.add_argument('--count', type=int, default=10000)
+    args = parser.parse_args(argv)
+    if args.check:
+        check(min(args.count, 2000))
+    if args.bench:
+        benchmark(args.count)
+    if args.fen or not (args.check or args.bench):
+        board = Board.from_fen(args.fen) if args.fen else Board()
+        terms, phase = evaluate_terms(board)
+        for name, (mg, eg) in terms.items():
+            print(f"{name:<12} mg {mg:>6}  eg {eg:>6}")
+        print(f"phase {phase}/{MAX_PHASE}  score {evaluate(board)} (side to move)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""선택적 계측: 수 생성/규칙 판정/렌더링 핫패스의 호출 수와 시간, 게임 화면 오버레이, 헤드리스 프로파일링
+
+계측을 켜기 전에는 원래 메서드를 그대로 두므로 꺼져 있을 때 드는 비용이 없다.
+enable()이 TARGETS의 메서드를 시간을 재는 래퍼로 바꿔 끼우고, disable()이 원래대로 되돌린다.
+이름별 시간은 cProfile의 cumtime처럼 안쪽 호출을 포함하고, 분류별 프레임 시간은 같은 분류가
+중첩되면 바깥 호출만 센다 (주 스레드만: 탐색 스레드의 수 생성이 UI 수치에 섞이지 않도록).
+
+헤드리스 스크립트 대국 (SDL 더미 드라이버로 실제 Game.update / handle_click 경로를 그대로 탄다):
+    python instrumentation.py --moves 60                       # 계측 표
+    python instrumentation.py --moves 60 --pstats game.prof    # cProfile 결과 저장 + 상위 함수 출력
+    python instrumentation.py --moves 60 --trace game.json     # chrome://tracing, Perfetto에서 열기
+    python instrumentation.py --moves 20 --ai black --movetime 0.2
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+FRAME = 'frame'
+# (모듈, 클래스) → [(메서드, 분류)]. 이미 import된 모듈만 계측한다 (헤드리스 도구가 pygame을 끌어오지 않도록)
+TARGETS = {
+    ('chess_engine', 'Board'): [
+        ('generate_legal', 'movegen'), ('is_square_attacked', 'movegen'), ('in_check', 'movegen'),
+        ('draw_reason', 'rules'),
+    ],
+    ('transposition', 'LegalMoveCache'): [('legal_moves', 'movegen')],
+    ('transposition', 'LegalMoveIndex'): [('__init__', 'movegen')],
+    ('chess_game', 'Game'): [
+        ('update', FRAME), ('handle_click', 'input'),
+        ('get_valid_moves', 'movegen'), ('get_all_legal_moves', 'movegen'), ('get_chess_notation', 'movegen'),
+        ('check_game_over', 'rules'),
+        ('draw_board', 'render'), ('draw_square', 'render'), ('draw_move_log', 'render'),
+        ('draw_engine_info', 'render'), ('draw_promotion_choice', 'render'), ('draw_game_over', 'render'),
+    ],
+    ('move_log_panel', 'MoveLogPanel'): [('set_move', 'render'), ('draw', 'render')],
+    ('search', 'Searcher'): [('search', 'search')],
+}
+HISTORY_FRAMES = 120 # 오버레이 수치를 낼 최근 프레임 수
+MAX_TRACE_EVENTS = 1_000_000
+
+
+class Instrumentation:
+    def __init__(self, trace=False):
+        self.lock = threading.Lock()
+        self.calls = {} # 'Class.method' → [호출 수, 누적 초]
+        self.categories = {} # 'Class.method' → 분류
+        self.frame = {} # 분류 → 지금 프레임에서 주 스레드가 쓴 초
+        self.frames = deque(maxlen=HISTORY_FRAMES) # (프레임이 끝난 시각, {분류: 초})
+        self.events = [] if trace else None # Chrome trace용 (이름, 분류, 시작, 걸린 시간, 스레드)
+        self.thread_names = {} # 스레드 id → 이름 (trace를 쓸 때는 탐색 스레드가 이미 끝났을 수 있다)
+        self.local = threading.local()
+        self.main_thread = threading.get_ident()
+        self.start = time.perf_counter()
+        self.patched = [] # (클래스, 메서드 이름, 원래 함수)
+
+    # --- 켜기/끄기 ---
+    def enable(self, *classes):
+        """TARGETS를 계측. classes로 준 클래스는 같은 이름의 대상 대신 쓴다 (__main__으로 실행한 chess_game.Game 등)"""
+        given = {cls.__name__: cls for cls in classes}
+        for (module_name, class_name), methods in TARGETS.items():
+            cls = given.get(class_name)
+            if cls is None:
+                module = sys.modules.get(module_name)
+                cls = getattr(module, class_name, None) if module else None
+            if cls is None:
+                continue
+            for method, category in methods:
+                original = cls.__dict__.get(method)
+                if original is None:
+                    continue
+                name = f"{class_name}.{method}"
+                self.categories[name] = category
+                setattr(cls, method, self._wrap(name, category, original))
+                self.patched.append((cls, method, original))
+        return self
+
+    def disable(self):
+        for cls, method, original in reversed(self.patched):
+            setattr(cls, method, original)
+        self.patched = []
+
+    def _wrap(self, name, category, function):
+        counter = self.calls.setdefault(name, [0, 0.0])
+        lock = self.lock
+        local = self.local
+        main_thread = self.main_thread
+        perf_counter = time.perf_counter
+        get_ident = threading.get_ident
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            active = getattr(local, 'active', None)
+            if active is None:
+                active = local.active = set()
+            outer = category not in active
+            if outer:
+                active.add(category)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                thread = get_ident()
+                if outer:
+                    active.discard(category)
+                with lock:
+                    counter[0] += 1
+                    counter[1] += elapsed
+                    if self.events is not None and len(self.events) < MAX_TRACE_EVENTS:
+                        self.events.append((name, category, start, elapsed, thread))
+                        if thread not in self.thread_names:
+                            self.thread_names[thread] = threading.current_thread().name
+                    if outer and thread == main_thread:
+                        self.frame[category] = self.frame.get(category, 0.0) + elapsed
+                        if category == FRAME:
+                            self.frames.append((start + elapsed, self.frame))
+                            self.frame = {}
+        return timed
+
+    # --- 결과 ---
+    def frame_stats(self):
+        """최근 프레임들의 {'fps', 'frame', 'frame_max', 분류: 프레임당 최대 초}"""
+        with self.lock:
+            frames = list(self.frames)
+        if not frames:
+            return {}
+        stats = {'frame': sum(f.get(FRAME, 0.0) for _, f in frames) / len(frames),
+                 'frame_max': max(f.get(FRAME, 0.0) for _, f in frames),
+                 'fps': (len(frames) - 1) / (frames[-1][0] - frames[0][0]) if len(frames) > 1 and frames[-1][0] > frames[0][0] else 0.0}
+        for category in set(self.categories.values()) - {FRAME}:
+            stats[category] = max(f.get(category, 0.0) for _, f in frames)
+        return stats
+
+    def report(self):
+        """이름별 호출 수와 누적 시간 표 (누적 시간 순)"""
+        with self.lock:
+            rows = sorted(((name, count, total) for name, (count, total) in self.calls.items() if count),
+                          key=lambda row: -row[2])
+        lines = [f"{'name':<34} {'category':<8} {'calls':>8} {'total ms':>10} {'per call us':>12}"]
+        for name, count, total in rows:
+            lines.append(f"{name:<34} {self.categories[name]:<8} {count:>8} {total * 1000:>10.2f} "
+                         f"{total / count * 1e6:>12.1f}")
+        return '\n'.join(lines)
+
+    def write_chrome_trace(self, path):
+        """Chrome trace event 형식(JSON)으로 저장 (완료 이벤트 'X', 시간 단위는 마이크로초)"""
+        with self.lock:
+            events = list(self.events or [])
+        thread_ids = {}
+        trace = []
+        pid = os.getpid()
+        for name, category, start, elapsed, thread in events:
+            tid = thread_ids.setdefault(thread, len(thread_ids) + 1)
+            trace.append({'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid,
+                          'ts': round((start - self.start) * 1e6, 3), 'dur': round(elapsed * 1e6, 3)})
+        for thread, tid in thread_ids.items():
+            trace.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                          'args': {'name': 'main' if thread == self.main_thread else self.thread_names[thread]}})
+        temp = path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        os.replace(temp, path)
+        return len(events)
+
+
+# --- 헤드리스 스크립트 대국 ---
+def _click(game, row, col):
+    from chess_game import SQUARE_SIZE
+    game.handle_click((col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2))
+    game.update()
+
+
+def play_scripted_game(game, moves, seed=0, timeout=60.0):
+    """사람 차례에는 무작위 합법수를 클릭(출발 칸 → 도착 칸 → 승급이면 퀸)으로 두고, 컴퓨터 차례에는 프레임을 돌리며 기다린다"""
+    rng = random.Random(seed)
+    played = 0
+    deadline = time.perf_counter() + timeout
+    while played < moves and not game.game_over and time.perf_counter() < deadline:
+        game.update()
+        if game.is_ai_turn():
+            time.sleep(0.001) # 탐색 스레드에 GIL을 넘긴다
+            continue
+        before = len(game.move_log)
+        move = rng.choice(game.legal_index.moves)
+        _click(game, *divmod(move & 63, 8))
+        _click(game, *divmod((move >> 6) & 63, 8))
+        if game.promotion_pending:
+            rect = game.draw_promotion_choice()['Q']
+            game.handle_click(rect.center)
+        played += len(game.move_log) > before
+        game.update()
+    return played
+
+
+def run_headless(moves, seed=0, ai=None, movetime=0.2, trace=False, pstats=None):
+    """SDL 더미 드라이버로 Game을 만들어 스크립트 대국을 둔다. (Instrumentation, 둔 수)
+
+    스프라이트는 불러오지 않고 기본 그림으로 그린다 (다운로드 스레드가 측정에 섞이지 않도록).
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    import chess_game
+
+    pygame.init()
+    try:
+        win = pygame.display.set_mode((chess_game.WIDTH, chess_game.HEIGHT))
+        game = chess_game.Game(win, ai_color=ai[0] if ai else None, movetime=movetime, tables=None, load_sprites=False)
+        instrumentation = None
+        profiler = None
+        if pstats:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            instrumentation = Instrumentation(trace).enable()
+        try:
+            played = play_scripted_game(game, moves, seed)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(pstats)
+            if instrumentation:
+                instrumentation.disable()
+            if game.ai:
+                game.ai.stop()
+    finally:
+        pygame.quit()
+    return instrumentation, played
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="헤드리스 스크립트 대국으로 핫패스 계측/프로파일링")
+    parser.add_argument('--moves', type=int, default=60, help="사람 쪽이 클릭으로 둘 수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ai', choices=['white', 'black'], help="컴퓨터가 둘 색 (탐색 경로까지 계측)")
+    parser.add_argument('--movetime', type=float, default=0.2)
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--pstats', metavar='FILE', help="계측 대신 cProfile로 돌려 pstats 파일로 저장")
+    output.add_argument('--trace', metavar='FILE', help="계측 결과를 Chrome trace JSON으로 저장")
+    parser.add_argument('--top', type=int, default=25, help="--pstats일 때 출력할 상위 함수 수")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    instrumentation, played = run_headless(args.moves, args.seed, args.ai, args.movetime,
+                                           trace=bool(args.trace), pstats=args.pstats)
+    print(f"played {played} moves in {time.perf_counter() - start:.2f}s")
+    if args.pstats:
+        import pstats
+        pstats.Stats(args.pstats).sort_stats('cumulative').print_stats(args.top)
+        print(f"saved {args.pstats}")
+        return 0
+    print(instrumentation.report())
+    if args.trace:
+        count = instrumentation.write_chrome_trace(args.trace)
+        print(f"saved {args.trace} ({count} events)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
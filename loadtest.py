@@ -0,0 +1,175 @@
+"""대국 서버 부하 테스트: 클라이언트 수백 개가 짝을 지어 무작위 합법수로 대국
+
+서버를 별도 프로세스로 띄우고(--port를 주면 이미 떠 있는 서버에 연결), 클라이언트들은 --procs개
+프로세스에 나눠 각자 asyncio로 접속한다. 짝은 같은 프로세스 안에서 정해 두고 한쪽이 new, 다른 쪽이
+그 대국에 join한다 (seek로 아무나 짝지으면 마지막에 상대 없이 남는 클라이언트가 생길 수 있다).
+수를 보낸 뒤 ok를 받을 때까지를 수 지연 시간으로 재고, 끝나면 지연 시간 백분위수와
+서버 CPU 1초당(=코어 하나당) 처리한 대국 수를 출력한다.
+
+python loadtest.py --clients 200 --games 3 --procs 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+
+from chess_engine import Board, move_to_uci, parse_uci
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+
+
+async def _command(host, port, line):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(line.encode() + b'\n')
+    reply = (await reader.readline()).decode().strip()
+    writer.close()
+    return reply
+
+
+def _parse_stats(reply):
+    return {key: float(value) for key, value in (field.split('=') for field in reply.split()[1:])}
+
+
+async def play_client(host, port, games, max_plies, think, seed, latencies, game_ids, hosting):
+    """new(또는 짝이 만든 대국에 join) → 대국 → 반복. 자기 차례면 무작위 합법수를 두고, max_plies를 넘기면 기권한다
+
+    game_ids는 짝과 공유하는 asyncio.Queue: 대국을 만드는 쪽(hosting)이 넣고 다른 쪽이 꺼내 join한다.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    played = 0
+    try:
+        while played < games:
+            writer.write(b'new\n' if hosting else f"join {await game_ids.get()}\n".encode())
+            board = color = None
+            sent_at = None
+            while True:
+                if board is not None and board.turn == color and sent_at is None:
+                    moves = board.generate_legal()
+                    if not moves or board.draw_reason():
+                        sent_at = 0.0 # 서버도 끝난 대국으로 판정하므로 over를 기다린다
+                    elif len(board.history) >= max_plies:
+                        writer.write(b'resign\n')
+                        sent_at = 0.0
+                    else:
+                        if think:
+                            await asyncio.sleep(think)
+                        writer.write(f"move {move_to_uci(rng.choice(moves))}\n".encode())
+                        sent_at = time.perf_counter()
+                line = (await reader.readline()).decode().split()
+                if not line:
+                    return played
+                if line[0] == 'waiting':
+                    game_ids.put_nowait(line[1])
+                elif line[0] == 'game':
+                    color = 'wb'.index(line[2])
+                    board = Board.from_fen(' '.join(line[3:]))
+                elif line[0] == 'ok':
+                    latencies.append(time.perf_counter() - sent_at)
+                    board.make_move(board.find_move(*_squares(line[1])))
+                    sent_at = None
+                elif line[0] == 'opponent':
+                    board.make_move(board.find_move(*_squares(line[1])))
+                elif line[0] == 'over':
+                    played += 1
+                    break
+                elif line[0] == 'error':
+                    raise RuntimeError(' '.join(line))
+    finally:
+        writer.close()
+    return played
+
+
+def _squares(uci):
+    move = parse_uci(uci)
+    return move & 63, (move >> 6) & 63, move >> 12
+
+
+def run_clients(host, port, pairs, first_seed, games, max_plies, think):
+    """한 프로세스 안의 클라이언트 pairs쌍 (multiprocessing 작업 함수). (끝낸 대국 수, 지연 시간 목록)"""
+    latencies = []
+
+    async def main():
+        clients = []
+        for i in range(pairs):
+            game_ids = asyncio.Queue()
+            for hosting in (True, False):
+                seed = first_seed + 2 * i + hosting
+                clients.append(play_client(host, port, games, max_plies, think, seed, latencies, game_ids, hosting))
+        # 같은 대국을 양쪽에서 세므로 절반
+        return sum(await asyncio.gather(*clients)) // 2
+
+    return asyncio.run(main()), latencies
+
+
+def start_server():
+    """빈 포트로 서버 프로세스를 띄우고 (프로세스, 포트)"""
+    process = subprocess.Popen([sys.executable, SERVER_SCRIPT, '--port', '0'], stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline() # listening on host:port
+    return process, int(line.rsplit(':', 1)[1])
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대국 서버 부하 테스트")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="이미 떠 있는 서버 (생략하면 새로 띄운다)")
+    parser.add_argument('--clients', type=int, default=200, help="동시 접속 클라이언트 수 (짝수)")
+    parser.add_argument('--games', type=int, default=3, help="클라이언트마다 둘 대국 수")
+    parser.add_argument('--max-plies', type=int, default=200, help="이 반수를 넘기면 기권")
+    parser.add_argument('--think', type=float, default=0.0, help="수마다 생각하는 척 기다릴 시간(초)")
+    parser.add_argument('--procs', type=int, default=max(1, multiprocessing.cpu_count() - 1),
+                        help="클라이언트를 나눠 돌릴 프로세스 수")
+    args = parser.parse_args(argv)
+    if args.clients % 2:
+        parser.error("--clients는 짝수여야 합니다 (둘씩 짝을 짓는다)")
+
+    server = None
+    port = args.port
+    if port is None:
+        server, port = start_server()
+    try:
+        before = _parse_stats(asyncio.run(_command(args.host, port, 'stats')))
+        start = time.perf_counter()
+        pairs = args.clients // 2
+        procs = min(args.procs, pairs)
+        shares = [pairs // procs + (1 if i < pairs % procs else 0) for i in range(procs)]
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(procs) as pool:
+            jobs = [pool.apply_async(run_clients, (args.host, port, share, sum(shares[:i]) * 2,
+                                                   args.games, args.max_plies, args.think))
+                    for i, share in enumerate(shares)]
+            results = [job.get() for job in jobs]
+        elapsed = time.perf_counter() - start
+        after = _parse_stats(asyncio.run(_command(args.host, port, 'stats')))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latencies = sorted(latency for _, values in results for latency in values)
+    games = after['games'] - before['games']
+    moves = after['moves'] - before['moves']
+    cpu = after['cpu'] - before['cpu']
+    print(f"clients {args.clients}  games {games:.0f}  moves {moves:.0f}  time {elapsed:.2f}s  "
+          f"{games / elapsed:.1f} games/s  {moves / elapsed:.0f} moves/s")
+    if latencies:
+        print("move latency (ms)  " + "  ".join(f"p{int(p * 100)} {percentile(latencies, p) * 1000:.2f}"
+                                                for p in (0.5, 0.9, 0.99)) + f"  max {latencies[-1] * 1000:.2f}")
+    else:
+        print("move latency (ms)  no samples (no moves were played)")
+    print(f"server cpu {cpu:.2f}s ({cpu / elapsed:.0%} of one core)  "
+          f"{games / cpu if cpu else 0:.1f} games per core-second  {moves / cpu if cpu else 0:.0f} moves per core-second")
+
+
+if __name__ == '__main__':
+    main()
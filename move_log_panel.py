@@ -0,0 +1,86 @@
+"""기보 패널: 수 한 쌍(한 줄)마다 렌더링한 Surface를 보관하고 보이는 줄만 그린다
+
+수가 추가되거나 고쳐질 때 그 수가 있는 줄 하나만 다시 렌더링하므로
+프레임당 비용이 게임 길이와 상관없이 일정하다.
+"""
+import pygame
+
+SCROLLBAR_WIDTH = 4
+
+
+class MoveLogPanel:
+    def __init__(self, rect, render_cache, font_spec, color, line_height=30, top_margin=40):
+        self.rect = pygame.Rect(rect)
+        self.render_cache = render_cache
+        self.font = render_cache.font(*font_spec)
+        self.color = color
+        self.line_height = line_height
+        self.top_margin = top_margin
+        self.bottom_margin = 0 # 아래쪽에 다른 정보(엔진 정보 등)를 그릴 공간
+        self.moves = [] # 패널에 보이는 표기 (출처 표시 포함)
+        self.lines = [] # 줄(수 한 쌍)별 Surface
+        self.first_line = 0 # 화면 맨 위에 보이는 줄
+        self.follow = True # 마지막 줄을 따라 자동 스크롤할지 (사용자가 위로 올리면 꺼짐)
+        self.version = 0 # 내용/스크롤이 바뀔 때마다 증가 (다시 그릴지 판단용)
+
+    @property
+    def visible_lines(self):
+        height = self.rect.height - self.top_margin - self.bottom_margin
+        return max(1, height // self.line_height)
+
+    def clear(self):
+        self.moves = []
+        self.lines = []
+        self.first_line = 0
+        self.follow = True
+        self.version += 1
+
+    def set_move(self, index, notation, tag=None):
+        """index번째 수(0부터)를 추가하거나 고침. 그 수가 들어 있는 줄 하나만 다시 렌더링
+
+        tag는 수 뒤에 붙는 짧은 표시 (오프닝북, 엔드게임 테이블에서 둔 수 등)
+        """
+        if tag:
+            notation += tag
+        if index == len(self.moves):
+            self.moves.append(notation)
+        else:
+            self.moves[index] = notation
+        line_index = index // 2
+        white = self.moves[line_index * 2]
+        line = f"{line_index + 1}. {white}"
+        # 흑의 수가 있는지 확인
+        if line_index * 2 + 1 < len(self.moves):
+            line += f" {self.moves[line_index * 2 + 1]}"
+        surface = self.font.render(line, True, self.color)
+        if line_index == len(self.lines):
+            self.lines.append(surface)
+        else:
+            self.lines[line_index] = surface
+        if self.follow:
+            self.first_line = max(0, len(self.lines) - self.visible_lines)
+        self.version += 1
+
+    def scroll(self, delta_lines):
+        """delta_lines > 0이면 아래(최근 수)로, < 0이면 위로"""
+        last_first = max(0, len(self.lines) - self.visible_lines)
+        first_line = min(max(0, self.first_line + delta_lines), last_first)
+        self.follow = first_line == last_first
+        if first_line != self.first_line:
+            self.first_line = first_line
+            self.version += 1
+
+    def draw(self, win):
+        """보이는 줄만 blit (줄 수와 관계없이 최대 visible_lines번)"""
+        x = self.rect.x + 10
+        y = self.rect.y + self.top_margin
+        visible = self.visible_lines
+        for surface in self.lines[self.first_line:self.first_line + visible]:
+            win.blit(surface, (x, y))
+            y += self.line_height
+        if len(self.lines) > visible:
+            # 스크롤 위치 표시
+            track_height = visible * self.line_height
+            thumb_height = max(10, track_height * visible // len(self.lines))
+            thumb_y = self.rect.y + self.top_margin + (track_height - thumb_height) * self.first_line // (len(self.lines) - visible)
+            pygame.draw.rect(win, (90, 90, 90), (self.rect.right - SCROLLBAR_WIDTH - 2, thumb_y, SCROLLBAR_WIDTH, thumb_height))
@@ -0,0 +1,51 @@
+"""GUI용 대국 서버 연결 (server.py의 한 줄 명령 프로토콜)
+
+pygame 루프를 막지 않도록 받기 스레드가 줄 단위로 읽어 queue에 넣고,
+Game.update가 매 프레임 poll()로 꺼내 처리한다 (스프라이트 로딩 스레드와 같은 방식).
+"""
+import queue
+import socket
+import threading
+
+
+class NetworkClient:
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port))
+        self.messages = queue.Queue()
+        self.closed = False
+        threading.Thread(target=self._receive, daemon=True).start()
+
+    @classmethod
+    def from_address(cls, address):
+        """'host:port' 또는 'port'"""
+        host, _, port = address.rpartition(':')
+        return cls(host or '127.0.0.1', int(port))
+
+    def _receive(self):
+        try:
+            with self.sock.makefile('r', encoding='utf-8', errors='replace') as stream:
+                for line in stream:
+                    self.messages.put(line.strip())
+        except OSError:
+            pass
+        self.closed = True
+        self.messages.put('closed')
+
+    def send(self, line):
+        try:
+            self.sock.sendall(line.encode() + b'\n')
+        except OSError:
+            self.closed = True
+
+    def poll(self):
+        """받은 줄들 (기다리지 않음)"""
+        lines = []
+        while True:
+            try:
+                lines.append(self.messages.get_nowait())
+            except queue.Empty:
+                return lines
+
+    def close(self):
+        self.send('quit')
+        self.sock.close()
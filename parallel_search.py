@@ -0,0 +1,176 @@
+"""프로세스 풀을 이용한 루트 분할(root splitting) 병렬 탐색
+
+GIL 때문에 스레드로는 코어를 하나밖에 못 쓰므로, 루트 수들을 작업자 프로세스에
+나눠 주고 같은 깊이의 결과 중 가장 좋은 점수를 고른다. 포지션은 Game 객체가 아니라
+Board.pack()의 66바이트 직렬화로 전달한다 (Game에는 pygame Surface가 들어 있다).
+
+사용 예 (작업자 수별 nodes/sec 측정):
+    python parallel_search.py --bench --workers 1,2,4,8 --depth 5
+"""
+import argparse
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from chess_engine import START_FEN, Board, move_to_uci
+from search import MAX_PLY, MATE_THRESHOLD, SearchInfo, Searcher
+
+# --- 작업자 프로세스 쪽 ---
+_worker_searcher = None
+
+
+def _init_worker(hash_mb, stop_event):
+    # 작업자마다 치환표를 하나씩 두고 탐색 사이에 재사용
+    global _worker_searcher
+    _worker_searcher = Searcher(hash_mb)
+    _worker_searcher.external_stop = stop_event
+
+
+def _search_chunk(packed, keys, halfmove_clock, root_moves, depth, movetime, nodes):
+    """root_moves만 depth 한 깊이로 탐색해 (best_move, score, nodes, 끝까지 탐색했는지, pv) 반환
+
+    반복 심화는 주 프로세스가 하므로 작업자는 얕은 깊이를 다시 탐색하지 않는다 (이전 깊이의 수 순서는
+    작업자의 치환표에 남아 있다). keys/halfmove_clock으로 수 기록을 되살려 반복과 50수 규칙도 무승부로 본다.
+    """
+    board = Board.unpack(packed, keys, halfmove_clock)
+    move, info = _worker_searcher.search(board, depth=depth, movetime=movetime, nodes=nodes,
+                                         root_moves=root_moves, start_depth=depth)
+    completed = info is not None and (info.depth == depth or abs(info.score) >= MATE_THRESHOLD)
+    score = info.score if info else 0
+    return move, score, _worker_searcher.nodes, completed, info.pv if info else [move]
+
+
+# --- 주 프로세스 쪽 ---
+class ParallelSearcher:
+    """Searcher와 같은 search()/stop() 인터페이스를 갖는 병렬 탐색기 (SearchThread에 그대로 넘길 수 있다)"""
+
+    def __init__(self, workers=None, hash_mb=16):
+        self.workers = workers or multiprocessing.cpu_count()
+        context = multiprocessing.get_context('spawn')
+        self.stop_event = context.Event()
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context,
+                                        initializer=_init_worker, initargs=(hash_mb, self.stop_event))
+        self.nodes = 0
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+        self.stop_event.set()
+
+    def clear_stop(self):
+        """Searcher.clear_stop과 같음 (SearchThread.start가 스레드를 띄우기 전에 호출)"""
+        self._stopped.clear()
+        self.stop_event.clear()
+
+    def close(self):
+        self.stop()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def search(self, board, depth=MAX_PLY, movetime=None, nodes=None, on_info=None):
+        """깊이마다 루트 수를 작업자에게 나눠 탐색 (nodes 제한은 작업자 수로 나눠 적용)"""
+        start = time.perf_counter()
+        deadline = start + movetime if movetime else None
+        packed = board.pack()
+        keys = board.recent_keys()
+        root_moves = board.generate_legal()
+        if not root_moves:
+            return 0, SearchInfo(0, 0, 0, 0, 0.0, [])
+        best_move = root_moves[0]
+        info = None
+        self.nodes = 0
+        node_budget = nodes // self.workers if nodes else None
+
+        for current_depth in range(1, min(depth, MAX_PLY - 1) + 1):
+            remaining = deadline - time.perf_counter() if deadline else None
+            if remaining is not None and remaining <= 0:
+                break
+            # 직전 깊이에서 좋았던 수들이 여러 작업자에게 고루 퍼지도록 번갈아 배분
+            chunks = [root_moves[i::self.workers] for i in range(self.workers)]
+            node_limit = node_budget - self.nodes // self.workers if node_budget else None
+            if node_limit is not None and node_limit <= 0:
+                break
+            futures = [self.pool.submit(_search_chunk, packed, keys, board.halfmove_clock, chunk, current_depth,
+                                        remaining, node_limit)
+                       for chunk in chunks if chunk]
+            done, _ = wait(futures)
+            results = [future.result() for future in done]
+            self.nodes += sum(result[2] for result in results)
+            if self._stopped.is_set() or not all(result[3] for result in results):
+                break  # 깊이를 다 끝내지 못한 결과는 버린다
+
+            results.sort(key=lambda result: result[1], reverse=True)
+            best_move, best_score, best_pv = results[0][0], results[0][1], results[0][4]
+            order = {result[0]: rank for rank, result in enumerate(results)}
+            root_moves.sort(key=lambda move: order.get(move, len(order)))
+            elapsed = time.perf_counter() - start
+            info = SearchInfo(current_depth, best_score, self.nodes,
+                              int(self.nodes / elapsed) if elapsed > 0 else 0, elapsed, best_pv or [best_move])
+            if on_info:
+                on_info(info)
+            if abs(best_score) >= MATE_THRESHOLD:
+                break
+            if deadline and time.perf_counter() + elapsed * 2 > deadline:
+                break
+        return best_move, info
+
+
+BENCH_POSITIONS = [
+    START_FEN,
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+]
+
+
+def scaling_benchmark(worker_counts, depth):
+    """작업자 수별 (workers, 총 노드, 걸린 시간, nodes/sec)"""
+    rows = []
+    for workers in worker_counts:
+        searcher = ParallelSearcher(workers)
+        try:
+            # 프로세스 시작 비용이 측정에 섞이지 않도록 먼저 한 번 돌린다
+            searcher.search(Board(), depth=1)
+            total_nodes = 0
+            start = time.perf_counter()
+            for fen in BENCH_POSITIONS:
+                searcher.search(Board.from_fen(fen), depth=depth)
+                total_nodes += searcher.nodes
+            elapsed = time.perf_counter() - start
+        finally:
+            searcher.close()
+        rows.append((workers, total_nodes, elapsed, total_nodes / elapsed if elapsed else 0.0))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel root-splitting search")
+    parser.add_argument('--fen', default=START_FEN)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--movetime', type=float)
+    parser.add_argument('--workers', default=str(multiprocessing.cpu_count()),
+                        help="worker count, or a comma-separated list with --bench")
+    parser.add_argument('--bench', action='store_true', help="report nodes/sec for each worker count")
+    args = parser.parse_args(argv)
+
+    worker_counts = [int(n) for n in args.workers.split(',')]
+    if args.bench:
+        rows = scaling_benchmark(worker_counts, args.depth)
+        base = rows[0][3] or 1.0
+        print(f"{'workers':>7} {'nodes':>10} {'seconds':>8} {'nps':>10} {'speedup':>8}")
+        for workers, nodes, elapsed, nps in rows:
+            print(f"{workers:>7} {nodes:>10} {elapsed:>8.2f} {nps:>10,.0f} {nps / base:>7.2f}x")
+        return 0
+
+    searcher = ParallelSearcher(worker_counts[0])
+    try:
+        move, info = searcher.search(Board.from_fen(args.fen), depth=args.depth, movetime=args.movetime,
+                                     on_info=lambda i: print(f"depth {i.depth} score {i.score} "
+                                                             f"nodes {i.nodes} nps {i.nps}"))
+    finally:
+        searcher.close()
+    print(f"bestmove {move_to_uci(move)}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
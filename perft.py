@@ -0,0 +1,166 @@
+"""perft: 수 생성기의 정확성 검사와 속도 측정 (pygame 없이 실행)
+
+사용 예:
+    python perft.py --depth 4
+    python perft.py --position kiwipete --depth 3 --divide
+    python perft.py --suite --max-nodes 2000000
+    python perft.py --suite --bench bench_output.txt
+
+SUITE의 얕은 깊이와 FEN/pack/make-unmake 왕복은 tests/test_perft.py가 검사한다 (python -m pytest -q).
+"""
+import argparse
+import json
+import time
+
+from chess_engine import START_FEN, Board, move_to_uci
+
+# 잘 알려진 검증용 포지션과 깊이별 리프 노드 수
+SUITE = {
+    'startpos': (START_FEN, {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    'kiwipete': ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                 {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    'position3': ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+                  {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    'position4': ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+                  {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    'position5': ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+                  {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    'position6': ('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+                  {1: 46, 2: 2079, 3: 89890}),
+    # 앙파상 / 캐슬링 / 승급 함정
+    'ep-illegal-pin': ('3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1', {6: 1134888}),
+    'ep-illegal-diagonal': ('8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1', {6: 1015133}),
+    'ep-gives-check': ('8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1', {6: 1440467}),
+    'castle-gives-check': ('5k2/8/8/8/8/8/8/4K2R w K - 0 1', {6: 661072}),
+    'long-castle-gives-check': ('3k4/8/8/8/8/8/8/R3K3 w Q - 0 1', {6: 803711}),
+    'castling-rights-lost': ('r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1', {4: 1274206}),
+    'castling-prevented': ('r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1', {4: 1720476}),
+    'promote-out-of-check': ('2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1', {6: 3821001}),
+    'discovered-check': ('8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1', {5: 1004658}),
+    'promote-gives-check': ('4k3/1P6/8/8/8/8/K7/8 w - - 0 1', {6: 217342}),
+    'underpromote': ('8/P1k5/K7/8/8/8/8/8 w - - 0 1', {6: 92683}),
+    'self-stalemate': ('K1k5/8/P7/8/8/8/8/8 w - - 0 1', {6: 2217}),
+    'stalemate-checkmate': ('8/k1P5/8/1K6/8/8/8/8 w - - 0 1', {7: 567584}),
+    'double-check': ('8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1', {4: 23527}),
+}
+
+
+def perft(board, depth):
+    """depth 수 뒤의 리프 노드 수 (마지막 깊이는 합법수 개수로 바로 셈)"""
+    moves = board.generate_legal()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """첫 수별 리프 노드 수 {uci: nodes} (다른 엔진과 비교해 버그 위치를 좁힐 때 사용)"""
+    result = {}
+    for move in board.generate_legal():
+        board.make_move(move)
+        result[move_to_uci(move)] = perft(board, depth - 1)
+        board.unmake_move()
+    return result
+
+
+def timed_perft(fen, depth):
+    """(nodes, 걸린 시간, nodes/sec)"""
+    board = Board.from_fen(fen)
+    start = time.perf_counter()
+    nodes = perft(board, depth)
+    elapsed = time.perf_counter() - start
+    return nodes, elapsed, nodes / elapsed if elapsed > 0 else 0.0
+
+
+def run_suite(max_nodes=2_000_000, names=None):
+    """SUITE의 각 포지션을 기대 노드 수가 max_nodes 이하인 가장 깊은 깊이로 실행"""
+    results = []
+    for name, (fen, expected) in SUITE.items():
+        if names and name not in names:
+            continue
+        depths = [d for d, n in expected.items() if n <= max_nodes]
+        if not depths:
+            continue
+        depth = max(depths)
+        nodes, elapsed, nps = timed_perft(fen, depth)
+        results.append({'name': name, 'depth': depth, 'nodes': nodes, 'expected': expected[depth],
+                        'ok': nodes == expected[depth], 'seconds': elapsed, 'nps': nps})
+    return results
+
+
+def record_bench(path, results):
+    """결과를 JSON 한 줄로 추가하고, 직전 기록과 비교한 nps 변화율을 반환"""
+    total_nodes = sum(r['nodes'] for r in results)
+    total_time = sum(r['seconds'] for r in results)
+    entry = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'nodes': total_nodes,
+             'seconds': total_time, 'nps': total_nodes / total_time if total_time else 0.0,
+             'positions': {r['name']: r['nps'] for r in results}}
+    previous = None
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        if lines:
+            previous = json.loads(lines[-1])
+    except FileNotFoundError:
+        pass
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+    if previous and previous.get('nps'):
+        return entry['nps'] / previous['nps'] - 1.0
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move generator perft / benchmark")
+    parser.add_argument('--fen', help="FEN to run (default: start position)")
+    parser.add_argument('--position', choices=sorted(SUITE), help="named position from the suite")
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--divide', action='store_true', help="print node counts per root move")
+    parser.add_argument('--suite', action='store_true', help="run the correctness suite")
+    parser.add_argument('--max-nodes', type=int, default=2_000_000,
+                        help="suite: skip depths expected to exceed this many nodes")
+    parser.add_argument('--bench', metavar='FILE', help="suite: append results to FILE and compare with the last run")
+    args = parser.parse_args(argv)
+
+    if args.suite:
+        results = run_suite(args.max_nodes)
+        for r in results:
+            status = 'ok' if r['ok'] else f"FAIL (expected {r['expected']})"
+            print(f"{r['name']:<24} depth {r['depth']}  {r['nodes']:>10} nodes  "
+                  f"{r['seconds']:7.2f}s  {r['nps']:>10,.0f} nps  {status}")
+        total_nodes = sum(r['nodes'] for r in results)
+        total_time = sum(r['seconds'] for r in results)
+        print(f"total {total_nodes} nodes in {total_time:.2f}s, {total_nodes / total_time:,.0f} nps")
+        if args.bench:
+            change = record_bench(args.bench, results)
+            if change is not None:
+                print(f"nps change vs previous run: {change:+.1%}")
+        return 0 if all(r['ok'] for r in results) else 1
+
+    fen = args.fen or (SUITE[args.position][0] if args.position else START_FEN)
+    board = Board.from_fen(fen)
+    start = time.perf_counter()
+    if args.divide:
+        counts = divide(board, args.depth)
+        for uci in sorted(counts):
+            print(f"{uci}: {counts[uci]}")
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"depth {args.depth}: {nodes} nodes in {elapsed:.3f}s ({nodes / elapsed if elapsed else 0:,.0f} nps)")
+    if args.position:
+        expected = SUITE[args.position][1].get(args.depth)
+        if expected is not None and expected != nodes:
+            print(f"MISMATCH: expected {expected}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,280 @@
+"""SAN 변환과 스트리밍 PGN 읽기/쓰기
+
+- move_to_san / parse_san: 중의성 해소(Nbd7, R1e2, Qh4e1), 승급(=Q), 체크(+), 메이트(#)까지 포함한 SAN
+- read_games: 한 줄씩 읽으며 게임을 하나씩 내주는 제너레이터라서 파일 크기와 상관없이 메모리가 일정하다
+  (주석 {...}, ; 한 줄 주석, 변화수 (...), NAG $n, 수 번호는 건너뜀)
+- replay: 게임의 수를 수 생성기로 검증하며 재생
+- write_game: Seven Tag Roster 순서의 헤더와 79자 줄바꿈 수 목록
+
+python pgn.py games.pgn [--out normalized.pgn]   # 모든 게임을 재생해 검증하고 games/sec 출력
+"""
+import argparse
+import contextlib
+import gzip
+import re
+import sys
+import time
+from collections import namedtuple
+
+from chess_engine import (KING, PAWN, PIECE_CHARS, START_FEN, Board,
+                          move_from, move_promotion, move_to, parse_square, square_name)
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+SEVEN_TAG_ROSTER = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+
+# headers: 태그 dict (파일에 나온 순서), moves: SAN 문자열 목록, result: RESULTS 중 하나
+PGNGame = namedtuple('PGNGame', 'headers moves result')
+
+_SAN_RE = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+_TAG_RE = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]\s*$')
+_TOKEN_RE = re.compile(r'\{|\}|\(|\)|;|\$\d+|1-0|0-1|1/2-1/2|\*|\d+\.+|[^\s{}();.]+[^\s{}();]*')
+
+
+class PGNError(ValueError):
+    """SAN이나 PGN을 해석할 수 없거나 수가 규칙에 맞지 않을 때"""
+
+
+# --- SAN ---
+def move_to_san(board, move, legal_moves=None):
+    """board(수를 두기 전)에서 move의 SAN. legal_moves를 주면 수 생성을 한 번 생략한다"""
+    frm = move_from(move)
+    to = move_to(move)
+    code = board.squares[frm]
+    piece_type = code % 6
+    if piece_type == KING and abs(to - frm) == 2:
+        san = 'O-O' if to > frm else 'O-O-O'
+    else:
+        capture = board.is_capture(move)
+        if piece_type == PAWN:
+            san = square_name(frm)[0] + 'x' if capture else ''
+        else:
+            san = PIECE_CHARS[piece_type]
+            # 같은 종류의 다른 기물이 같은 칸으로 갈 수 있으면 출발 칸으로 구분
+            if legal_moves is None:
+                legal_moves = board.generate_legal()
+            rivals = [move_from(other) for other in legal_moves
+                      if move_to(other) == to and move_from(other) != frm and board.squares[move_from(other)] == code]
+            if rivals:
+                if all(rival & 7 != frm & 7 for rival in rivals):
+                    san += square_name(frm)[0]
+                elif all(rival >> 3 != frm >> 3 for rival in rivals):
+                    san += square_name(frm)[1]
+                else:
+                    san += square_name(frm)
+            if capture:
+                san += 'x'
+        san += square_name(to)
+        if move_promotion(move):
+            san += '=' + PIECE_CHARS[move_promotion(move)]
+    board.make_move(move)
+    try:
+        if board.in_check():
+            san += '#' if not board.generate_legal() else '+'
+    finally:
+        board.unmake_move()
+    return san
+
+
+def parse_san(board, san, legal_moves=None):
+    """SAN 문자열을 board의 합법수로 변환. 없거나 모호하면 PGNError"""
+    text = san.rstrip('+#!?')
+    if legal_moves is None:
+        legal_moves = board.generate_legal()
+    squares = board.squares
+    if text in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+        long_castle = len(text) == 5
+        for move in legal_moves:
+            frm, to = move_from(move), move_to(move)
+            if squares[frm] % 6 == KING and abs(to - frm) == 2 and (to < frm) == long_castle:
+                return move
+        raise PGNError(f"캐슬링할 수 없음: {san}")
+
+    match = _SAN_RE.match(text)
+    if not match:
+        raise PGNError(f"SAN 형식이 아님: {san}")
+    piece_char, from_file, from_rank, to_name, promotion_char = match.groups()
+    piece_type = PIECE_CHARS.index(piece_char) if piece_char else PAWN
+    to = parse_square(to_name)
+    promotion = PIECE_CHARS.index(promotion_char) if promotion_char else 0
+    candidates = []
+    for move in legal_moves:
+        frm = move_from(move)
+        if (move_to(move) != to or squares[frm] % 6 != piece_type or move_promotion(move) != promotion
+                or (from_file and square_name(frm)[0] != from_file)
+                or (from_rank and square_name(frm)[1] != from_rank)):
+            continue
+        candidates.append(move)
+    if len(candidates) != 1:
+        raise PGNError(f"{'모호한' if candidates else '합법이 아닌'} 수: {san} ({board.to_fen()})")
+    return candidates[0]
+
+
+# --- 읽기 ---
+def read_games(stream):
+    """텍스트 스트림에서 PGNGame을 하나씩 생성 (한 번에 한 게임만 메모리에 둔다)"""
+    headers = {}
+    moves = []
+    comment = False # 여러 줄에 걸친 {...} 주석 안인지
+    depth = 0 # 변화수 괄호 깊이
+    for line in stream:
+        if not comment and not depth:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('%'):
+                continue # 빈 줄, 이스케이프 줄
+            match = _TAG_RE.match(stripped) if stripped.startswith('[') else None
+            if match:
+                if moves:
+                    # 결과 표기 없이 다음 게임 헤더가 시작된 경우
+                    yield PGNGame(headers, moves, headers.get('Result', '*'))
+                    headers, moves = {}, []
+                headers[match.group(1)] = match.group(2).replace('\\"', '"').replace('\\\\', '\\')
+                continue
+        for token in _TOKEN_RE.findall(line):
+            if comment:
+                comment = token != '}'
+            elif token == '{':
+                comment = True
+            elif token == ';':
+                break # 줄 끝까지 주석
+            elif token == '(':
+                depth += 1
+            elif token == ')':
+                depth = max(0, depth - 1)
+            elif depth or token[0] == '$' or token[0].isdigit() and token.endswith('.'):
+                continue # 변화수 안의 수, NAG, 수 번호
+            elif token in RESULTS:
+                yield PGNGame(headers, moves, token)
+                headers, moves = {}, []
+            else:
+                moves.append(token)
+    if headers or moves:
+        yield PGNGame(headers, moves, headers.get('Result', '*'))
+
+
+def start_board(headers):
+    """FEN 태그가 있으면 그 포지션, 없으면 초기 포지션"""
+    return Board.from_fen(headers['FEN']) if 'FEN' in headers else Board()
+
+
+def replay(game):
+    """게임의 SAN을 차례로 두며 (board, 인코딩된 수 목록)을 반환. 규칙에 어긋나면 PGNError"""
+    board = start_board(game.headers)
+    moves = []
+    for san in game.moves:
+        move = parse_san(board, san)
+        board.make_move(move)
+        moves.append(move)
+    return board, moves
+
+
+def open_pgn(path):
+    """.gz도 그대로 읽는다. 깨진 바이트는 대체 문자로 바꿔 읽기를 계속한다
+
+    '-'는 표준 입력이며, with 블록이 끝나도 닫지 않는다 (같은 프로세스에서 다시 읽을 수 있도록).
+    """
+    if path == '-':
+        return contextlib.nullcontext(sys.stdin)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8', errors='replace')
+
+
+# --- 쓰기 ---
+def format_movetext(moves, result, fullmove_number=1, black_first=False, width=79):
+    """SAN 목록을 수 번호와 함께 width자에서 줄바꿈한 문자열로"""
+    words = []
+    number = fullmove_number
+    for i, san in enumerate(moves):
+        white_to_move = (i % 2 == 0) != black_first
+        if white_to_move:
+            words.append(f"{number}.")
+        elif i == 0:
+            words.append(f"{number}...")
+        words.append(san)
+        if not white_to_move:
+            number += 1
+    words.append(result)
+    lines = []
+    line = ''
+    for word in words:
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+    return '\n'.join(lines)
+
+
+def write_game(stream, headers, moves, result='*'):
+    """헤더(Seven Tag Roster 먼저)와 수 목록을 PGN 한 게임으로 기록"""
+    headers = dict(headers)
+    headers['Result'] = result
+    ordered = list(SEVEN_TAG_ROSTER) + [tag for tag in headers if tag not in SEVEN_TAG_ROSTER]
+    for tag in ordered:
+        value = str(headers.get(tag, '?')).replace('\\', '\\\\').replace('"', '\\"')
+        stream.write(f'[{tag} "{value}"]\n')
+    board = start_board(headers)
+    stream.write('\n' + format_movetext(moves, result, board.fullmove_number, board.turn == 1) + '\n\n')
+
+
+def game_headers(start_fen=START_FEN, **tags):
+    """write_game에 넘길 기본 헤더. 초기 포지션이 아니면 SetUp/FEN 태그를 붙인다"""
+    headers = {'Event': '?', 'Site': '?', 'Date': time.strftime('%Y.%m.%d'), 'Round': '?',
+               'White': '?', 'Black': '?'}
+    headers.update(tags)
+    if start_fen != START_FEN:
+        headers['SetUp'] = '1'
+        headers['FEN'] = start_fen
+    return headers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PGN 파일의 모든 게임을 재생해 검증")
+    parser.add_argument('paths', nargs='+', help="PGN 파일 (.gz 가능, -는 표준 입력)")
+    parser.add_argument('--out', help="검증한 게임을 SAN을 다시 만들어 이 파일에 기록")
+    parser.add_argument('--limit', type=int, help="이 수만큼의 게임만 처리")
+    parser.add_argument('--quiet', action='store_true', help="오류 난 게임을 하나씩 출력하지 않음")
+    args = parser.parse_args(argv)
+
+    out = open(args.out, 'w', encoding='utf-8') if args.out else None
+    games = plies = errors = 0
+    start = time.perf_counter()
+    try:
+        for path in args.paths:
+            with open_pgn(path) as stream:
+                for game in read_games(stream):
+                    games += 1
+                    try:
+                        board, moves = replay(game)
+                    except PGNError as e:
+                        errors += 1
+                        if not args.quiet:
+                            print(f"{path} #{games}: {e}")
+                    else:
+                        plies += len(moves)
+                        if out:
+                            board = start_board(game.headers)
+                            sans = []
+                            for move in moves:
+                                sans.append(move_to_san(board, move))
+                                board.make_move(move)
+                            write_game(out, game.headers, sans, game.result)
+                    if games % 1000 == 0:
+                        elapsed = time.perf_counter() - start
+                        print(f"{games} games  {games / elapsed:.0f} games/s", file=sys.stderr)
+                    if args.limit and games >= args.limit:
+                        break
+            if args.limit and games >= args.limit:
+                break
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"games {games}  plies {plies}  errors {errors}  time {elapsed:.2f}s  "
+          f"{games / elapsed if elapsed else 0:.1f} games/s  {plies / elapsed if elapsed else 0:.0f} plies/s")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
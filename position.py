@@ -0,0 +1,206 @@
+"""변경 불가능한 압축 포지션 (탐색 트리, 기보 이력, 일괄 분석에서 포지션을 많이 보관할 때용)
+
+Board.pack()과 같은 66바이트 배치를 bytes 하나에 담는다:
+    0~63  칸별 기물 코드 + 1 (빈 칸 0)
+    64    턴(비트 0) | 캐슬링 권한(비트 1~4)
+    65    앙파상 칸 + 1 (없으면 0)
+반수/수 번호는 포지션의 정체성에 포함하지 않으므로 넣지 않는다.
+
+변경할 수 없으므로 복사는 자기 자신을 돌려주고, 해시/비교는 bytes 그대로 한다.
+읽기 전용 memoryview를 넘기면 복사하지 않고 그 버퍼를 그대로 참조하므로
+pack_positions로 만든 버퍼(또는 공유 메모리)를 프로세스 사이에 넘긴 뒤 복사 없이 읽을 수 있다.
+
+python position.py --bench   # 기존 표현(8x8 문자열 리스트 + dict + tuple), Board와 메모리/복사 비용 비교
+"""
+import argparse
+import copy
+import pickle
+import random
+import timeit
+import tracemalloc
+
+from chess_engine import CASTLING_KEYS, COLOR_CHARS, START_FEN, Board
+
+POSITION_SIZE = 66
+
+
+class Position:
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        if len(data) != POSITION_SIZE:
+            raise ValueError(f"포지션은 {POSITION_SIZE}바이트여야 함: {len(data)}")
+        if isinstance(data, memoryview) and data.readonly:
+            self._data = data # 복사 없이 참조 (zero-copy)
+        else:
+            self._data = bytes(data)
+
+    @classmethod
+    def from_board(cls, board):
+        return cls(board.pack())
+
+    @classmethod
+    def from_fen(cls, fen):
+        return cls.from_board(Board.from_fen(fen))
+
+    def to_board(self):
+        """수 생성/탐색용 Board로 풀기 (반수/수 번호는 0, 1)"""
+        return Board.unpack(self._data)
+
+    def to_fen(self):
+        return self.to_board().to_fen()
+
+    def play(self, move):
+        """move를 둔 뒤의 새 Position"""
+        board = self.to_board()
+        board.make_move(move)
+        return Position.from_board(board)
+
+    # --- 조회 ---
+    def piece_at(self, sq):
+        """칸의 기물 코드 (빈 칸은 EMPTY)"""
+        return self._data[sq] - 1
+
+    @property
+    def turn(self):
+        return self._data[64] & 1
+
+    @property
+    def castling(self):
+        return self._data[64] >> 1
+
+    @property
+    def ep_square(self):
+        return self._data[65] - 1
+
+    # --- 직렬화 ---
+    def view(self):
+        """내부 버퍼의 읽기 전용 memoryview (복사 없음)"""
+        return memoryview(self._data).toreadonly()
+
+    def __bytes__(self):
+        return bytes(self._data)
+
+    def __reduce__(self):
+        # memoryview를 참조하는 경우에도 피클할 수 있도록 bytes로
+        return (Position, (bytes(self._data),))
+
+    # --- 해시 / 비교 / 복사 ---
+    def __hash__(self):
+        return hash(self._data)
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self._data == other._data
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"Position.from_fen({self.to_fen()!r})"
+
+
+def pack_positions(positions):
+    """여러 포지션을 버퍼 하나로 이어 붙임 (프로세스 사이 전달용)"""
+    buffer = bytearray(POSITION_SIZE * len(positions))
+    for i, position in enumerate(positions):
+        buffer[i * POSITION_SIZE:(i + 1) * POSITION_SIZE] = position._data
+    return bytes(buffer)
+
+
+def unpack_positions(buffer):
+    """pack_positions의 버퍼에서 Position을 하나씩. 버퍼를 복사하지 않고 조각을 참조한다"""
+    view = memoryview(buffer).toreadonly()
+    for offset in range(0, len(view), POSITION_SIZE):
+        yield Position(view[offset:offset + POSITION_SIZE])
+
+
+# --- 벤치마크 ---
+def _legacy_state(board):
+    """기존 Game이 들고 있던 상태: 8x8 문자열 리스트, 캐슬링 dict, 앙파상 tuple, 턴 문자"""
+    ep = divmod(board.ep_square, 8) if board.ep_square >= 0 else ()
+    castling = {key: bool(board.castling & bit) for key, bit in CASTLING_KEYS.items()}
+    return board.rows(), castling, ep, COLOR_CHARS[board.turn]
+
+
+def _copy_legacy(state):
+    rows, castling, ep, turn = state
+    return [row[:] for row in rows], dict(castling), ep, turn
+
+
+def _sample_boards(count, seed=7):
+    """무작위 대국에서 고른 포지션들 (보드마다 독립된 객체)"""
+    rng = random.Random(seed)
+    boards = []
+    board = Board()
+    while len(boards) < count:
+        moves = board.generate_legal()
+        if not moves or len(board.history) > 120:
+            board = Board()
+            continue
+        board.make_move(rng.choice(moves))
+        snapshot = board.copy()
+        snapshot.history = []
+        boards.append(snapshot)
+    return boards
+
+
+def _bytes_per_item(build, items):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(item) for item in items]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # 결과를 담는 리스트 자체(항목당 포인터 8바이트)는 빼고 계산
+    return (after - before - len(kept) * 8) / len(items)
+
+
+def benchmark(count=10000):
+    boards = _sample_boards(count)
+    print(f"{count} positions from random games")
+    print(f"{'representation':<22}{'bytes/position':>16}{'copy (us)':>12}{'hash+eq (us)':>14}{'pickle (B)':>12}")
+
+    legacy = [_legacy_state(board) for board in boards[:1000]]
+    positions = [Position.from_board(board) for board in boards[:1000]]
+    rows = [
+        ('legacy lists+dict', _bytes_per_item(_legacy_state, boards),
+         timeit.timeit(lambda: [_copy_legacy(state) for state in legacy], number=5) / 5000,
+         None, len(pickle.dumps(legacy[-1]))),
+        ('Board', _bytes_per_item(Board.copy, boards),
+         timeit.timeit(lambda: [board.copy() for board in boards[:1000]], number=5) / 5000,
+         None,
+         len(pickle.dumps(boards[-1]))),
+        ('Position', _bytes_per_item(Position.from_board, boards),
+         timeit.timeit(lambda: [copy.copy(position) for position in positions], number=5) / 5000,
+         timeit.timeit(lambda: [hash(position) and position == position for position in positions], number=5) / 5000,
+         len(pickle.dumps(positions[-1]))),
+    ]
+    for name, size, copy_cost, hash_cost, pickled in rows:
+        hash_text = f"{hash_cost * 1e6:.3f}" if hash_cost is not None else '-'
+        print(f"{name:<22}{size:>16.0f}{copy_cost * 1e6:>12.3f}{hash_text:>14}{pickled:>12}")
+
+    snapshot = timeit.timeit(lambda: [Position.from_board(board) for board in boards[:1000]], number=5) / 5000
+    restore = timeit.timeit(lambda: [position.to_board() for position in positions], number=5) / 5000
+    packed = pack_positions(positions)
+    unpack = timeit.timeit(lambda: list(unpack_positions(packed)), number=5) / 5000
+    print(f"Position.from_board {snapshot * 1e6:.2f} us  to_board {restore * 1e6:.2f} us  "
+          f"unpack_positions {unpack * 1e6:.3f} us/position ({len(packed)} bytes for {len(positions)})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="압축 포지션 메모리/복사 비용 벤치마크")
+    parser.add_argument('--bench', action='store_true', help="벤치마크 실행")
+    parser.add_argument('--count', type=int, default=10000, help="측정할 포지션 수")
+    args = parser.parse_args(argv)
+    if args.bench:
+        benchmark(args.count)
+    else:
+        print(Position.from_fen(START_FEN))
+
+
+if __name__ == '__main__':
+    main()
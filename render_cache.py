@@ -0,0 +1,85 @@
+"""글꼴, 글자 Surface, 반투명 하이라이트 Surface를 재사용하기 위한 렌더링 캐시
+
+- 글꼴: (이름, 크기, 굵게)별로 한 번만 SysFont 검색
+- 글자: (문자열, 글꼴, 색)별 Surface를 LRU로 보관
+- 하이라이트 / 원: (색, 크기)별 Surface 한 장을 계속 재사용
+- 종류별 hit/miss 수를 세어 평상시 프레임에서 새로 만드는 Surface가 없는지 확인할 수 있다
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class RenderCache:
+    def __init__(self, max_text_surfaces=512):
+        self.max_text_surfaces = max_text_surfaces
+        self.fonts = {}
+        self.texts = OrderedDict()
+        self.surfaces = {}
+        self.hits = {'font': 0, 'text': 0, 'surface': 0}
+        self.misses = {'font': 0, 'text': 0, 'surface': 0}
+
+    def font(self, name, size, bold=False):
+        """name이 None이면 pygame 내장 글꼴 (시스템 글꼴 검색 없음)"""
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            self.misses['font'] += 1
+            if name is None:
+                font = pygame.font.Font(None, size)
+                font.set_bold(bold)
+            else:
+                font = pygame.font.SysFont(name, size, bold=bold)
+            self.fonts[key] = font
+        else:
+            self.hits['font'] += 1
+        return font
+
+    def text(self, string, font_spec, color):
+        """font_spec = (이름, 크기, 굵게). 같은 글자는 같은 Surface를 돌려주므로 수정하지 말 것"""
+        key = (string, font_spec, color)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.hits['text'] += 1
+            self.texts.move_to_end(key)
+            return surface
+        self.misses['text'] += 1
+        surface = self.font(*font_spec).render(string, True, color)
+        self.texts[key] = surface
+        if len(self.texts) > self.max_text_surfaces:
+            self.texts.popitem(last=False)
+        return surface
+
+    def _surface(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses['surface'] += 1
+            surface = self.surfaces[key] = build()
+        else:
+            self.hits['surface'] += 1
+        return surface
+
+    def highlight(self, color, size):
+        """color(RGBA)로 채운 반투명 Surface"""
+        def build():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            return surface
+        return self._surface(('fill', color, size), build)
+
+    def circle(self, color, size, radius):
+        """size 크기의 투명 Surface 가운데에 color 원을 그린 것"""
+        def build():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (size[0] // 2, size[1] // 2), radius)
+            return surface
+        return self._surface(('circle', color, size, radius), build)
+
+    def stats(self):
+        """{'hits': {...}, 'misses': {...}} (misses가 곧 새로 만든 글꼴/Surface 수)"""
+        return {'hits': dict(self.hits), 'misses': dict(self.misses)}
+
+    def reset_stats(self):
+        for counter in (self.hits, self.misses):
+            for kind in counter:
+                counter[kind] = 0
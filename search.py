@@ -0,0 +1,342 @@
+"""반복 심화 알파-베타(negamax) 탐색
+
+- 수 정렬: 치환표 수 → MVV-LVA 잡기 → 킬러 수 → 히스토리 점수
+- 리프에서는 잡는 수만 보는 정지 탐색(quiescence), 평가는 evaluation.evaluate (재료+PST, 기동성, 킹 안전)
+- 시간(movetime)/노드 수 제한, 외부 stop 요청 지원
+- SearchThread로 GUI 렌더링 스레드와 분리해 실행
+"""
+import threading
+import time
+from collections import namedtuple
+
+from chess_engine import PAWN, QUEEN, move_to_uci
+from evaluation import evaluate
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+INFINITY = 1_000_000
+MATE = 100_000
+MATE_THRESHOLD = MATE - 1000
+MAX_PLY = 128
+
+PIECE_VALUES = [100, 320, 330, 500, 900, 0] # 수 정렬(MVV-LVA)용
+
+# 탐색 진행 상황 (GUI 측면 패널, UCI info 출력에서 사용)
+SearchInfo = namedtuple('SearchInfo', 'depth score nodes nps elapsed pv')
+
+
+class SearchStopped(Exception):
+    """시간/노드 제한 또는 stop 요청으로 탐색을 중단할 때 사용"""
+
+
+class Searcher:
+    def __init__(self, hash_mb=16):
+        self.tt = TranspositionTable(hash_mb)
+        self.stop_event = threading.Event()
+        self.external_stop = None # 다른 프로세스에서 공유하는 중단 이벤트 (병렬 탐색 작업자용)
+        self.nodes = 0
+        self.reset_heuristics()
+
+    def reset_heuristics(self):
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [0] * (2 * 64 * 64)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def clear_stop(self):
+        """다음 탐색 전에 중단 요청을 지운다. 탐색 스레드 안(search)에서 지우면 스레드를 시작한 직후에 온
+        stop이 사라지므로 SearchThread.start가 스레드를 띄우기 전에 호출한다"""
+        self.stop_event.clear()
+
+    # --- 진입점 ---
+    def search(self, board, depth=MAX_PLY, movetime=None, nodes=None, on_info=None, root_moves=None,
+               start_depth=1):
+        """반복 심화 탐색. 마지막으로 끝까지 탐색한 깊이의 (best_move, SearchInfo)를 반환
+
+        movetime은 초 단위, nodes는 최대 노드 수. on_info(SearchInfo)는 깊이마다 호출된다.
+        root_moves를 주면 루트에서 그 수들만 탐색한다 (병렬 탐색의 루트 분할).
+        start_depth부터 심화한다 (병렬 탐색은 깊이마다 따로 맡기므로 start_depth=depth로 그 깊이만).
+        """
+        self.tt.new_search()
+        self.reset_heuristics()
+        self.nodes = 0
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + movetime if movetime else None
+        self.node_limit = nodes
+        self.board = board
+
+        best_move = 0
+        info = None
+        legal = board.generate_legal()
+        if root_moves is not None:
+            legal = [move for move in legal if move in root_moves]
+        if not legal:
+            return 0, SearchInfo(0, -MATE if board.in_check() else 0, 0, 0, 0.0, [])
+        # 루트 수는 둔 뒤의 정적 평가로 정렬해 두고, 같은 점수끼리는 이 순서를 유지한다
+        # (수가 30개 남짓이라 스칼라 evaluate로 충분하다: 탐색은 NumPy 없이 돈다)
+        scores = []
+        for move in legal:
+            board.make_move(move)
+            scores.append(-evaluate(board))
+            board.unmake_move()
+        legal = [move for _, move in sorted(zip(scores, legal), key=lambda item: -item[0])]
+        self.root_moves = legal
+        for current_depth in range(start_depth, min(depth, MAX_PLY - 1) + 1):
+            try:
+                score = self.negamax(current_depth, -INFINITY, INFINITY, 0)
+            except SearchStopped:
+                break
+            pv = self.principal_variation(current_depth)
+            if pv:
+                best_move = pv[0]
+            elapsed = time.perf_counter() - self.start_time
+            info = SearchInfo(current_depth, score, self.nodes,
+                              int(self.nodes / elapsed) if elapsed > 0 else 0, elapsed, pv)
+            if on_info:
+                on_info(info)
+            if abs(score) >= MATE_THRESHOLD:
+                break
+            # 다음 깊이를 끝낼 시간이 없으면 미리 멈춘다
+            if self.deadline and time.perf_counter() + elapsed * 2 > self.deadline:
+                break
+        if not best_move:
+            best_move = legal[0]
+        return best_move, info
+
+    # --- 탐색 본체 ---
+    def check_limits(self):
+        if self.stop_event.is_set():
+            raise SearchStopped
+        if self.external_stop is not None and self.external_stop.is_set():
+            raise SearchStopped
+        if self.deadline and time.perf_counter() >= self.deadline:
+            raise SearchStopped
+        if self.node_limit and self.nodes >= self.node_limit:
+            raise SearchStopped
+
+    def negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self.check_limits()
+        board = self.board
+        in_check = board.in_check()
+        if in_check:
+            depth += 1  # 체크 연장
+        if depth <= 0:
+            return self.quiescence(alpha, beta, ply)
+        # 반복, 50수 규칙, 기물 부족은 무승부 (반복 검사는 마지막 비가역 수까지만 거슬러 본다)
+        if ply and (board.halfmove_clock >= 100 or board.is_repetition() or board.insufficient_material()):
+            return 0
+
+        key = board.key
+        tt_move = 0
+        entry = self.tt.probe(key)
+        if entry:
+            tt_move, tt_score, tt_depth, tt_flag = entry
+            if ply > 0 and tt_depth >= depth:
+                tt_score = _score_from_tt(tt_score, ply)
+                if tt_flag == EXACT:
+                    return tt_score
+                if tt_flag == LOWER and tt_score >= beta:
+                    return tt_score
+                if tt_flag == UPPER and tt_score <= alpha:
+                    return tt_score
+
+        moves = board.generate_legal() if ply else self.root_moves
+        if not moves:
+            return -MATE + ply if in_check else 0
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        for move in self.order_moves(moves, tt_move, ply):
+            board.make_move(move)
+            try:
+                score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if not board.is_capture(move):
+                            self.update_quiet_heuristics(move, depth, ply)
+                        break
+
+        if best_score >= beta:
+            flag = LOWER
+        elif best_score > original_alpha:
+            flag = EXACT
+        else:
+            flag = UPPER
+        self.tt.store(key, depth, _score_to_tt(best_score, ply), flag, best_move)
+        return best_score
+
+    def quiescence(self, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self.check_limits()
+        board = self.board
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or ply >= MAX_PLY - 1:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        captures = [move for move in board.generate_legal() if board.is_capture(move) or move >> 12 == QUEEN]
+        for move in self.order_moves(captures, 0, ply, quiet=False):
+            board.make_move(move)
+            try:
+                score = -self.quiescence(-beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    # --- 수 정렬 ---
+    def order_moves(self, moves, tt_move, ply, quiet=True):
+        board = self.board
+        squares = board.squares
+        killers = self.killers[ply] if quiet else (0, 0)
+        history = self.history
+        side = board.turn * 4096
+        scored = []
+        for move in moves:
+            if move == tt_move:
+                score = 10_000_000
+            elif board.is_capture(move):
+                victim = squares[(move >> 6) & 63]
+                victim_value = PIECE_VALUES[victim % 6] if victim >= 0 else PIECE_VALUES[PAWN]
+                # MVV-LVA: 가장 비싼 기물을, 가장 싼 기물로 잡는 수를 먼저
+                score = 1_000_000 + victim_value * 10 - PIECE_VALUES[squares[move & 63] % 6] // 10
+            elif move >> 12:
+                score = 900_000 + PIECE_VALUES[move >> 12]
+            elif move == killers[0]:
+                score = 800_000
+            elif move == killers[1]:
+                score = 700_000
+            else:
+                score = history[side + (move & 4095)]
+            scored.append((score, move))
+        scored.sort(key=lambda item: item[0], reverse=True) # 안정 정렬: 같은 점수는 들어온 순서대로
+        return [move for _, move in scored]
+
+    def update_quiet_heuristics(self, move, depth, ply):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        index = self.board.turn * 4096 + (move & 4095)
+        self.history[index] += depth * depth
+        if self.history[index] > 600_000:
+            # 킬러 점수를 넘지 않도록 전체를 줄인다
+            self.history = [value // 2 for value in self.history]
+
+    def principal_variation(self, max_length):
+        """치환표를 따라가며 주 변화(PV)를 복원"""
+        board = self.board
+        pv = []
+        seen = set()
+        for _ in range(max_length):
+            entry = self.tt.probe(board.key)
+            if not entry or not entry[0] or board.key in seen:
+                break
+            move = entry[0]
+            if move not in board.generate_legal():
+                break
+            seen.add(board.key)
+            pv.append(move)
+            board.make_move(move)
+        for _ in pv:
+            board.unmake_move()
+        return pv
+
+
+def _score_to_tt(score, ply):
+    # 메이트 점수는 루트가 아니라 현재 노드 기준 거리로 저장
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def format_score(score):
+    if abs(score) >= MATE_THRESHOLD:
+        moves = (MATE - abs(score) + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+def format_pv(pv):
+    return ' '.join(move_to_uci(move) for move in pv)
+
+
+class SearchThread:
+    """렌더링 루프를 막지 않도록 별도 스레드에서 탐색하고, 결과는 poll()로 가져간다
+
+    on_info(info), on_done(move, info)를 주면 탐색 스레드에서 바로 호출한다 (UCI 출력용).
+    """
+
+    def __init__(self, searcher=None, on_info=None, on_done=None):
+        self.searcher = searcher or Searcher()
+        self.on_info = on_info
+        self.on_done = on_done
+        self.thread = None
+        self.result = None
+        self.info = None
+        self.lock = threading.Lock()
+
+    @property
+    def thinking(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, board, **limits):
+        """board는 복사해서 쓰므로 호출한 쪽은 계속 원본 포지션을 그려도 된다"""
+        self.stop()
+        self.result = None
+        self.info = None
+        board = board.copy()
+        self.searcher.clear_stop()
+        self.thread = threading.Thread(target=self._run, args=(board, limits), name='search', daemon=True)
+        self.thread.start()
+
+    def _run(self, board, limits):
+        move, info = self.searcher.search(board, on_info=self._on_info, **limits)
+        with self.lock:
+            self.result = move
+            if info:
+                self.info = info
+        if self.on_done:
+            self.on_done(move, info)
+
+    def _on_info(self, info):
+        with self.lock:
+            self.info = info
+        if self.on_info:
+            self.on_info(info)
+
+    def poll(self):
+        """탐색이 끝났으면 최선수를 한 번만 반환, 아니면 None"""
+        with self.lock:
+            move, self.result = self.result, None
+        return move
+
+    def stop(self):
+        if self.thinking:
+            self.searcher.stop()
+            self.thread.join()
+        self.thread = None
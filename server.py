@@ -0,0 +1,219 @@
+"""asyncio 대국 서버: 한 프로세스에서 여러 대국을 동시에 진행 (localhost TCP, 한 줄에 명령 하나)
+
+수는 UCI 문자열로 주고받고, 서버가 GUI의 get_valid_moves와 같은 LegalMoveIndex로 합법인지 확인한 뒤 적용한다.
+체크메이트/스테일메이트/규칙상 무승부도 Game.check_game_over와 같은 순서로 판정한다.
+
+클라이언트 → 서버          서버 → 클라이언트
+  seek                      game <id> <w|b> <fen>    상대가 정해지면 양쪽에 (먼저 기다린 쪽이 백)
+  new [fen]                 waiting <id>             join할 상대를 기다림 (정해지면 game ...)
+  join <id>                 game <id> <w|b> <fen>
+  move <uci>                ok <uci>                 둔 쪽에게, 상대에게는 opponent <uci>
+  resign                    over <result> <reason>   result는 PGN 표기 (1-0, 0-1, 1/2-1/2)
+  stats                     stats games=<끝난 대국> active=<진행 중> moves=<총 수> clients=<접속> cpu=<초>
+  quit                      error <내용>             잘못된 명령, 차례가 아님, 합법이 아닌 수 (4096바이트보다 긴 줄이면 끊는다)
+
+python server.py --port 8765
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from chess_engine import BLACK, START_FEN, WHITE, Board, game_outcome, move_to_uci, parse_uci
+from transposition import LegalMoveIndex
+
+DEFAULT_PORT = 8765
+COLORS = 'wb'
+
+
+class ServerGame:
+    def __init__(self, game_id, start_fen=START_FEN):
+        self.id = game_id
+        self.start_fen = start_fen
+        self.board = Board.from_fen(start_fen)
+        self.index = LegalMoveIndex(self.board)
+        self.players = [None, None] # 색별 Session
+        self.moves = [] # 둔 수 (UCI)
+        self.outcome = None
+
+    def play(self, uci):
+        """합법이면 두고 정규화된 UCI를 반환, 아니면 ValueError"""
+        move = parse_uci(uci)
+        found = self.index.find(move & 63, (move >> 6) & 63, move >> 12)
+        if found is None:
+            raise ValueError(f"합법이 아닌 수: {uci}")
+        self.board.make_move(found)
+        self.index = LegalMoveIndex(self.board)
+        self.moves.append(move_to_uci(found))
+        self.outcome = game_outcome(self.board, self.index)
+        return self.moves[-1]
+
+
+class Session:
+    """접속 하나. 대국 중이면 game과 color가 정해져 있다"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.game = None
+        self.color = None
+
+    def send(self, line):
+        if not self.writer.is_closing():
+            self.writer.write(line.encode() + b'\n')
+
+
+class GameServer:
+    def __init__(self):
+        self.games = {} # id → 진행 중(또는 상대를 기다리는) ServerGame
+        self.ids = itertools.count(1)
+        self.seeking = None # seek하고 기다리는 Session
+        self.sessions = 0
+        self.finished = 0
+        self.total_moves = 0
+
+    async def handle_client(self, reader, writer):
+        session = Session(writer)
+        self.sessions += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode(errors='replace').strip().partition(' ')
+                if command == 'quit':
+                    break
+                self.dispatch(session, command, argument.strip())
+                await writer.drain() # 받는 쪽이 느리면 이 접속만 기다린다
+        except ValueError:
+            # limit(4096바이트)보다 긴 줄: StreamReader가 줄 경계를 잃으므로 알리고 접속을 끊는다
+            session.send("error 줄이 너무 김")
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            self.leave(session, 'disconnect')
+            writer.close()
+
+    def dispatch(self, session, command, argument):
+        if command == 'move':
+            self.move(session, argument)
+        elif command == 'seek':
+            self.seek(session)
+        elif command == 'new':
+            self.new(session, argument or START_FEN)
+        elif command == 'join':
+            self.join(session, argument)
+        elif command == 'resign':
+            if session.game is None:
+                session.send("error 대국 중이 아님")
+            else:
+                self.finish(session.game, ('0-1' if session.color == WHITE else '1-0'), 'resign')
+        elif command == 'stats':
+            session.send(f"stats games={self.finished} active={len(self.games)} moves={self.total_moves} "
+                         f"clients={self.sessions} cpu={time.process_time():.3f}")
+        else:
+            session.send(f"error 알 수 없는 명령: {command}")
+
+    # --- 대국 만들기 ---
+    def seek(self, session):
+        self.leave(session, 'resign')
+        if self.seeking is None or self.seeking is session:
+            self.seeking = session
+            return
+        waiting, self.seeking = self.seeking, None
+        game = ServerGame(next(self.ids))
+        self.games[game.id] = game
+        self.start(game, waiting, session)
+
+    def new(self, session, fen):
+        self.leave(session, 'resign')
+        try:
+            game = ServerGame(next(self.ids), fen)
+        except (ValueError, IndexError, KeyError):
+            session.send(f"error 잘못된 FEN: {fen}")
+            return
+        self.games[game.id] = game
+        game.players[WHITE] = session
+        session.game = game
+        session.send(f"waiting {game.id}")
+
+    def join(self, session, argument):
+        game = self.games.get(int(argument)) if argument.isdigit() else None
+        if game is None or game.players[BLACK] is not None or game.players[WHITE] is session:
+            session.send(f"error 참가할 수 없는 대국: {argument}")
+            return
+        self.leave(session, 'resign')
+        self.start(game, game.players[WHITE], session)
+
+    def start(self, game, white, black):
+        for color, session in ((WHITE, white), (BLACK, black)):
+            game.players[color] = session
+            session.game = game
+            session.color = color
+            session.send(f"game {game.id} {COLORS[color]} {game.start_fen}")
+
+    # --- 대국 진행 ---
+    def move(self, session, uci):
+        game = session.game
+        if game is None or game.players[BLACK] is None:
+            session.send("error 대국 중이 아님")
+            return
+        if game.board.turn != session.color:
+            session.send("error 상대 차례")
+            return
+        try:
+            uci = game.play(uci)
+        except ValueError as e:
+            session.send(f"error {e}")
+            return
+        self.total_moves += 1
+        session.send(f"ok {uci}")
+        game.players[session.color ^ 1].send(f"opponent {uci}")
+        if game.outcome:
+            self.finish(game, *game.outcome)
+
+    def finish(self, game, result, reason):
+        for session in game.players:
+            if session is not None:
+                session.send(f"over {result} {reason}")
+                session.game = session.color = None
+        if self.games.pop(game.id, None) is not None and game.players[BLACK] is not None:
+            self.finished += 1
+
+    def leave(self, session, reason):
+        """다른 대국을 시작하거나 접속이 끊길 때 기존 대국/대기열에서 빠진다"""
+        if self.seeking is session:
+            self.seeking = None
+        game = session.game
+        if game is None:
+            return
+        if game.players[BLACK] is None:
+            # 상대가 오기 전이면 대국만 없앤다
+            self.games.pop(game.id, None)
+            session.game = session.color = None
+            return
+        self.finish(game, ('0-1' if session.color == WHITE else '1-0'), reason)
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, ready=None):
+    server = GameServer()
+    listener = await asyncio.start_server(server.handle_client, host, port, limit=4096)
+    if ready:
+        ready(listener.sockets[0].getsockname()[1])
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="여러 대국을 동시에 진행하는 asyncio 대국 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="0이면 빈 포트를 골라 출력")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, lambda port: print(f"listening on {args.host}:{port}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
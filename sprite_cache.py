@@ -0,0 +1,234 @@
+"""포켓몬 스프라이트 디스크 캐시와 병렬 다운로드
+
+- PokeAPI JSON, 원본 PNG, 칸 크기로 줄인 PNG를 sha256 이름으로 objects/ 아래에 저장
+- index.json에 캐시 버전, 칸 크기, ETag를 기록해 두고, 모두 맞으면 네트워크 없이 바로 로드
+- 처음 받을 때는 스레드 풀 + 커넥션 풀을 쓰는 세션으로 동시에 요청 (타임아웃 적용)
+- 전송 계층을 바꿔 끼울 수 있다: HttpTransport(로컬 HTTP 스텁도 base_url로 지정), DirectoryTransport
+
+이 모듈은 pygame을 쓰지 않는다. 이미지 축소는 호출하는 쪽이 scale 함수로 넘긴다.
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+CACHE_VERSION = 1
+API_BASE = 'https://pokeapi.co/api/v2'
+DEFAULT_CACHE_DIR = os.environ.get(
+    'POKEMON_CHESS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'pokemon_chess'))
+
+
+class TransportError(Exception):
+    """전송 계층에서 응답을 받지 못했을 때"""
+
+
+class HttpTransport:
+    """requests.Session 하나를 재사용하는 HTTP 전송 (커넥션 풀 크기 = 동시 요청 수)"""
+
+    def __init__(self, api_base=API_BASE, timeout=10.0, pool_size=8):
+        import requests  # GUI가 실제로 다운로드할 때만 불러온다
+        from requests.adapters import HTTPAdapter
+
+        self.api_base = api_base.rstrip('/')
+        self.timeout = timeout
+        self._requests = requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, etag=None):
+        """(status, content, etag). etag를 주면 If-None-Match로 재검증하고, 바뀌지 않았으면 status 304"""
+        headers = {'If-None-Match': etag} if etag else {}
+        try:
+            res = self.session.get(url, headers=headers, timeout=self.timeout)
+            if res.status_code == 304:
+                return 304, None, etag
+            res.raise_for_status()
+        except self._requests.exceptions.RequestException as e:
+            raise TransportError(f"{url}: {e}") from e
+        return res.status_code, res.content, res.headers.get('ETag')
+
+
+class DirectoryTransport:
+    """URL 경로를 로컬 디렉터리에 대응시키는 전송 (테스트/오프라인용)
+
+    https://pokeapi.co/api/v2/pokemon/pikachu → <root>/api/v2/pokemon/pikachu
+    """
+
+    def __init__(self, root, api_base=API_BASE):
+        self.root = root
+        self.api_base = api_base.rstrip('/')
+
+    def get(self, url, etag=None):
+        path = os.path.join(self.root, *urlparse(url).path.strip('/').split('/'))
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            raise TransportError(f"{url}: {e}") from e
+        digest = hashlib.sha256(content).hexdigest()
+        if etag == digest:
+            return 304, None, etag
+        return 200, content, digest
+
+
+class SpriteCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, transport=None, workers=8):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._transport = transport
+        self.workers = workers
+        self.network_requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def transport(self):
+        # 캐시가 모두 맞으면 전송 계층(과 requests import)을 아예 만들지 않는다
+        if self._transport is None:
+            self._transport = HttpTransport(pool_size=self.workers)
+        return self._transport
+
+    # --- content-addressed 저장소 ---
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def put_object(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)  # 중간에 끊겨도 깨진 파일이 남지 않도록
+        return digest
+
+    def get_object(self, digest):
+        try:
+            with open(self._object_path(digest), 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        # 이름이 곧 해시이므로 손상 여부를 바로 확인할 수 있다
+        return content if hashlib.sha256(content).hexdigest() == digest else None
+
+    def read_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return index.get('entries', {}) if index.get('version') == CACHE_VERSION else {}
+
+    def write_index(self, entries):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': entries}, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    # --- 다운로드 ---
+    def _fetch(self, name, old_entry, revalidate):
+        """포켓몬 하나의 JSON과 원본 PNG를 받아 캐시에 저장하고 새 index 항목을 반환"""
+        transport = self.transport
+        entry = dict(old_entry or {})
+        status, content, etag = transport.get(f"{transport.api_base}/pokemon/{name}",
+                                              entry.get('json_etag') if revalidate else None)
+        self._count_request()
+        if status != 304:
+            data = json.loads(content)
+            entry['json'] = self.put_object(content)
+            entry['json_etag'] = etag
+            sprite_url = data['sprites']['front_default']
+            if sprite_url != entry.get('sprite_url') or not entry.get('png'):
+                _, png, png_etag = transport.get(sprite_url)
+                self._count_request()
+                entry['sprite_url'] = sprite_url
+                entry['png'] = self.put_object(png)
+                entry['png_etag'] = png_etag
+                entry.pop('scaled', None)
+        return entry
+
+    def _count_request(self):
+        with self._lock:
+            self.network_requests += 1
+
+    def _scaled(self, entry, size_key, size, scale):
+        """(축소된 PNG bytes 또는 None, 새로 만들었는지)"""
+        if not entry or not entry.get('png'):
+            return None, False
+        scaled_digest = entry.setdefault('scaled', {}).get(size_key)
+        scaled = self.get_object(scaled_digest) if scaled_digest else None
+        if scaled is not None:
+            return scaled, False
+        png = self.get_object(entry['png'])
+        if png is None:
+            return None, False
+        scaled = scale(png, size)
+        entry['scaled'][size_key] = self.put_object(scaled)
+        return scaled, True
+
+    def load(self, mapping, size, scale, progress=None, revalidate=False, on_sprite=None):
+        """{piece: 축소된 PNG bytes 또는 None}
+
+        scale(png_bytes, size) -> 축소된 PNG bytes. progress(done, total, name)와
+        on_sprite(piece, png_bytes)는 호출한 스레드에서 불린다. on_sprite는 캐시에 있던
+        스프라이트는 바로, 다운로드한 스프라이트는 도착하는 대로 호출되므로
+        GUI가 기본 그림을 먼저 보여 주고 하나씩 바꿔 끼울 수 있다.
+        """
+        index = self.read_index()
+        size_key = f"{size[0]}x{size[1]}"
+        pieces_by_name = {}
+        for piece, name in mapping.items():
+            pieces_by_name.setdefault(name, []).append(piece)
+        names = sorted(pieces_by_name)
+        sprites = dict.fromkeys(mapping) # 실패 시 None (GUI는 기본 그림을 그대로 쓴다)
+
+        # 캐시에 원본이 없는 것(또는 재검증 요청)만 네트워크로 받는다
+        missing = [name for name in names
+                   if revalidate or not (index.get(name, {}).get('png')
+                                         and os.path.exists(self._object_path(index[name]['png'])))]
+        total = len(names)
+        done = total - len(missing)
+        dirty = bool(missing)
+
+        def finish(name):
+            nonlocal dirty
+            try:
+                scaled, created = self._scaled(index.get(name), size_key, size, scale)
+            except Exception as e: # scale은 호출한 쪽 함수라 깨진 이미지면 무엇이든 던질 수 있다 (pygame.error 등)
+                print(f"Error scaling {name}: {e}")
+                # 깨진 원본은 잊어서 다음 실행 때 다시 받게 하고, 이 기물만 기본 그림으로 둔다
+                index.get(name, {}).pop('png', None)
+                scaled, created = None, True
+            dirty = dirty or created
+            for piece in pieces_by_name[name]:
+                sprites[piece] = scaled
+                if on_sprite and scaled is not None:
+                    on_sprite(piece, scaled)
+
+        for name in names:
+            if name not in missing:
+                finish(name)
+        if progress:
+            progress(done, total, None)
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self._fetch, name, index.get(name), revalidate): name for name in missing}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        index[name] = future.result()
+                    except (TransportError, ValueError, KeyError, TypeError) as e:
+                        print(f"Error downloading {name}: {e}")
+                    finish(name)
+                    done += 1
+                    if progress:
+                        progress(done, total, name)
+        if dirty:
+            self.write_index(index)
+        return sprites
@@ -0,0 +1,86 @@
+"""시작 시간 측정: 헤드리스 모듈 import 시간과 GUI 첫 프레임까지 걸리는 시간
+
+사용 예:
+    python startup_bench.py --runs 5
+    python startup_bench.py --runs 5 --record bench_output.txt
+
+GUI 측정은 chess_game.py --frames 1을 새 프로세스로 띄워, 프로세스를 시작한 시각부터
+첫 프레임을 그린 시각까지 잰다. 화면이 없는 환경에서는 SDL 더미 드라이버를 쓴다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEADLESS_MODULES = ['chess_engine', 'transposition', 'search', 'perft']
+GUI_ONLY_MODULES = ['pygame', 'requests']
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(elapsed, ' '.join(m for m in {gui_only!r} if m in sys.modules))
+"""
+
+
+def measure_import(modules=HEADLESS_MODULES):
+    """(새 인터프리터에서 modules를 import하는 데 걸린 초, 같이 딸려 온 GUI 모듈 목록)"""
+    code = _IMPORT_PROBE.format(modules=modules, gui_only=GUI_ONLY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True,
+                            text=True, check=True).stdout.split()
+    return float(output[0]), output[1:]
+
+
+def measure_first_frame(extra_args=()):
+    """프로세스 시작부터 첫 프레임까지 걸린 초"""
+    env = dict(os.environ)
+    if not env.get('DISPLAY') and sys.platform.startswith('linux'):
+        env.setdefault('SDL_VIDEODRIVER', 'dummy')
+    start = time.time()
+    result = subprocess.run([sys.executable, 'chess_game.py', '--frames', '1', *extra_args], cwd=HERE,
+                            env=env, capture_output=True, text=True, check=True)
+    for line in result.stdout.splitlines():
+        if line.startswith('first-frame '):
+            return float(line.split()[1]) - start
+    raise RuntimeError("chess_game.py did not report a first frame:\n" + result.stdout + result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup time benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--no-gui', action='store_true', help="skip the time-to-first-frame measurement")
+    parser.add_argument('--record', metavar='FILE', help="append the medians to FILE as a JSON line")
+    args = parser.parse_args(argv)
+
+    import_times = []
+    leaked = set()
+    for _ in range(args.runs):
+        elapsed, gui_modules = measure_import()
+        import_times.append(elapsed)
+        leaked.update(gui_modules)
+    entry = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+             'import_seconds': statistics.median(import_times)}
+    print(f"headless import ({', '.join(HEADLESS_MODULES)}): median {entry['import_seconds'] * 1000:.1f} ms")
+    if leaked:
+        print(f"WARNING: headless import pulled in {', '.join(sorted(leaked))}")
+
+    if not args.no_gui:
+        frame_times = [measure_first_frame() for _ in range(args.runs)]
+        entry['first_frame_seconds'] = statistics.median(frame_times)
+        print(f"time to first frame: median {entry['first_frame_seconds'] * 1000:.0f} ms "
+              f"(min {min(frame_times) * 1000:.0f}, max {max(frame_times) * 1000:.0f})")
+
+    if args.record:
+        with open(args.record, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+    return 1 if leaked else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,229 @@
+"""작은 엔드게임(KQK, KRK) 테이블 생성과 mmap 조회
+
+테이블은 후퇴 분석(retrograde analysis)으로 만든다: 메이트 포지션에서 시작해 한 수씩 거꾸로
+되돌리며, 강한 쪽 차례면 '이기는 수가 하나라도 있으면' 승리, 약한 쪽 차례면 '모든 수가 지면' 패배.
+
+파일 배치 (<dir>/KQK.bin, KRK.bin): 강한 쪽을 백으로 정규화한 포지션마다 1바이트
+    index = ((턴 * 64 + 백 킹) * 64 + 백 기물) * 64 + 흑 킹   (칸 번호는 Board와 같음, a8=0)
+    값 = 메이트까지 남은 반수 + 1 (0이면 무승부 또는 불가능한 포지션)
+강한 쪽이 흑이면 보드를 위아래로 뒤집고 색을 바꿔 조회한다.
+인덱스가 곧 위치이므로 이진 탐색도 필요 없이 mmap에서 1바이트만 읽는다.
+
+python tablebase.py generate            # tables/KQK.bin, tables/KRK.bin 생성 (각 512KB, 합쳐서 10초 남짓)
+python tablebase.py probe --fen "..."
+"""
+import argparse
+import mmap
+import os
+import time
+from array import array
+from collections import deque
+
+from chess_engine import (BLACK, KING_ATTACKS, QUEEN, ROOK, WHITE, Board, bishop_attacks, iter_bits,
+                          move_to_uci, rook_attacks)
+
+DEFAULT_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+TABLE_PIECES = {'KQK': QUEEN, 'KRK': ROOK}
+TABLE_SIZE = 2 * 64 * 64 * 64
+
+
+def table_index(stm, white_king, piece, black_king):
+    return ((stm * 64 + white_king) * 64 + piece) * 64 + black_king
+
+
+def _piece_attacks(piece_type, sq, occupied):
+    if piece_type == ROOK:
+        return rook_attacks(sq, occupied)
+    return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
+
+
+def generate_table(piece_type):
+    """KXK 테이블 bytearray (X = piece_type, 강한 쪽 = 백)"""
+    values = bytearray(TABLE_SIZE)
+    solved = bytearray(TABLE_SIZE) # 값이 확정된 포지션 (승/패)
+    counts = array('b', bytes(TABLE_SIZE)) # 흑 차례 포지션에서 아직 '지는 수'로 확인되지 않은 수의 개수
+    queue = deque()
+
+    # 1) 흑 차례 포지션마다 합법수 개수를 세고, 메이트를 찾는다
+    for wk in range(64):
+        wk_bit = 1 << wk
+        for wp in range(64):
+            if wp == wk:
+                continue
+            wp_bit = 1 << wp
+            for bk in range(64):
+                if bk == wk or bk == wp or KING_ATTACKS[wk] >> bk & 1:
+                    continue
+                # 흑 킹이 움직인 뒤를 보므로 흑 킹 자리는 비운 채로 공격 범위를 계산
+                danger = KING_ATTACKS[wk] | _piece_attacks(piece_type, wp, wk_bit | wp_bit)
+                legal = KING_ATTACKS[bk] & ~danger & ~wk_bit
+                if legal & wp_bit and KING_ATTACKS[wk] & wp_bit:
+                    legal &= ~wp_bit # 킹이 지키는 기물은 잡을 수 없다
+                index = table_index(BLACK, wk, wp, bk)
+                counts[index] = legal.bit_count()
+                if not legal and danger >> bk & 1:
+                    solved[index] = 1
+                    values[index] = 1 # 메이트: 남은 반수 0
+                    queue.append(index)
+
+    # 2) 확정된 포지션에서 한 수씩 되돌린다 (큐에는 깊이 순으로 들어간다)
+    while queue:
+        index = queue.popleft()
+        depth = values[index]
+        stm, rest = divmod(index, 64 * 64 * 64)
+        wk, rest = divmod(rest, 64 * 64)
+        wp, bk = divmod(rest, 64)
+        occupied = (1 << wk) | (1 << wp) | (1 << bk)
+        if stm == BLACK:
+            # 흑이 진 포지션 ← 백이 방금 킹이나 기물을 움직였다
+            for origin in iter_bits(KING_ATTACKS[wk] & ~occupied & ~KING_ATTACKS[bk]):
+                # 이전 포지션(백 차례)에서 흑 킹이 체크 상태면 불가능
+                if _piece_attacks(piece_type, wp, (occupied ^ (1 << wk)) | (1 << origin)) >> bk & 1:
+                    continue
+                _mark_win(values, solved, queue, table_index(WHITE, origin, wp, bk), depth)
+            for origin in iter_bits(_piece_attacks(piece_type, wp, occupied) & ~occupied):
+                if _piece_attacks(piece_type, origin, occupied ^ (1 << wp)) >> bk & 1:
+                    continue
+                _mark_win(values, solved, queue, table_index(WHITE, wk, origin, bk), depth)
+        else:
+            # 백이 이기는 포지션 ← 흑이 방금 킹을 움직였다
+            for origin in iter_bits(KING_ATTACKS[bk] & ~occupied & ~KING_ATTACKS[wk]):
+                previous = table_index(BLACK, wk, wp, origin)
+                if solved[previous]:
+                    continue
+                counts[previous] -= 1
+                if counts[previous] == 0:
+                    solved[previous] = 1
+                    values[previous] = depth + 1
+                    queue.append(previous)
+    return values
+
+
+def _mark_win(values, solved, queue, index, depth):
+    if not solved[index]:
+        solved[index] = 1
+        values[index] = depth + 1
+        queue.append(index)
+
+
+def generate(directory=DEFAULT_TABLE_DIR, names=tuple(TABLE_PIECES)):
+    os.makedirs(directory, exist_ok=True)
+    for name in names:
+        start = time.perf_counter()
+        values = generate_table(TABLE_PIECES[name])
+        path = os.path.join(directory, f"{name}.bin")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(values)
+        os.replace(tmp_path, path)
+        longest = max(values[:TABLE_SIZE // 2]) - 1 # 백 차례 기준
+        print(f"{name}: {path}  longest mate {longest} plies ({(longest + 1) // 2} moves)  "
+              f"{time.perf_counter() - start:.1f}s")
+
+
+class EndgameTables:
+    """생성된 테이블 파일을 필요할 때 mmap으로 열어 조회 (파일 전체를 읽지 않는다)"""
+
+    def __init__(self, directory=DEFAULT_TABLE_DIR):
+        self.directory = directory
+        self.maps = {}
+        self.hits = 0
+
+    def _table(self, name):
+        if name not in self.maps:
+            path = os.path.join(self.directory, f"{name}.bin")
+            try:
+                with open(path, 'rb') as f:
+                    self.maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                self.maps[name] = None # 없는 테이블은 다시 열어 보지 않는다
+        return self.maps[name]
+
+    def close(self):
+        for table in self.maps.values():
+            if table is not None:
+                table.close()
+        self.maps.clear()
+
+    def _lookup(self, board):
+        """(테이블, 인덱스) 또는 None. 킹 둘 + 퀸/룩 하나인 포지션만 해당"""
+        if board.occupied_by[WHITE].bit_count() + board.occupied_by[BLACK].bit_count() != 3:
+            return None
+        for name, piece_type in TABLE_PIECES.items():
+            for strong in (WHITE, BLACK):
+                piece = board.pieces[strong * 6 + piece_type]
+                if not piece:
+                    continue
+                table = self._table(name)
+                if table is None:
+                    return None
+                flip = 56 if strong == BLACK else 0 # 흑이 강한 쪽이면 위아래로 뒤집고 색을 바꾼다
+                index = table_index(board.turn ^ strong, board.king_squares[strong] ^ flip,
+                                    (piece.bit_length() - 1) ^ flip, board.king_squares[strong ^ 1] ^ flip)
+                return table, index
+        return None
+
+    def probe_wdl(self, board):
+        """side to move 기준 (결과, 메이트까지 반수). 결과는 1 승, 0 무, -1 패. 테이블 밖이면 None"""
+        found = self._lookup(board)
+        if found is None:
+            return None
+        table, index = found
+        value = table[index]
+        if not value:
+            return 0, 0
+        strong_to_move = index < TABLE_SIZE // 2
+        return (1 if strong_to_move else -1), value - 1
+
+    def probe(self, board):
+        """테이블에 있는 포지션이면 (최선수, side to move 기준 결과, 메이트까지 반수), 아니면 None
+
+        이기는 쪽은 메이트가 가장 빠른 수를, 지는 쪽은 가장 늦은 수를(또는 기물을 잡아 무승부로) 고른다.
+        """
+        found = self.probe_wdl(board)
+        if found is None:
+            return None
+        best_move = None
+        best_key = None
+        for move in board.generate_legal():
+            board.make_move(move)
+            try:
+                # 기물을 잡아 킹만 남으면 테이블 밖이지만 무승부
+                result, plies = self.probe_wdl(board) or (0, 0)
+            finally:
+                board.unmake_move()
+            # 상대 기준 결과를 뒤집어: 이길 때는 짧을수록, 질 때는 길수록 좋다
+            key = (-result, plies if result > 0 else -plies)
+            if best_key is None or key > best_key:
+                best_move, best_key = move, key
+        if best_move is None:
+            return None
+        self.hits += 1
+        return best_move, found[0], found[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KQK/KRK 엔드게임 테이블")
+    sub = parser.add_subparsers(dest='command', required=True)
+    gen = sub.add_parser('generate', help="테이블 생성")
+    gen.add_argument('--dir', default=DEFAULT_TABLE_DIR)
+    gen.add_argument('--tables', default=','.join(TABLE_PIECES), help="생성할 테이블 (쉼표로 구분)")
+    probe = sub.add_parser('probe', help="포지션 조회")
+    probe.add_argument('--dir', default=DEFAULT_TABLE_DIR)
+    probe.add_argument('--fen', required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        generate(args.dir, args.tables.split(','))
+    else:
+        tables = EndgameTables(args.dir)
+        result = tables.probe(Board.from_fen(args.fen))
+        if result is None:
+            print("not in tables")
+        else:
+            move, outcome, plies = result
+            print(f"bestmove {move_to_uci(move)}  {('loss', 'draw', 'win')[outcome + 1]} in {plies} plies")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""수 생성기, make/unmake, FEN/pack 직렬화 회귀 테스트 (perft.SUITE의 얕은 깊이만: 몇 초 안에 끝난다)
+
+python -m pytest -q
+"""
+import pytest
+
+from chess_engine import START_FEN, Board, parse_uci
+from perft import SUITE, perft
+
+MAX_NODES = 100_000 # 포지션마다 기대 노드 수가 이 이하인 가장 깊은 깊이만 센다
+
+FENS = [fen for fen, _ in SUITE.values()]
+# SUITE에 깊은 깊이만 있는 함정 포지션의 얕은 깊이 노드 수 (python-chess perft로 따로 확인한 값)
+SHALLOW_COUNTS = {
+    'ep-illegal-pin': {4: 10138},
+    'ep-illegal-diagonal': {4: 10276},
+    'ep-gives-check': {4: 13931},
+    'castle-gives-check': {4: 6399},
+    'long-castle-gives-check': {4: 7418},
+    'castling-rights-lost': {3: 27826},
+    'castling-prevented': {3: 50509},
+    'promote-out-of-check': {4: 19174},
+    'discovered-check': {4: 31961},
+    'promote-gives-check': {5: 38983},
+    'stalemate-checkmate': {6: 43261},
+}
+
+
+def shallow_cases():
+    for name, (fen, counts) in SUITE.items():
+        counts = {**counts, **SHALLOW_COUNTS.get(name, {})}
+        depths = [depth for depth, nodes in counts.items() if nodes <= MAX_NODES]
+        if depths:
+            depth = max(depths)
+            yield pytest.param(fen, depth, counts[depth], id=f"{name}-d{depth}")
+
+
+def state(board):
+    """make/unmake 뒤에 그대로 돌아와야 하는 상태"""
+    return (board.pieces[:], board.occupied_by[:], board.squares[:], board.king_squares[:], board.turn,
+            board.castling, board.ep_square, board.key, board.psqt, board.phase, board.halfmove_clock,
+            board.fullmove_number, len(board.history))
+
+
+@pytest.mark.parametrize('fen, depth, expected', list(shallow_cases()))
+def test_perft_suite(fen, depth, expected):
+    assert perft(Board.from_fen(fen), depth) == expected
+
+
+@pytest.mark.parametrize('fen', FENS)
+def test_fen_round_trip(fen):
+    board = Board.from_fen(fen)
+    assert board.to_fen() == fen
+    assert board.key == board.compute_key()
+
+
+def test_fen_drops_castling_rights_without_king_or_rook():
+    assert Board.from_fen('4k3/8/8/8/8/8/8/4K3 w K - 0 1').castling == 0
+    assert Board.from_fen('r3k3/8/8/8/8/8/8/4K2R b KQkq - 0 1').to_fen() == 'r3k3/8/8/8/8/8/8/4K2R b Kq - 0 1'
+
+
+@pytest.mark.parametrize('fen', FENS)
+def test_pack_round_trip(fen):
+    board = Board.from_fen(fen)
+    restored = Board.unpack(board.pack())
+    assert restored.pack() == board.pack()
+    assert restored.squares == board.squares
+    assert (restored.turn, restored.castling, restored.ep_square, restored.key) == \
+           (board.turn, board.castling, board.ep_square, board.key)
+    assert sorted(restored.generate_legal()) == sorted(board.generate_legal())
+
+
+def test_unpack_keeps_repetition_history():
+    board = Board()
+    for text in ['g1f3', 'g8f6', 'f3g1', 'f6g8', 'g1f3', 'g8f6', 'f3g1']:
+        move = parse_uci(text)
+        board.make_move(board.find_move(move & 63, (move >> 6) & 63, move >> 12))
+    restored = Board.unpack(board.pack(), board.recent_keys(), board.halfmove_clock)
+    assert restored.halfmove_clock == board.halfmove_clock
+    assert restored.repetitions() == board.repetitions()
+    assert restored.is_repetition() == board.is_repetition()
+
+
+@pytest.mark.parametrize('fen', FENS)
+def test_make_unmake_round_trip(fen):
+    board = Board.from_fen(fen)
+    before = state(board)
+    for move in board.generate_legal():
+        board.make_move(move)
+        assert board.key == board.compute_key()
+        for reply in board.generate_legal():
+            board.make_move(reply)
+            assert board.key == board.compute_key()
+            assert board.unmake_move() == reply
+        assert board.unmake_move() == move
+        assert state(board) == before
+
+
+def test_copy_is_independent():
+    board = Board.from_fen(START_FEN)
+    copy = board.copy()
+    copy.make_move(copy.generate_legal()[0])
+    assert board.to_fen() == START_FEN
+    assert len(board.history) == 0
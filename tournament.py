@@ -0,0 +1,492 @@
+"""엔진 자체 대국 토너먼트: 두 UCI 엔진 설정을 프로세스 풀에서 수천 판 두게 해 Elo 차이와 SPRT로 판정
+
+- 엔진은 UCI 명령(기본은 이 폴더의 uci.py)으로 띄우므로 이전 빌드의 uci.py와도 붙일 수 있다.
+  작업자 프로세스마다 두 엔진을 한 번만 띄워 두고 게임 사이에 ucinewgame으로 재사용한다.
+- 오프닝은 FEN/EPD 또는 PGN 모음(analysis.iter_source와 같은 형식)에서 --seed로 섞어 뽑고,
+  같은 오프닝을 색을 바꿔 두 번 둔다. 모음이 없으면 초기 포지션에서 --random-plies만큼 무작위로 둔다.
+- 시간 제한은 게임마다 'moves/base+inc' (초) 시계를 두고 wtime/btime으로 넘기며, 시간을 넘기면 패배.
+  --depth/--nodes/--movetime을 주면 시계 대신 고정 제한으로 둔다.
+- 판정은 Game, 대국 서버와 같은 chess_engine.game_outcome (체크메이트/스테일메이트 → 3회 동형,
+  50수 규칙, 기물 부족), 그 밖에 합법이 아닌 수, 시간 초과, --max-plies.
+- 게임은 끝나는 대로 PGN에 덧붙이고, 첫 엔진 기준 승/무/패로 Elo 차이(95% 오차 범위), LOS,
+  SPRT 로그 우도비를 출력한다. SPRT가 결론을 내면 남은 게임은 두지 않는다.
+- 처리량은 시간당 게임 수와 코어당 시간당 게임 수(작업자 수와 CPU 수 중 작은 쪽으로 나눔)로 보고한다.
+
+사용 예:
+    python tournament.py --games 200 --tc 5+0.05 --workers 4 --openings book.pgn --plies 8 --pgn-out match.pgn
+    python tournament.py --engine new "python uci.py" --engine old "python ../old/uci.py" --sprt 0 10
+    python tournament.py --games 20 --nodes 2000 --option new Hash 32
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import queue
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from chess_engine import BLACK, START_FEN, WHITE, Board, game_outcome, move_to_uci, parse_uci
+from transposition import LegalMoveIndex
+
+UCI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uci.py')
+STARTUP_TIMEOUT = 30.0 # 엔진 시작(uci → uciok, isready → readyok)을 기다리는 시간(초)
+STOP_TIMEOUT = 5.0 # 시간을 넘긴 엔진에 stop을 보낸 뒤 bestmove를 기다리는 시간(초)
+FIXED_LIMIT_TIMEOUT = 600.0 # 시계 없이 depth/nodes로 둘 때 한 수를 기다리는 최대 시간(초)
+
+# 시간 제한: moves수마다 base초를 더 받는다 (moves=0이면 게임 전체), 수마다 increment초
+TimeControl = namedtuple('TimeControl', 'moves base increment')
+# 작업자에게 넘기는 게임 하나: 오프닝은 시작 FEN과 그 뒤에 둘 UCI 수 목록
+GameTask = namedtuple('GameTask', 'round start_fen opening white black tc limits margin max_plies')
+
+
+def parse_time_control(text):
+    """'40/60+0.6', '10+0.1', '5' → TimeControl (초)"""
+    moves, _, rest = text.rpartition('/')
+    base, _, increment = rest.partition('+')
+    return TimeControl(int(moves) if moves else 0, float(base), float(increment or 0))
+
+
+class EngineError(RuntimeError):
+    """엔진이 죽었거나, 응답이 없거나, 알 수 없는 응답을 보냄"""
+
+
+class EngineProcess:
+    """UCI 엔진 하위 프로세스. 받기 스레드가 줄을 queue에 넣으므로 시간 제한을 두고 기다릴 수 있다"""
+
+    def __init__(self, name, command, options=()):
+        self.name = name
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        self.lines = queue.Queue()
+        threading.Thread(target=self._receive, daemon=True).start()
+        self.send('uci')
+        self.wait_for('uciok', STARTUP_TIMEOUT)
+        for option, value in options:
+            self.send(f"setoption name {option} value {value}")
+        self.ready()
+
+    def _receive(self):
+        for line in self.process.stdout:
+            self.lines.put(line.strip())
+        self.lines.put(None) # EOF
+
+    def send(self, line):
+        try:
+            self.process.stdin.write(line + '\n')
+            self.process.stdin.flush()
+        except OSError as e:
+            raise EngineError(f"{self.name}: {e}") from e
+
+    def wait_for(self, prefix, timeout):
+        """prefix로 시작하는 줄 (그 전의 info 줄은 버린다). 시간을 넘기면 TimeoutError"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                raise TimeoutError(f"{self.name}: no '{prefix}' in {timeout:.1f}s") from None
+            if line is None:
+                raise EngineError(f"{self.name}: engine exited")
+            if line.startswith(prefix):
+                return line
+
+    def ready(self):
+        self.send('isready')
+        self.wait_for('readyok', STARTUP_TIMEOUT)
+
+    def new_game(self):
+        self.send('ucinewgame')
+        self.ready()
+
+    def best_move(self, position, go, timeout):
+        """(UCI 수 문자열, 걸린 초). timeout을 넘기면 stop을 보내 다음 게임을 위해 동기화한 뒤 TimeoutError"""
+        self.send(position)
+        start = time.perf_counter()
+        self.send(go)
+        try:
+            line = self.wait_for('bestmove', timeout)
+        except TimeoutError:
+            self.send('stop')
+            try:
+                self.wait_for('bestmove', STOP_TIMEOUT)
+            except TimeoutError as e:
+                raise EngineError(f"{self.name}: no bestmove after stop") from e
+            raise
+        elapsed = time.perf_counter() - start
+        fields = line.split()
+        return (fields[1] if len(fields) > 1 else '0000'), elapsed
+
+    def close(self):
+        try:
+            self.send('quit')
+        except EngineError:
+            pass
+        try:
+            self.process.wait(timeout=STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+# --- 작업자 프로세스 쪽 ---
+_worker_engines = {} # 이름 → EngineProcess (작업자마다 한 번만 띄움)
+_worker_specs = {} # 이름 → (명령, 옵션)
+
+
+def _init_worker(specs):
+    _worker_specs.update(specs)
+
+
+def _engine(name):
+    engine = _worker_engines.get(name)
+    if engine is None or engine.process.poll() is not None:
+        command, options = _worker_specs[name]
+        engine = _worker_engines[name] = EngineProcess(name, command, options)
+    return engine
+
+
+def _discard_engine(name):
+    # 응답이 꼬인 엔진은 버리고 다음 게임에서 새로 띄운다
+    engine = _worker_engines.pop(name, None)
+    if engine:
+        engine.process.kill()
+
+
+def play_game(task):
+    """게임 하나를 두고 결과 dict (작업자 프로세스에서 실행)"""
+    start = time.perf_counter()
+    board = Board.from_fen(task.start_fen)
+    moves = []
+    for uci in task.opening:
+        move = parse_uci(uci)
+        board.make_move(board.find_move(move & 63, (move >> 6) & 63, move >> 12))
+        moves.append(uci)
+    names = (task.white, task.black)
+    tc = task.tc
+    clocks = [tc.base, tc.base] if tc else None
+    played = [0, 0] # 색별로 엔진이 둔 수 (movestogo 계산용)
+    result = reason = None
+    current = WHITE # 지금 명령을 주고받는 엔진의 색 (엔진 오류는 그 엔진의 패배)
+    try:
+        for current, name in enumerate(names):
+            _engine(name).new_game()
+        while True:
+            index = LegalMoveIndex(board)
+            outcome = game_outcome(board, index)
+            if outcome:
+                result, reason = outcome
+                break
+            if task.max_plies and len(moves) - len(task.opening) >= task.max_plies:
+                result, reason = '1/2-1/2', 'max-plies'
+                break
+            color = current = board.turn
+            loss = '0-1' if color == WHITE else '1-0'
+            engine = _engine(names[color])
+            position = f"position fen {task.start_fen}" + (f" moves {' '.join(moves)}" if moves else '')
+            if clocks:
+                go = (f"go wtime {max(1, int(clocks[WHITE] * 1000))} btime {max(1, int(clocks[BLACK] * 1000))} "
+                      f"winc {int(tc.increment * 1000)} binc {int(tc.increment * 1000)}")
+                if tc.moves:
+                    go += f" movestogo {tc.moves - played[color] % tc.moves}"
+                timeout = clocks[color] + task.margin
+            else:
+                go = 'go ' + ' '.join(f"{key} {value}" for key, value in task.limits.items())
+                timeout = task.limits['movetime'] / 1000 + task.margin if 'movetime' in task.limits else FIXED_LIMIT_TIMEOUT
+            try:
+                uci, elapsed = engine.best_move(position, go, timeout)
+            except TimeoutError:
+                result, reason = loss, 'time forfeit'
+                break
+            if clocks:
+                clocks[color] -= elapsed
+                if clocks[color] < -task.margin:
+                    result, reason = loss, 'time forfeit'
+                    break
+                clocks[color] += tc.increment
+                played[color] += 1
+                if tc.moves and played[color] % tc.moves == 0:
+                    clocks[color] += tc.base
+            try:
+                move = parse_uci(uci)
+                found = index.find(move & 63, (move >> 6) & 63, move >> 12)
+            except ValueError:
+                found = None
+            if found is None:
+                result, reason = loss, f"illegal move {uci}"
+                break
+            board.make_move(found)
+            moves.append(move_to_uci(found))
+    except EngineError as e:
+        # 엔진이 죽으면 그 엔진의 패배
+        _discard_engine(names[current])
+        result, reason = ('0-1' if current == WHITE else '1-0'), f"engine error: {e}"
+    except TimeoutError as e:
+        # ucinewgame/isready에 답하지 않은 엔진
+        _discard_engine(names[current])
+        result, reason = ('0-1' if current == WHITE else '1-0'), f"time forfeit: {e}"
+    return {'round': task.round, 'white': task.white, 'black': task.black, 'start_fen': task.start_fen,
+            'moves': moves, 'opening_plies': len(task.opening), 'result': result, 'reason': reason,
+            'elapsed': time.perf_counter() - start, 'worker': os.getpid()}
+
+
+# --- 통계 ---
+def elo_from_score(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_estimate(wins, losses, draws):
+    """(Elo 차이, 95% 신뢰 구간 하한, 상한). 게임별 점수의 표본 분산으로 구간을 잡는다"""
+    games = wins + losses + draws
+    if not games:
+        return 0.0, 0.0, 0.0
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + losses * score ** 2 + draws * (0.5 - score) ** 2) / games
+    margin = 1.959964 * math.sqrt(variance / games)
+    return elo_from_score(score), elo_from_score(score - margin), elo_from_score(score + margin)
+
+
+def likelihood_of_superiority(wins, losses):
+    if wins + losses == 0:
+        return 0.5
+    return 0.5 * (1 + math.erf((wins - losses) / math.sqrt(2 * (wins + losses))))
+
+
+def sprt(wins, losses, draws, elo0, elo1, alpha=0.05, beta=0.05):
+    """(로그 우도비, 하한, 상한, 판정) — 3항 결과를 정규 근사한 GSPRT. 판정은 'H1'(통과), 'H0'(실패), None(계속)"""
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+    games = wins + losses + draws
+    if not games or wins + losses == 0:
+        return 0.0, lower, upper, None
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + losses * score ** 2 + draws * (0.5 - score) ** 2) / games
+    if variance <= 0:
+        return 0.0, lower, upper, None
+    score0 = 1 / (1 + 10 ** (-elo0 / 400))
+    score1 = 1 / (1 + 10 ** (-elo1 / 400))
+    llr = games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+    verdict = 'H1' if llr >= upper else 'H0' if llr <= lower else None
+    return llr, lower, upper, verdict
+
+
+class MatchStats:
+    """첫 엔진(first) 기준 승/무/패와 처리량"""
+
+    def __init__(self, first, workers):
+        self.first = first
+        self.cores = min(workers, multiprocessing.cpu_count())
+        self.start = time.perf_counter()
+        self.wins = self.losses = self.draws = 0
+        self.plies = 0
+        self.reasons = {}
+
+    def add(self, record):
+        result = record['result']
+        if result == '1/2-1/2':
+            self.draws += 1
+        elif (result == '1-0') == (record['white'] == self.first):
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.plies += len(record['moves']) - record['opening_plies']
+        reason = record['reason'].split(':')[0]
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    @property
+    def games(self):
+        return self.wins + self.losses + self.draws
+
+    def report(self, second, sprt_bounds=None, stream=sys.stderr):
+        elapsed = time.perf_counter() - self.start
+        elo, low, high = elo_estimate(self.wins, self.losses, self.draws)
+        per_hour = self.games / elapsed * 3600 if elapsed else 0.0
+        print(f"{self.first} vs {second}: {self.games} games  +{self.wins} ={self.draws} -{self.losses}  "
+              f"Elo {elo:+.1f} [{low:+.1f}, {high:+.1f}]  LOS {likelihood_of_superiority(self.wins, self.losses):.1%}",
+              file=stream)
+        if sprt_bounds:
+            llr, lower, upper, verdict = sprt(self.wins, self.losses, self.draws, *sprt_bounds)
+            status = {'H1': 'PASS (H1 accepted)', 'H0': 'FAIL (H0 accepted)'}.get(verdict, 'continue')
+            print(f"SPRT elo0={sprt_bounds[0]} elo1={sprt_bounds[1]}: LLR {llr:.2f} [{lower:.2f}, {upper:.2f}]  {status}",
+                  file=stream)
+        print(f"{elapsed:.1f}s  {per_hour:.0f} games/hour  {per_hour / self.cores:.0f} games/hour per core "
+              f"({self.cores} cores)  {self.plies / self.games if self.games else 0:.0f} plies/game  "
+              + '  '.join(f"{reason} {count}" for reason, count in sorted(self.reasons.items())), file=stream)
+
+
+# --- 오프닝과 PGN ---
+def random_opening(rng, plies):
+    """초기 포지션에서 무작위 합법수 plies개 (게임이 끝나는 수열이면 다시 뽑는다)"""
+    while True:
+        board = Board()
+        moves = []
+        for _ in range(plies):
+            legal = board.generate_legal()
+            if not legal:
+                break
+            move = rng.choice(legal)
+            board.make_move(move)
+            moves.append(move_to_uci(move))
+        if len(moves) == plies and game_outcome(board, LegalMoveIndex(board)) is None:
+            return START_FEN, moves
+
+
+def load_openings(paths, plies):
+    """[(시작 FEN, UCI 수 목록)]: PGN은 앞 plies수(생략하면 전부)까지, FEN은 그 포지션 그대로"""
+    from analysis import iter_source
+    from pgn import PGNError, parse_san, start_board
+
+    openings = []
+    for path in paths:
+        for game in iter_source(path):
+            board = start_board(game.headers)
+            fen = board.to_fen()
+            moves = []
+            try:
+                for san in game.moves[:plies]:
+                    move = parse_san(board, san)
+                    board.make_move(move)
+                    moves.append(move_to_uci(move))
+            except PGNError:
+                continue
+            if game_outcome(board, LegalMoveIndex(board)) is None:
+                openings.append((fen, moves))
+    return openings
+
+
+def write_pgn(stream, record, event, time_tags):
+    """time_tags: TimeControl 태그 (고정 제한이면 '-'와 SearchLimits 태그)"""
+    from pgn import game_headers, move_to_san, write_game
+
+    board = Board.from_fen(record['start_fen'])
+    sans = []
+    for uci in record['moves']:
+        move = parse_uci(uci)
+        move = board.find_move(move & 63, (move >> 6) & 63, move >> 12)
+        sans.append(move_to_san(board, move))
+        board.make_move(move)
+    headers = game_headers(record['start_fen'], Event=event, Round=record['round'], White=record['white'],
+                           Black=record['black'], **time_tags, Termination=record['reason'])
+    write_game(stream, headers, sans, record['result'])
+    stream.flush()
+
+
+# --- 주 프로세스 쪽 ---
+def run(engines, games, tc=None, limits=None, openings=None, random_plies=4, seed=0, workers=None,
+        pgn_out=None, sprt_bounds=None, margin=0.1, max_plies=400, stats_interval=30.0):
+    """engines = [(이름, 명령 인자 목록, [(옵션, 값)]), ...] 두 개. MatchStats를 반환"""
+    workers = workers or multiprocessing.cpu_count()
+    (first, *_), (second, *_) = engines
+    specs = {name: (command, options) for name, command, options in engines}
+    rng = random.Random(seed)
+    if openings:
+        openings = list(openings)
+        rng.shuffle(openings)
+    limits = limits or {}
+    if tc:
+        time_tags = {'TimeControl': (f"{tc.moves}/" if tc.moves else '') + f"{tc.base:g}+{tc.increment:g}"}
+    else:
+        # 시계 없이 둔 게임: PGN 표준대로 TimeControl은 '-', 고정 제한은 따로 남긴다
+        time_tags = {'TimeControl': '-', 'SearchLimits': ' '.join(f"{k}={v}" for k, v in limits.items())}
+
+    def tasks():
+        # 같은 오프닝을 색을 바꿔 두 번
+        for pair in range((games + 1) // 2):
+            fen, opening = openings[pair % len(openings)] if openings else random_opening(rng, random_plies)
+            for i, (white, black) in enumerate(((first, second), (second, first))):
+                number = pair * 2 + i + 1
+                if number <= games:
+                    yield GameTask(number, fen, opening, white, black, tc, limits, margin, max_plies)
+
+    stats = MatchStats(first, workers)
+    pgn_file = open(pgn_out, 'a', encoding='utf-8') if pgn_out else None
+    context = multiprocessing.get_context('spawn')
+    pending = set()
+    source = tasks()
+    last_report = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(specs,)) as pool:
+            stopped = False
+            while True:
+                # SPRT로 일찍 끝낼 수 있도록 작업자 수만큼만 미리 넣어 둔다
+                while not stopped and len(pending) < workers:
+                    task = next(source, None)
+                    if task is None:
+                        break
+                    pending.add(pool.submit(play_game, task))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = future.result()
+                    stats.add(record)
+                    if pgn_file:
+                        write_pgn(pgn_file, record, f"{first} vs {second}", time_tags)
+                if sprt_bounds and not stopped and sprt(stats.wins, stats.losses, stats.draws, *sprt_bounds)[3]:
+                    stopped = True # 판정이 났으면 두고 있는 게임만 마저 끝낸다
+                now = time.perf_counter()
+                if stats_interval and now - last_report >= stats_interval:
+                    stats.report(second, sprt_bounds)
+                    last_report = now
+    finally:
+        if pgn_file:
+            pgn_file.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="두 UCI 엔진 설정의 자체 대국 토너먼트 (Elo, SPRT)")
+    parser.add_argument('--engine', nargs=2, action='append', metavar=('NAME', 'COMMAND'),
+                        help="엔진 이름과 실행 명령 (두 번, 생략하면 uci.py끼리)")
+    parser.add_argument('--option', nargs=3, action='append', default=[], metavar=('NAME', 'OPTION', 'VALUE'),
+                        help="엔진 NAME에 보낼 setoption (예: --option new Hash 32)")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--tc', default='10+0.1', help="시간 제한 'moves/base+inc' (초)")
+    parser.add_argument('--depth', type=int, help="시계 대신 고정 깊이")
+    parser.add_argument('--nodes', type=int, help="시계 대신 수당 노드 수")
+    parser.add_argument('--movetime', type=int, help="시계 대신 수당 시간(ms)")
+    parser.add_argument('--margin', type=float, default=0.1, help="시간 초과로 보기 전 여유(초)")
+    parser.add_argument('--max-plies', type=int, default=400, help="이 반수를 넘기면 무승부 판정 (0이면 없음)")
+    parser.add_argument('--openings', nargs='+', help="오프닝 모음 (PGN 또는 한 줄에 FEN 하나)")
+    parser.add_argument('--plies', type=int, help="PGN 오프닝에서 쓸 앞쪽 반수 (생략하면 전부)")
+    parser.add_argument('--random-plies', type=int, default=4, help="오프닝 모음이 없을 때 무작위로 둘 반수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help="동시에 두는 게임 수 (기본: CPU 수)")
+    parser.add_argument('--pgn-out', help="끝난 게임을 덧붙일 PGN 파일")
+    parser.add_argument('--sprt', nargs=2, type=float, metavar=('ELO0', 'ELO1'), help="SPRT 가설 (예: 0 10)")
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--stats-interval', type=float, default=30.0, help="중간 결과 출력 간격(초), 0이면 끝에만")
+    args = parser.parse_args(argv)
+
+    # 윈도우 경로의 역슬래시가 사라지지 않도록 posix 규칙은 윈도우가 아닐 때만
+    engine_args = ([(name, shlex.split(command, posix=os.name != 'nt')) for name, command in args.engine]
+                   if args.engine else [('base', [sys.executable, UCI_SCRIPT]), ('test', [sys.executable, UCI_SCRIPT])])
+    if len(engine_args) != 2 or engine_args[0][0] == engine_args[1][0]:
+        parser.error("--engine은 서로 다른 이름으로 두 번 주어야 합니다")
+    names = [name for name, _ in engine_args]
+    for name, _, _ in args.option:
+        if name not in names:
+            parser.error(f"--option의 엔진 이름을 찾을 수 없습니다: {name}")
+    engines = [(name, command, [(option, value) for target, option, value in args.option if target == name])
+               for name, command in engine_args]
+    limits = {key: value for key, value in (('depth', args.depth), ('nodes', args.nodes),
+                                            ('movetime', args.movetime)) if value}
+    openings = load_openings(args.openings, args.plies) if args.openings else None
+    if args.openings and not openings:
+        parser.error("오프닝 모음에서 쓸 수 있는 포지션을 찾지 못했습니다")
+
+    stats = run(engines, args.games, tc=None if limits else parse_time_control(args.tc), limits=limits,
+                openings=openings, random_plies=args.random_plies, seed=args.seed, workers=args.workers,
+                pgn_out=args.pgn_out, sprt_bounds=(*args.sprt, args.alpha, args.beta) if args.sprt else None,
+                margin=args.margin, max_plies=args.max_plies, stats_interval=args.stats_interval)
+    stats.report(names[1], (*args.sprt, args.alpha, args.beta) if args.sprt else None, stream=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Zobrist 키 기반 치환표(transposition table)와 합법수 캐시
+
+치환표는 크기가 고정된 버킷 구조이며, 파이썬 객체 대신 array('Q') 두 개에
+키와 압축한 데이터를 저장하므로 메모리 예산(MB)만큼만 차지한다.
+"""
+from array import array
+from collections import OrderedDict
+
+# 평가값 종류
+EXACT, LOWER, UPPER = 1, 2, 3
+
+BUCKET_SIZE = 4
+ENTRY_BYTES = 16  # 키 8바이트 + 데이터 8바이트
+SCORE_OFFSET = 1 << 31
+
+# data 비트 배치: move(16) | score + offset(32) | depth(8) | flag(2) | age(6)
+_MOVE_BITS, _SCORE_SHIFT, _DEPTH_SHIFT, _FLAG_SHIFT, _AGE_SHIFT = 16, 16, 48, 56, 58
+
+
+def _pack(move, score, depth, flag, age):
+    return (move | ((score + SCORE_OFFSET) << _SCORE_SHIFT) | (max(depth, 0) << _DEPTH_SHIFT)
+            | (flag << _FLAG_SHIFT) | (age << _AGE_SHIFT))
+
+
+class TranspositionTable:
+    """버킷(4칸) 단위 치환표
+
+    교체 정책: 같은 키가 있으면 그 칸을, 없으면 빈 칸을, 그것도 없으면
+    '이전 탐색에서 남은 항목'과 '얕은 깊이' 순으로 가장 가치가 낮은 칸을 덮어쓴다.
+    """
+
+    def __init__(self, mb=16):
+        self.resize(mb)
+
+    def resize(self, mb):
+        self.mb = mb
+        self.num_buckets = max(1, int(mb * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SIZE))
+        size = self.num_buckets * BUCKET_SIZE
+        self.keys = array('Q', bytes(8 * size))
+        self.data = array('Q', bytes(8 * size))
+        self.age = 0
+        self.hits = 0
+        self.probes = 0
+        self.stores = 0
+
+    def clear(self):
+        self.resize(self.mb)
+
+    def new_search(self):
+        """탐색을 새로 시작할 때 호출: 이전 탐색의 항목이 먼저 교체되도록 나이를 올린다"""
+        self.age = (self.age + 1) & 63
+
+    def probe(self, key):
+        """(move, score, depth, flag) 또는 None"""
+        self.probes += 1
+        keys = self.keys
+        base = (key % self.num_buckets) * BUCKET_SIZE
+        for i in range(base, base + BUCKET_SIZE):
+            if keys[i] == key:
+                data = self.data[i]
+                if not data:
+                    return None
+                self.hits += 1
+                return (data & 0xFFFF,
+                        ((data >> _SCORE_SHIFT) & 0xFFFFFFFF) - SCORE_OFFSET,
+                        (data >> _DEPTH_SHIFT) & 0xFF,
+                        (data >> _FLAG_SHIFT) & 3)
+        return None
+
+    def store(self, key, depth, score, flag, move=0):
+        self.stores += 1
+        keys = self.keys
+        data = self.data
+        age = self.age
+        base = (key % self.num_buckets) * BUCKET_SIZE
+        victim = base
+        victim_value = None
+        for i in range(base, base + BUCKET_SIZE):
+            if keys[i] == key or not data[i]:
+                victim = i
+                if keys[i] == key and not move:
+                    move = data[i] & 0xFFFF  # 새 항목에 수가 없으면 기존 최선수를 유지
+                break
+            entry = data[i]
+            stale = ((entry >> _AGE_SHIFT) & 63) != age
+            value = ((entry >> _DEPTH_SHIFT) & 0xFF) - (256 if stale else 0)
+            if victim_value is None or value < victim_value:
+                victim, victim_value = i, value
+        keys[victim] = key
+        data[victim] = _pack(move, score, depth, flag, age)
+
+    def hashfull(self):
+        """현재 탐색에서 채워진 비율 (1000분율, UCI의 hashfull과 같은 단위)"""
+        sample = min(len(self.data), 1000)
+        used = sum(1 for i in range(sample) if self.data[i] and ((self.data[i] >> _AGE_SHIFT) & 63) == self.age)
+        return used * 1000 // sample
+
+
+class LegalMoveCache:
+    """Zobrist 키별 합법수 목록 LRU 캐시 (같은 포지션을 다시 만났을 때 수 생성을 생략)"""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def legal_moves(self, board):
+        moves = self.entries.get(board.key)
+        if moves is not None:
+            self.entries.move_to_end(board.key)
+            self.hits += 1
+            return moves
+        self.misses += 1
+        moves = tuple(board.generate_legal())
+        self.entries[board.key] = moves
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return moves
+
+    def clear(self):
+        self.entries.clear()
+
+
+class LegalMoveIndex:
+    """한 포지션의 합법수를 출발 칸 → 도착 칸 → 수 목록으로 묶고 체크/메이트/스테일메이트 상태를 함께 저장
+
+    수 하나가 두어질 때까지(한 ply 동안) 선택, 하이라이트, 클릭 검증, 종료 판정이 모두 이 객체를 조회한다.
+    """
+    __slots__ = ('moves', 'by_origin', 'in_check', 'status')
+
+    def __init__(self, board, moves=None):
+        self.moves = tuple(board.generate_legal()) if moves is None else moves
+        self.by_origin = {}
+        for move in self.moves:
+            # 승급은 같은 도착 칸에 기물별로 네 수가 들어간다
+            self.by_origin.setdefault(move & 63, {}).setdefault((move >> 6) & 63, []).append(move)
+        self.in_check = board.in_check()
+        if self.moves:
+            self.status = None
+        else:
+            self.status = 'checkmate' if self.in_check else 'stalemate'
+
+    def targets(self, from_sq):
+        """from_sq에서 갈 수 있는 도착 칸들 (dict이므로 in 검사가 O(1))"""
+        return self.by_origin.get(from_sq, {})
+
+    def find(self, from_sq, to_sq, promotion=0):
+        for move in self.targets(from_sq).get(to_sq, ()):
+            if move >> 12 == promotion:
+                return move
+        return None
@@ -0,0 +1,284 @@
+"""UCI 프로토콜 프런트엔드: 표준 입출력으로 엔진을 구동 (UCI GUI, 대회 관리 프로그램, 이전 빌드와의 자체 대국용)
+
+지원 명령:
+  uci, isready, ucinewgame, quit
+  setoption name Hash value <MB>        치환표 크기
+  setoption name Threads value <N>      2 이상이면 parallel_search.ParallelSearcher (프로세스 루트 분할)
+  position startpos|fen <FEN> [moves <uci> ...]
+  go [depth N] [movetime ms] [nodes N] [wtime ms btime ms winc ms binc ms movestogo N] [infinite]
+  stop
+  bench [depth]                         (비표준) 고정 포지션 탐색 후 노드 수, nps, CPU 1초당 노드 수
+
+탐색은 SearchThread에서 돌리므로 읽기 루프는 막히지 않고, stop은 탐색이 주기적으로 확인하는
+중단 이벤트로 바로 멈춘 뒤 마지막으로 끝낸 깊이의 최선수를 bestmove로 보낸다.
+
+python uci.py
+python uci.py bench 5
+"""
+import multiprocessing
+import sys
+import threading
+import time
+
+from chess_engine import WHITE, Board, move_to_uci, parse_uci
+from search import SearchThread, Searcher, format_pv, format_score
+
+ENGINE_NAME = "Pokemon Chess"
+ENGINE_AUTHOR = "choi-seunghyun"
+DEFAULT_HASH = 16
+MAX_HASH = 1024
+MAX_THREADS = 64
+DEFAULT_MOVESTOGO = 30 # 남은 시간만 주어졌을 때 남은 수를 이만큼으로 보고 나눈다
+MOVE_OVERHEAD = 0.05 # 통신/스레드 전환 여유(초)
+BENCH_DEPTH = 4
+
+
+def think_time(turn, limits):
+    """go의 시간 인자로 이번 수에 쓸 시간(초), 시간 제한이 없으면 None"""
+    if 'movetime' in limits:
+        return max(0.001, limits['movetime'] / 1000 - MOVE_OVERHEAD)
+    remaining = limits.get('wtime' if turn == WHITE else 'btime')
+    if remaining is None:
+        return None
+    increment = limits.get('winc' if turn == WHITE else 'binc', 0)
+    movestogo = limits.get('movestogo') or DEFAULT_MOVESTOGO
+    budget = remaining / movestogo + increment * 3 / 4
+    # 남은 시간을 넘기지 않도록 (시간이 거의 없으면 최소한만)
+    budget = min(budget, remaining - MOVE_OVERHEAD * 1000)
+    return max(0.001, budget / 1000)
+
+
+def parse_go(tokens):
+    """'go' 뒤의 토큰 → {이름: 값} (infinite, ponder는 True)"""
+    limits = {}
+    i = 0
+    while i < len(tokens):
+        name = tokens[i]
+        if name in ('infinite', 'ponder'):
+            limits[name] = True
+            i += 1
+        elif i + 1 < len(tokens) and tokens[i + 1].lstrip('-').isdigit():
+            limits[name] = int(tokens[i + 1])
+            i += 2
+        else:
+            i += 1 # 모르는 인자(searchmoves 등)는 무시
+    return limits
+
+
+class UciEngine:
+    def __init__(self, output=None):
+        self.output = output or sys.stdout
+        self.output_lock = threading.Lock() # 탐색 스레드의 info와 읽기 루프의 응답이 섞이지 않도록
+        self.board = Board()
+        self.hash_mb = DEFAULT_HASH
+        self.threads = 1
+        self.thread = SearchThread(Searcher(self.hash_mb), on_info=self.send_info, on_done=self.search_done)
+        # go infinite는 탐색이 먼저 끝나도 stop을 받을 때까지 bestmove를 미룬다
+        self.state_lock = threading.Lock()
+        self.infinite = False
+        self.stopping = False
+        self.pending = None
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    # --- 명령 처리 ---
+    def run(self, stream=None):
+        stream = stream or sys.stdin
+        while True:
+            line = stream.readline()
+            if not line:
+                break
+            if not self.handle(line):
+                break
+        self.close()
+
+    def handle(self, line):
+        """명령 한 줄 처리. quit이면 False"""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == 'quit':
+            return False
+        if command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH} min 1 max {MAX_HASH}")
+            self.send(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'ucinewgame':
+            self.stop()
+            if hasattr(self.thread.searcher, 'tt'):
+                self.thread.searcher.tt.clear()
+            self.board = Board()
+        elif command == 'setoption':
+            self.set_option(arguments)
+        elif command == 'position':
+            self.stop()
+            self.set_position(arguments)
+        elif command == 'go':
+            self.go(parse_go(arguments))
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            with self.state_lock:
+                self.infinite = False
+        elif command == 'bench':
+            self.stop()
+            self.bench(int(arguments[0]) if arguments and arguments[0].isdigit() else BENCH_DEPTH)
+        else:
+            self.send(f"info string unknown command: {command}")
+        return True
+
+    def set_option(self, arguments):
+        # setoption name <이름(공백 포함 가능)> value <값>
+        text = ' '.join(arguments)
+        name, _, value = text.partition(' value ')
+        name = name.removeprefix('name ').strip().lower()
+        value = value.strip()
+        if name not in ('hash', 'threads') or not value.isdigit():
+            self.send(f"info string unsupported option: {text}")
+            return
+        self.stop()
+        if name == 'hash':
+            self.hash_mb = min(max(int(value), 1), MAX_HASH)
+        else:
+            self.threads = min(max(int(value), 1), MAX_THREADS)
+        self.thread.searcher = self.make_searcher()
+
+    def make_searcher(self):
+        old = self.thread.searcher
+        if hasattr(old, 'close'):
+            old.close()
+        if self.threads > 1:
+            # 스레드로는 GIL 때문에 코어를 더 못 쓰므로 프로세스 풀 병렬 탐색 (필요할 때만 import)
+            from parallel_search import ParallelSearcher
+            return ParallelSearcher(self.threads, self.hash_mb)
+        if isinstance(old, Searcher):
+            old.tt.resize(self.hash_mb)
+            return old
+        return Searcher(self.hash_mb)
+
+    def set_position(self, arguments):
+        if arguments[:1] == ['startpos']:
+            board = Board()
+            rest = arguments[1:]
+        elif arguments[:1] == ['fen']:
+            fen_fields = []
+            rest = arguments[1:]
+            while rest and rest[0] != 'moves':
+                fen_fields.append(rest.pop(0))
+            try:
+                board = Board.from_fen(' '.join(fen_fields))
+            except (ValueError, IndexError, KeyError):
+                self.send(f"info string invalid fen: {' '.join(fen_fields)}")
+                return
+        else:
+            self.send("info string position needs startpos or fen")
+            return
+        if rest[:1] == ['moves']:
+            for text in rest[1:]:
+                try:
+                    move = parse_uci(text)
+                except ValueError:
+                    move = None
+                found = move is not None and board.find_move(move & 63, (move >> 6) & 63, move >> 12)
+                if not found:
+                    self.send(f"info string illegal move: {text}")
+                    break
+                board.make_move(found)
+        self.board = board
+
+    # --- 탐색 ---
+    def go(self, limits):
+        self.stop()
+        search_limits = {}
+        if 'depth' in limits:
+            search_limits['depth'] = max(1, limits['depth'])
+        if 'nodes' in limits:
+            search_limits['nodes'] = max(1, limits['nodes'])
+        movetime = think_time(self.board.turn, limits)
+        infinite = limits.get('infinite') or limits.get('ponder')
+        if movetime is not None and not infinite:
+            search_limits['movetime'] = movetime
+        with self.state_lock:
+            self.infinite = bool(infinite)
+            self.stopping = False
+            self.pending = None
+        self.thread.start(self.board, **search_limits)
+
+    def stop(self):
+        """진행 중인 탐색을 멈추고 (bestmove는 탐색 스레드가 보낸다), 미뤄 둔 bestmove가 있으면 보낸다"""
+        with self.state_lock:
+            self.stopping = True
+        self.thread.stop()
+        with self.state_lock:
+            pending, self.pending = self.pending, None
+        if pending is not None:
+            self.send_bestmove(pending)
+
+    def send_info(self, info):
+        elapsed_ms = int(info.elapsed * 1000)
+        line = (f"info depth {info.depth} score {format_score(info.score)} nodes {info.nodes} "
+                f"nps {info.nps} time {elapsed_ms}")
+        if hasattr(self.thread.searcher, 'tt'):
+            line += f" hashfull {self.thread.searcher.tt.hashfull()}"
+        if info.pv:
+            line += f" pv {format_pv(info.pv)}"
+        self.send(line)
+
+    def search_done(self, move, info):
+        with self.state_lock:
+            if self.infinite and not self.stopping:
+                self.pending = move
+                return
+        self.send_bestmove(move)
+
+    def send_bestmove(self, move):
+        self.send(f"bestmove {move_to_uci(move) if move else '0000'}")
+
+    def bench(self, depth):
+        """고정 포지션들을 depth까지 탐색해 총 노드 수와 벽시계/CPU 시간당 노드 수를 출력"""
+        from parallel_search import BENCH_POSITIONS
+        searcher = self.thread.searcher
+        searcher.clear_stop() # 직전 go를 stop으로 멈췄으면 중단 요청이 남아 있다
+        total_nodes = 0
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        for fen in BENCH_POSITIONS:
+            searcher.search(Board.from_fen(fen), depth=depth)
+            total_nodes += searcher.nodes
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        # ParallelSearcher면 작업자 프로세스의 CPU 시간은 여기에 잡히지 않으므로 nps만 의미가 있다
+        self.send(f"info string bench depth {depth} positions {len(BENCH_POSITIONS)} threads {self.threads}")
+        self.send(f"info string nodes {total_nodes} time {elapsed * 1000:.0f} "
+                  f"nps {total_nodes / elapsed if elapsed else 0:.0f} "
+                  f"nodes per cpu-second {total_nodes / cpu if cpu else 0:.0f}")
+
+    def close(self):
+        self.stop()
+        if hasattr(self.thread.searcher, 'close'):
+            self.thread.searcher.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    engine = UciEngine()
+    if argv:
+        # python uci.py bench 5 처럼 명령 하나만 실행하고 끝낸다
+        engine.handle(' '.join(argv))
+        engine.close()
+        return 0
+    engine.run()
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    raise SystemExit(main())